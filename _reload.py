@@ -3,9 +3,16 @@ from watchdog.events import FileModifiedEvent, PatternMatchingEventHandler
 from threading import Timer
 from subprocess import Popen
 from sys import argv
+import os
+
+from utils.hot_reload import RESTART_EXIT_CODE
 
 # Grab the script name from a command line arg.
 SCRIPT_FILENAME = argv[1]
+# With --restart, any .py change restarts the script (the old behaviour).
+# Otherwise the bot reloads cogs and handlers itself (HOT_RELOAD) and this
+# only restarts it when the script changes or the bot asks for a restart.
+FULL_RESTART = '--restart' in argv[2:]
 
 class Runner:
     __proc = None
@@ -15,7 +22,15 @@ class Runner:
     @staticmethod
     def run():
       # Run the python script and keep track of the process.
-      Runner.__proc = Popen(["python", SCRIPT_FILENAME])
+      env = os.environ if FULL_RESTART else {**os.environ, 'HOT_RELOAD': '1'}
+      Runner.__proc = Popen(["python", SCRIPT_FILENAME], env=env)
+
+    # Restarts the script if it exited asking for it.
+    @staticmethod
+    def restart_if_requested():
+      if Runner.__proc != None and Runner.__proc.poll() == RESTART_EXIT_CODE:
+        print("Restarting script...")
+        Runner.run()
 
     # Fires when watched files change.
     @staticmethod
@@ -33,7 +48,7 @@ class Runner:
       if Runner.__handler_func != None:
         Runner.__handler_func.cancel()
 
-      # Schedule the reload to happen in .5 secs.
+      # Schedule the reload to happen in 1 sec.
       Runner.__handler_func = Timer(1, Runner.run)
       print("Starting script reload in 1 second...")
       Runner.__handler_func.start()
@@ -45,10 +60,11 @@ Runner.run()
 # Initialize file watching object.
 file_watcher = Observer()
 
-# Designate our event handler as one that
-# activates when any .py files indirectory are changed,
-# exluding this one.
-file_modified_event_handler = PatternMatchingEventHandler(patterns=["./*.py"], ignore_patterns=["./reloadable.py"])
+# Designate our event handler as one that activates when any .py files in
+# the directory are changed (only the script itself in hot reload mode),
+# excluding this one.
+patterns = ["./*.py"] if FULL_RESTART else ["./" + os.path.normpath(SCRIPT_FILENAME)]
+file_modified_event_handler = PatternMatchingEventHandler(patterns=patterns, ignore_patterns=["./_reload.py"])
 
 # Set the action to be taken when the "on_modified" action
 # is detected (our debouncing method is called).
@@ -61,6 +77,7 @@ file_watcher.start()
 try:
   while file_watcher.is_alive():
     file_watcher.join(1)
+    Runner.restart_if_requested()
 except KeyboardInterrupt:
   file_watcher.stop()
 
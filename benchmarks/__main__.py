@@ -0,0 +1,309 @@
+"""
+Times the command handlers, ingestion, parsing and rendering against a generated server (see
+`benchmarks.dataset`), and writes the timings to a JSON file to compare between commits.
+
+  python -m benchmarks [scenario ...] [--players 200] [--puzzles 365] [--repeat 5]
+                       [--output results.json] [--compare baseline.json]
+
+Scenarios are picked by name prefix (`ranks`, `ranks-wordle`, `stats`, ...), all of them by
+default. Caches are emptied before every run unless `--warm` is given, so the timings are what
+the first person to ask would see. Without Chrome and chromedriver, tables are rendered as blank
+images of the same size, which is recorded in the results.
+"""
+from typing import cast
+import aiosqlite, argparse, asyncio, json, logging, os, platform, statistics, subprocess, time, types, typing
+import matplotlib.pyplot as plt
+from PIL import Image
+
+from benchmarks.dataset import GAMES, DatasetGenerator
+from benchmarks.fake_discord import CHROMEDRIVER, placeholder_table
+from handlers.commands import BaseCommandHandler
+from handlers.commands.combined import CombinedCommandHandler
+from handlers.commands.connections import ConnectionsCommandHandler
+from handlers.commands.strands import StrandsCommandHandler
+from handlers.commands.wordle import WordleCommandHandler
+from models import PuzzleName
+from models.table import Table
+from utils.bot_typing import MyBotType
+from utils.bot_utilities import BotUtilities
+from utils.metrics import Metrics
+from utils.submission_parser import SubmissionParser
+
+ROOT = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+
+class BenchGuild():
+  """
+  A guild with every generated player in its member cache.
+  """
+  id: int = 1
+
+  _members: dict[int, types.SimpleNamespace]
+
+  def __init__(self, dataset: DatasetGenerator) -> None:
+    self._members = {
+      player.user_id: types.SimpleNamespace(id=player.user_id, name=player.name, display_name=player.name)
+      for player in dataset.players
+    }
+
+  def get_member(self, user_id: int) -> types.SimpleNamespace | None:
+    return self._members.get(user_id)
+
+class BenchBot():
+  def __init__(self, logger: logging.Logger, dataset: DatasetGenerator) -> None:
+    self.logger = logger
+    self.metrics = Metrics(False)
+    self.guilds = [BenchGuild(dataset)]
+
+class BenchContext():
+  """
+  Stands in for a command's context. Replies are counted and dropped, after adding the size of
+  any attached file to the bench's `reply_bytes`.
+  """
+  def __init__(self, author: types.SimpleNamespace, guild: BenchGuild, bench: "Bench") -> None:
+    self.author = author
+    self.guild = guild
+    self.bench = bench
+    self.message = self
+    self.replies = 0
+
+  async def send(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+    await self.reply(*args, **kwargs)
+
+  async def reply(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+    self.replies += 1
+    files = kwargs.get('files') or []
+    if 'file' in kwargs:
+      files = [kwargs['file'], *files]
+    for file in files:
+      self.bench.reply_bytes += file.fp.getbuffer().nbytes
+
+  async def add_reaction(self, emoji: str) -> None:
+    pass
+
+  async def defer(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+    pass
+
+class Bench():
+  """
+  A populated database with the handlers on top of it, and the scenarios to time against it.
+  """
+  utils: BotUtilities
+  games: dict[PuzzleName, BaseCommandHandler]
+  combined: CombinedCommandHandler
+  dataset: DatasetGenerator
+  table_renderer: str
+  # size of the files attached to replies, since the last reset
+  reply_bytes: int
+
+  _ingested_puzzle: int
+
+  def __init__(self, utils: BotUtilities, dataset: DatasetGenerator) -> None:
+    self.utils = utils
+    self.dataset = dataset
+    self.games = {
+      PuzzleName.WORDLE: WordleCommandHandler(utils),
+      PuzzleName.CONNECTIONS: ConnectionsCommandHandler(utils),
+      PuzzleName.STRANDS: StrandsCommandHandler(utils),
+    }
+    self.combined = CombinedCommandHandler(utils, [game.db for game in self.games.values()])
+    self._ingested_puzzle = 0
+    self.reply_bytes = 0
+
+    self.table_renderer = 'chrome'
+    if not os.path.exists(CHROMEDRIVER):
+      self.table_renderer = 'placeholder'
+      utils.get_image_from_table = placeholder_table # type: ignore
+
+  def scenarios(self) -> dict[str, typing.Callable[[], typing.Awaitable[typing.Any]]]:
+    # the most active player asks, so stats and entries have the most to show
+    author = max(self.dataset.players, key = lambda player: sum(player.participation.values()))
+    guild = cast(BenchGuild, self.utils.bot.guilds[0])
+
+    def command(method, *args: str):
+      async def run() -> None:
+        await method(BenchContext(guild.get_member(author.user_id), guild, self), *args) # type: ignore
+      return run
+
+    scenarios: dict[str, typing.Callable[[], typing.Awaitable[typing.Any]]] = {}
+    for game, handler in self.games.items():
+      name = game.value.lower()
+      today = handler.db.get_puzzle_by_date(self.utils.get_todays_date())
+      for mode in ['today', 'week', 'all-time', 'rating', str(today - 7)]:
+        scenarios[f"ranks-{name}-{'puzzle' if mode.isdigit() else mode}"] = command(handler.get_ranks, mode)
+      scenarios[f"stats-{name}"] = command(handler.get_stats)
+      scenarios[f"missing-{name}"] = command(handler.get_missing)
+      scenarios[f"entries-{name}"] = command(handler.get_entries)
+    for mode in ['today', 'week', '10-day', 'all-time']:
+      scenarios[f"ranks-all-{mode}"] = command(self.combined.get_ranks, mode)
+
+    scenarios['parse'] = self.parse
+    scenarios['render-table'] = self.render_table
+    scenarios['render-chart'] = self.render_chart
+    scenarios['render-trim'] = self.render_trim
+    # last, as it adds entries
+    scenarios['ingest'] = self.ingest
+    return scenarios
+
+  def reset_caches(self) -> None:
+    for handler in self.games.values():
+      handler.db._query_cache.clear()
+      handler.db._versus_cache = None
+      handler.db.distribution.invalidate()
+    self.utils.names._names.clear()
+    self.utils.names._stored.clear()
+
+  ####################
+  #    SCENARIOS     #
+  ####################
+
+  async def parse(self) -> None:
+    """
+    One day of results for every game, plus as much ordinary chat.
+    """
+    parser = SubmissionParser()
+    messages = [content for game in GAMES for _, _, content in self.dataset.results(game, [1000])]
+    messages += ["did anyone get today's wordle?", "lol", "Connect four later?\nmaybe\nidk"] * (len(messages) // 3)
+    for content in messages:
+      parser.parse(content)
+
+  async def ingest(self) -> None:
+    """
+    Everyone posting their Wordle result for a new puzzle, one message at a time.
+    """
+    handler = self.games[PuzzleName.WORDLE]
+    if self._ingested_puzzle == 0:
+      self._ingested_puzzle = handler.db.get_puzzle_by_date(self.utils.get_todays_date())
+    self._ingested_puzzle += 1
+
+    parser = SubmissionParser()
+    for player, _, content in self.dataset.results(PuzzleName.WORDLE, [self._ingested_puzzle]):
+      await handler.add_entry(types.SimpleNamespace(id=player.user_id, name=player.name), parser.parse(content)) # type: ignore
+
+  async def render_table(self) -> None:
+    table = Table(['Rank', 'User', 'Average', '🧩'])
+    for i, player in enumerate(self.dataset.players[:11]):
+      table.add_row(i + 1, player.name, f"{4.2 - i / 10:.2f}", 30 - i)
+    self.utils.image_to_binary(self.utils.get_image_from_table(table))
+
+  async def render_chart(self) -> None:
+    fig, ax = plt.subplots()
+    ax.bar([str(score) for score in range(1, 8)], [3, 14, 40, 62, 30, 9, 2])
+    image = self.utils.fig_to_image(fig)
+    plt.close(fig)
+    self.utils.image_to_binary(self.utils.combine_images(placeholder_table(None), image))
+
+  async def render_trim(self) -> None:
+    image = Image.new('RGB', (800, 600), (255, 255, 255))
+    image.paste((40, 40, 40), (0, 0, 780, 360))
+    self.utils._trim_image(image)
+
+def parse_args() -> argparse.Namespace:
+  parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Benchmark the bot against a generated server.")
+  parser.add_argument('scenarios', nargs='*', help="scenario name prefixes to run (default: all)")
+  parser.add_argument('--players', type=int, default=200)
+  parser.add_argument('--puzzles', type=int, default=365, help="puzzles of each game, up to today")
+  parser.add_argument('--participation', type=float, default=0.6, help="average share of days a player plays")
+  parser.add_argument('--seed', type=int, default=1)
+  parser.add_argument('--repeat', type=int, default=5, help="timed runs of each scenario")
+  parser.add_argument('--warm', action='store_true', help="keep caches between runs")
+  parser.add_argument('--database', default=':memory:', help="database file, populated only if it's empty")
+  parser.add_argument('--output', default='benchmark_results.json')
+  parser.add_argument('--compare', help="results file to compare medians against")
+  return parser.parse_args()
+
+def get_commit() -> str | None:
+  try:
+    return subprocess.run(
+      ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+async def time_scenario(bench: Bench, run: typing.Callable[[], typing.Awaitable[typing.Any]],
+                        repeat: int, warm: bool) -> dict[str, float | int]:
+  # untimed first run, so imports and lazily built state don't count
+  await run()
+  timings: list[float] = []
+  for _ in range(repeat):
+    if not warm:
+      bench.reset_caches()
+    bench.reply_bytes = 0
+    started = time.perf_counter()
+    await run()
+    timings.append((time.perf_counter() - started) * 1000)
+  result: dict[str, float | int] = {
+    'runs': repeat,
+    'min_ms': round(min(timings), 3),
+    'median_ms': round(statistics.median(timings), 3),
+    'mean_ms': round(statistics.fmean(timings), 3),
+    'max_ms': round(max(timings), 3),
+  }
+  if bench.reply_bytes > 0:
+    # what the last run uploaded to Discord
+    result['reply_bytes'] = bench.reply_bytes
+  return result
+
+def compare(meta: dict[str, typing.Any], results: dict[str, dict], path: str) -> None:
+  with open(path, encoding='utf-8') as file:
+    baseline_file: dict[str, dict] = json.load(file)
+  baseline = baseline_file['results']
+
+  print()
+  for key in ['players', 'puzzles', 'participation', 'seed', 'warm', 'table_renderer']:
+    if baseline_file['meta'].get(key) != meta[key]:
+      print(f"Warning: {path} was run with {key}={baseline_file['meta'].get(key)}, not {meta[key]}.")
+  print(f"{'scenario':<28} {'before':>10} {'after':>10} {'change':>8}")
+  for name, result in results.items():
+    if name not in baseline:
+      continue
+    before, after = baseline[name]['median_ms'], result['median_ms']
+    change = f"{(after - before) / before:+.0%}" if before > 0 else ''
+    print(f"{name:<28} {before:>8.2f}ms {after:>8.2f}ms {change:>8}")
+
+async def main(args: argparse.Namespace) -> None:
+  logger = logging.getLogger("Benchmarks")
+  logger.setLevel(logging.WARNING)
+
+  async with aiosqlite.connect(args.database) as connection:
+    with open(f"{ROOT}/database/schema.sql", encoding='utf-8') as file:
+      await connection.executescript(file.read())
+
+    dataset = DatasetGenerator(args.players, args.puzzles, args.participation, args.seed)
+    utils = BotUtilities(None, cast(MyBotType, BenchBot(logger, dataset)), connection) # type: ignore
+    bench = Bench(utils, dataset)
+
+    async with connection.execute_fetchall("select count(*) from users") as rows:
+      populated = rows[0][0] > 0 # type: ignore
+    if not populated:
+      started = time.perf_counter()
+      entries = await dataset.populate({game: handler.db for game, handler in bench.games.items()}, utils.get_todays_date())
+      print(f"Generated {args.players} players and {entries:,} entries in {time.perf_counter() - started:.1f}s.")
+
+    results: dict[str, dict[str, float | int]] = {}
+    for name, run in bench.scenarios().items():
+      if len(args.scenarios) > 0 and not any(name.startswith(prefix) for prefix in args.scenarios):
+        continue
+      results[name] = await time_scenario(bench, run, args.repeat, args.warm)
+      result = results[name]
+      uploaded = f"  {result['reply_bytes'] / 1024:>7.1f}KB" if 'reply_bytes' in result else ''
+      print(f"{name:<28} median {result['median_ms']:>9.2f}ms  min {result['min_ms']:>9.2f}ms  max {result['max_ms']:>9.2f}ms{uploaded}")
+
+  meta = {
+    'commit': get_commit(),
+    'python': platform.python_version(),
+    'players': args.players,
+    'puzzles': args.puzzles,
+    'participation': args.participation,
+    'seed': args.seed,
+    'warm': args.warm,
+    'table_renderer': bench.table_renderer,
+  }
+  with open(args.output, 'w', encoding='utf-8') as file:
+    json.dump({'meta': meta, 'results': results}, file, indent=2)
+  print(f"Wrote {args.output}.")
+
+  if args.compare:
+    compare(meta, results, args.compare)
+
+if __name__ == '__main__':
+  asyncio.run(main(parse_args()))
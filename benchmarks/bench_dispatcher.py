@@ -0,0 +1,72 @@
+"""
+A burst of submissions across several channels, each acknowledged with a ✅, while a few command
+replies are sent directly in the middle of it (as the bot sends them). Compares reacting inline
+(every reaction awaited as it happens, as `on_message` used to) with `OutboundDispatcher`, which
+leaves part of the global limit to the replies, against `FakeHTTP`. Discord's
+limits are scaled down by `SCALE` so the run takes seconds.
+
+  python -m benchmarks.bench_dispatcher [messages per channel] [channels]
+"""
+import asyncio, logging, statistics, sys, time, types
+
+from benchmarks.fake_http import FakeChannel, FakeHTTP, FakeMessage
+from utils.dispatcher import OutboundDispatcher
+
+SCALE: float = 0.1
+ROUTE_LIMITS = {route: (count, per * SCALE) for route, (count, per) in OutboundDispatcher.ROUTE_LIMITS.items()}
+GLOBAL_LIMIT = (OutboundDispatcher.GLOBAL_LIMIT[0], OutboundDispatcher.GLOBAL_LIMIT[1] * SCALE)
+REPLIES: int = 5
+
+def make_burst(http: FakeHTTP, per_channel: int, channels: int) -> tuple[list[FakeMessage], list[FakeMessage]]:
+  submissions = [
+    FakeMessage(c * per_channel + i, FakeChannel(c), http) for c in range(channels) for i in range(per_channel)
+  ]
+  commands = [FakeMessage(-i - 1, FakeChannel(i % channels), http) for i in range(REPLIES)]
+  return submissions, commands
+
+async def send_replies(commands: list[FakeMessage], reply) -> float:
+  """
+  Sends the command replies shortly after the burst starts. Returns when they were sent.
+  """
+  await asyncio.sleep(0.01)
+  sent_at = time.perf_counter()
+  await asyncio.gather(*[reply(message) for message in commands])
+  return sent_at
+
+def get_latencies(commands: list[FakeMessage], sent_at: float) -> list[float]:
+  return [message.replied_at - sent_at for message in commands if message.replied_at is not None]
+
+async def run_inline(per_channel: int, channels: int) -> tuple[FakeHTTP, float, list[float]]:
+  http = FakeHTTP(ROUTE_LIMITS, GLOBAL_LIMIT)
+  submissions, commands = make_burst(http, per_channel, channels)
+  start = time.perf_counter()
+  ingest = asyncio.gather(*[message.add_reaction('✅') for message in submissions])
+  sent_at = await send_replies(commands, lambda message: message.reply('ranks'))
+  await ingest
+  return http, time.perf_counter() - start, get_latencies(commands, sent_at)
+
+async def run_dispatcher(per_channel: int, channels: int) -> tuple[FakeHTTP, float, list[float]]:
+  http = FakeHTTP(ROUTE_LIMITS, GLOBAL_LIMIT)
+  bot = types.SimpleNamespace(logger=logging.getLogger('bench'))
+  dispatcher = OutboundDispatcher(bot, route_limits=ROUTE_LIMITS, global_limit=GLOBAL_LIMIT) # type: ignore
+  submissions, commands = make_burst(http, per_channel, channels)
+  start = time.perf_counter()
+  for message in submissions:
+    dispatcher.react(message, '✅') # type: ignore
+  print(f"{'':>12}  (ingestion handed off every reaction in {1000 * (time.perf_counter() - start):.2f} ms)")
+  sent_at = await send_replies(commands, lambda message: message.reply('ranks'))
+  await dispatcher.join()
+  return http, time.perf_counter() - start, get_latencies(commands, sent_at)
+
+def report(name: str, result: tuple[FakeHTTP, float, list[float]]) -> None:
+  http, elapsed, latencies = result
+  print(
+    f"{name:>12}: {http.requests} requests, {http.rate_limited} 429s, {elapsed:.2f}s total, "
+    f"reply latency median {1000 * statistics.median(latencies):.0f} ms / max {1000 * max(latencies):.0f} ms"
+  )
+
+if __name__ == '__main__':
+  per_channel: int = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+  channels: int = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+  report('inline', asyncio.run(run_inline(per_channel, channels)))
+  report('dispatcher', asyncio.run(run_dispatcher(per_channel, channels)))
@@ -0,0 +1,92 @@
+"""
+Cost of turning a `/stats` reply into the file sent to Discord: the old way (the chart saved as a
+PNG and decoded again, combined with the table and saved as a PNG a second time) against
+`BotUtilities`, which reads the chart's pixels straight from the canvas and encodes once, with a
+256 colour palette. Reports the time per image and the size of the file uploaded.
+
+  python -m benchmarks.bench_images [iterations]
+"""
+import io, logging, sys, time, types, typing
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt, seaborn as sns
+from PIL import Image, ImageDraw
+
+from models.table import Table
+from utils.bot_utilities import BotUtilities
+
+SCORES: list[str] = ['1/6', '2/6', '3/6', '4/6', '5/6', '6/6', 'X/6']
+
+def stats_table() -> Image.Image:
+  """
+  What the table renderer returns for two players, without needing Chrome.
+  """
+  image = Image.new('RGB', (900, 120), (255, 255, 255))
+  draw = ImageDraw.Draw(image)
+  for i in range(3):
+    draw.text((10, 15 + 30 * i), f"player{i:05d}    3.{i}231    55    1.2000    0.8500    2.4500    300    12", fill=(30, 30, 30))
+  return image
+
+def stats_figure() -> typing.Any:
+  """
+  The histogram `/stats` draws for two players.
+  """
+  table = Table(['Player', 'Score', 'Count'])
+  for player, counts in [('alice', [1, 5, 20, 31, 15, 4, 2]), ('bob', [0, 3, 25, 28, 12, 6, 1])]:
+    for score, count in zip(SCORES, counts):
+      table.add_row(player, score, count)
+  plt.rcParams.update({'font.size': 20})
+  g = sns.catplot(x='Score', y='Count', hue='Player', data=table.data, kind='bar')
+  for ax in g.axes.ravel():
+    for c in ax.containers:
+      ax.bar_label(c, labels=['%d' % v.get_height() for v in c], label_type='edge', fontsize=15)
+  fig = plt.gcf()
+  fig.subplots_adjust(bottom=0.2)
+  fig.set_size_inches(10, 5)
+  return fig
+
+def old_pipeline(table: Image.Image, fig: typing.Any) -> io.BytesIO:
+  buf = io.BytesIO()
+  fig.savefig(buf)
+  buf.seek(0)
+  chart = Image.open(buf)
+  combined = Image.new('RGBA', (max(table.size[0], chart.size[0]), table.size[1] + chart.size[1]))
+  combined.paste(table, (0, 0))
+  combined.paste(chart, (0, table.size[1]))
+  binary = io.BytesIO()
+  combined.save(binary, 'PNG')
+  binary.seek(0)
+  return binary
+
+def new_pipeline(utils: BotUtilities, table: Image.Image, fig: typing.Any) -> io.BytesIO:
+  return utils.image_to_binary(utils.combine_images(table, utils.fig_to_image(fig)))
+
+def measure(render: typing.Callable[[], io.BytesIO], iterations: int) -> tuple[float, int]:
+  """
+  Seconds per image and the size of the file.
+  """
+  size = render().getbuffer().nbytes
+  started = time.perf_counter()
+  for _ in range(iterations):
+    render()
+  return (time.perf_counter() - started) / iterations, size
+
+def main() -> None:
+  iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+  # the helpers used here don't touch the bot or the database
+  utils = BotUtilities(None, types.SimpleNamespace(logger=logging.getLogger("Benchmarks")), None) # type: ignore
+  table, fig = stats_table(), stats_figure()
+  results = [
+    ('PNG twice', measure(lambda: old_pipeline(table, fig), iterations)),
+    ('RGBA', measure(lambda: new_pipeline(utils, table, fig), iterations)),
+  ]
+  plt.close(fig)
+
+  print(f"{'pipeline':<10} {'per image':>12} {'file':>10}")
+  for name, (elapsed, size) in results:
+    print(f"{name:<10} {elapsed * 1000:>10.1f}ms {size / 1024:>8.1f}KB")
+  (old_time, old_size), (new_time, new_size) = results[0][1], results[1][1]
+  print(f"{'change':<10} {new_time / old_time - 1:>+12.0%} {new_size / old_size - 1:>+10.0%}")
+
+if __name__ == '__main__':
+  main()
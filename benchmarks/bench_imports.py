@@ -0,0 +1,62 @@
+"""
+What importing `bot` costs before it can connect, from `python -X importtime` in a fresh
+interpreter (the best of a few runs). Exits with status 1 if the import takes longer than the
+budget or pulls in one of the rendering libraries, which should only load once a command needs
+them (see `utils.lazy_import`).
+
+  python -m benchmarks.bench_imports [budget_ms] [--top 15]
+"""
+import argparse, os, subprocess, sys, tempfile
+
+ROOT = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+# top-level packages that importing `bot` must not load
+DEFERRED: tuple[str, ...] = ('pandas', 'matplotlib', 'seaborn', 'numpy', 'bokeh', 'selenium')
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+  """
+  `{module: (self_us, cumulative_us)}` for everything importing `module` loaded.
+  """
+  # run elsewhere, importing the bot truncates discord.log in the working directory
+  env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')]))}
+  with tempfile.TemporaryDirectory() as directory:
+    result = subprocess.run(
+      [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+      cwd=directory, env=env, capture_output=True, text=True, check=True,
+    )
+  times: dict[str, tuple[int, int]] = {}
+  for line in result.stderr.splitlines():
+    if not line.startswith('import time:') or 'self [us]' in line:
+      continue
+    self_us, cumulative_us, name = line.removeprefix('import time:').split('|')
+    times[name.strip()] = (int(self_us), int(cumulative_us))
+  return times
+
+def parse_args() -> argparse.Namespace:
+  parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_imports', description="Check the bot's import time.")
+  parser.add_argument('budget_ms', nargs='?', type=float, default=400, help="most `import bot` may take")
+  parser.add_argument('--runs', type=int, default=3)
+  parser.add_argument('--top', type=int, default=15, help="how many of the slowest imports to list")
+  return parser.parse_args()
+
+def main(args: argparse.Namespace) -> int:
+  runs = [import_times('bot') for _ in range(args.runs)]
+  times = min(runs, key = lambda run: run['bot'][1])
+  total_ms = times['bot'][1] / 1000
+
+  print(f"{'module':<48} {'self':>9} {'cumulative':>11}")
+  for name, (self_us, cumulative_us) in sorted(times.items(), key = lambda item: -item[1][0])[:args.top]:
+    print(f"{name[:48]:<48} {self_us / 1000:>7.1f}ms {cumulative_us / 1000:>9.1f}ms")
+  print(f"\n`import bot` took {total_ms:.1f}ms (budget {args.budget_ms:g}ms).")
+
+  failed = False
+  loaded = sorted({name.split('.')[0] for name in times} & set(DEFERRED))
+  if len(loaded) > 0:
+    print(f"Imported eagerly: {', '.join(loaded)}.")
+    failed = True
+  if total_ms > args.budget_ms:
+    print("Over budget.")
+    failed = True
+  return 1 if failed else 0
+
+if __name__ == '__main__':
+  sys.exit(main(parse_args()))
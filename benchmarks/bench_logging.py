@@ -0,0 +1,56 @@
+"""
+Per-message cost of logging: building a formatter per record (the old `LoggingFormatter`)
+against the cached one, and eager f-string debug calls against lazy `%`-style ones when DEBUG
+is disabled.
+
+  python -m benchmarks.bench_logging [iterations]
+"""
+import io, logging, sys, time
+
+from utils.bot_logging import LoggingFormatter
+
+class LegacyLoggingFormatter(LoggingFormatter):
+  def format(self, record: logging.LogRecord) -> str:
+    log_color = self.COLORS[record.levelno]
+    format = self.FORMAT
+    format = format.replace("(black)", self.black + self.bold)
+    format = format.replace("(reset)", self.reset)
+    format = format.replace("(levelcolor)", log_color)
+    format = format.replace("(green)", self.green + self.bold)
+    formatter = logging.Formatter(format, self.DATE_FORMAT, style="{")
+    return formatter.format(record)
+
+# a stand-in for a fetched row and a guild's member list
+ROW = (1234, 4, 12, 3, 10)
+MEMBERS = [f"<Member id={i} name='member{i}'>" for i in range(200)]
+
+def bench(name: str, fn, iterations: int) -> None:
+  start = time.perf_counter()
+  for _ in range(iterations):
+    fn()
+  elapsed = time.perf_counter() - start
+  print(f"{name:>28}: {1e9 * elapsed / iterations:>10,.0f} ns/msg")
+
+def get_logger(name: str, formatter: logging.Formatter, level: int) -> logging.Logger:
+  handler = logging.StreamHandler(io.StringIO())
+  handler.setFormatter(formatter)
+  logger = logging.getLogger(name)
+  logger.propagate = False
+  logger.setLevel(level)
+  logger.addHandler(handler)
+  return logger
+
+if __name__ == '__main__':
+  iterations: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+  print("formatting (INFO enabled):")
+  legacy = get_logger('bench.legacy', LegacyLoggingFormatter(), logging.INFO)
+  cached = get_logger('bench.cached', LoggingFormatter(), logging.INFO)
+  bench('new formatter per record', lambda: legacy.info("row -> %s", ROW), iterations)
+  bench('cached formatter', lambda: cached.info("row -> %s", ROW), iterations)
+
+  print("disabled debug (level INFO):")
+  bench('f-string row', lambda: cached.debug(f"row -> {ROW}"), iterations)
+  bench('lazy row', lambda: cached.debug("row -> %s", ROW), iterations)
+  bench('f-string member list', lambda: cached.debug(f"get_nickname():: 1|{MEMBERS}"), iterations // 10)
+  bench('lazy member id', lambda: cached.debug("get_nickname():: %s", 1), iterations)
@@ -0,0 +1,66 @@
+"""
+Throughput of turning chat messages into submissions: the old path (several `splitlines()` calls
+and uncompiled regexes per message, then the title parsed again per game) against
+`SubmissionParser`, over a mix of puzzle results and ordinary chat.
+
+  python -m benchmarks.bench_submission_parser [iterations]
+"""
+import re, sys, time
+from collections import Counter
+
+from utils.submission_parser import SubmissionParser
+
+CORPUS: list[str] = [
+  "Wordle 1,234 4/6\n\n⬛🟨⬛⬛⬛\n⬛🟩🟨⬛⬛\n🟩🟩⬛🟩⬛\n🟩🟩🟩🟩🟩",
+  "Wordle 1,235 X/6*\n\n⬛🟨⬛⬛⬛\n⬛🟩🟨⬛⬛\n🟩🟩⬛🟩⬛\n🟩🟩⬛🟩⬛\n🟩🟩⬛🟩⬛\n🟩🟩⬛🟩⬛",
+  "Connections\nPuzzle #456\n🟨🟨🟨🟨\n🟩🟩🟩🟩\n🟦🟪🟦🟦\n🟦🟦🟦🟦\n🟪🟪🟪🟪",
+  "Strands #123\n“Sweet talk”\n💡🔵🔵🔵\n🔵🟡🔵",
+  "lol",
+  "did anyone get today's wordle?",
+  "Can't believe I missed that one\nthe purple group was brutal\nnext time",
+  "good morning everyone!",
+  "Connect four later?",
+  "Some people just\nwrite\nmulti-line messages",
+]
+
+def legacy_parse(content: str) -> tuple[int, int] | None:
+  """
+  Classification from the old `on_message`, followed by the title/grid parsing that each
+  game's `add_entry` used to repeat.
+  """
+  if content.count("\n") < 2:
+    return None
+
+  first_line = content.splitlines()[0].strip()
+  first_two_lines = '\n'.join(content.splitlines()[:2])
+  if 'Connections' in first_line and re.match(r'^Connections *(\n)Puzzle #\d+', first_two_lines):
+    puzzle = '\n'.join(content.splitlines()[2:])
+    puzzle_lines = puzzle.split('\n')
+    score = len(puzzle_lines) if len(Counter(puzzle_lines[-1]).keys()) == 1 else 8
+    return int(re.findall(r'[\d,]+', first_two_lines)[0].replace(',', '')), score
+  elif 'Strands' in first_line and re.match(r'Strands #\d+', first_two_lines):
+    puzzle = '\n'.join(content.splitlines()[2:])
+    return int(re.findall(r'[\d,]+', first_two_lines)[0].replace(',', '')), puzzle.count('💡')
+  elif 'Wordle' in first_line and re.match(r'^Wordle (\d+|\d{1,3}(,\d{3})*)( 🎉)? (\d|X)\/\d', first_line):
+    puzzle = '\n'.join(content.splitlines()[1:])
+    puzzle.count('🟩'), puzzle.count('🟨'), puzzle.count('⬜') + puzzle.count('⬛')
+    reg_match = re.search(r'\d{1,3}(,\d{3})*', first_line)
+    puzzle_id = int(reg_match.group(0).replace(',', '')) if reg_match else 0
+    if 'X/6' in first_line:
+      return puzzle_id, 7
+    reg_match = re.search(r'(\d)\/(\d)', first_line)
+    return puzzle_id, int(reg_match.group(1)) if reg_match else 0
+  return None
+
+def bench(name: str, parse, iterations: int) -> None:
+  start = time.perf_counter()
+  for _ in range(iterations):
+    for message in CORPUS:
+      parse(message)
+  elapsed = time.perf_counter() - start
+  print(f"{name:>10}: {iterations * len(CORPUS) / elapsed:>12,.0f} msgs/sec")
+
+if __name__ == '__main__':
+  iterations: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+  bench('legacy', legacy_parse, iterations)
+  bench('parser', SubmissionParser().parse, iterations)
@@ -0,0 +1,59 @@
+"""
+Cost of building a leaderboard table: the old way (an empty `pd.DataFrame` grown with
+`df.loc[i] = [...]`, which copies the frame on every row) against `Table.add_row`, for 10, 100 and
+1,000 rows. Reports the time per table and the peak memory allocated while building one.
+
+  python -m benchmarks.bench_table [iterations]
+"""
+import sys, time, tracemalloc, typing
+import pandas as pd
+
+from models.table import Table
+
+COLUMNS: list[str] = ['Rank', 'User', 'Average', '🟩', '🟨', '⬜', '🧩', '🚫']
+SIZES: tuple[int, ...] = (10, 100, 1_000)
+
+def row(i: int) -> list[typing.Any]:
+  return [i + 1, f"player{i:05d}", f"{3.5 + i / 1000:.2f}/6 ({3.6 + i / 1000:.2f}/6)", "1.20", "0.85", "2.45", 30, 2]
+
+def build_dataframe(rows: int) -> pd.DataFrame:
+  df = pd.DataFrame(columns=COLUMNS)
+  for i in range(rows):
+    df.loc[i] = row(i)
+  return df
+
+def build_table(rows: int) -> Table:
+  table = Table(COLUMNS)
+  for i in range(rows):
+    table.add_row(*row(i))
+  return table
+
+def measure(build: typing.Callable[[int], typing.Any], rows: int, iterations: int) -> tuple[float, int]:
+  """
+  Seconds per table and peak bytes allocated while building one.
+  """
+  build(rows)
+  started = time.perf_counter()
+  for _ in range(iterations):
+    build(rows)
+  elapsed = (time.perf_counter() - started) / iterations
+
+  tracemalloc.start()
+  build(rows)
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return elapsed, peak
+
+def main() -> None:
+  iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+  print(f"{'rows':>6} {'builder':<10} {'per table':>12} {'peak memory':>12}")
+  for rows in SIZES:
+    # the old path is quadratic, keep the 1,000 row runs short
+    runs = max(1, iterations // (rows // 10))
+    results = [('DataFrame', measure(build_dataframe, rows, runs)), ('Table', measure(build_table, rows, iterations))]
+    for name, (elapsed, peak) in results:
+      print(f"{rows:>6} {name:<10} {elapsed * 1000:>10.3f}ms {peak / 1024:>10.1f}KB")
+    print(f"{'':>6} {'speedup':<10} {results[0][1][0] / results[1][1][0]:>11.0f}x")
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,167 @@
+"""
+A seeded synthetic server: players with their own skill and habits, and the results they'd paste
+into chat for Wordle, Connections and Strands. The same seed and scale always give the same data,
+so benchmark runs on different commits are comparable.
+"""
+import random, typing
+from datetime import date, timedelta
+
+from models import PuzzleName
+from models.submission import ParsedSubmission
+from utils.submission_parser import SubmissionParser
+
+if typing.TYPE_CHECKING:
+  from handlers.database import BaseDatabaseHandler
+
+GAMES: tuple[PuzzleName, ...] = (PuzzleName.WORDLE, PuzzleName.CONNECTIONS, PuzzleName.STRANDS)
+CONNECTIONS_COLORS: tuple[str, ...] = ('🟨', '🟩', '🟦', '🟪')
+STRANDS_THEMES: tuple[str, ...] = ("Sweet talk", "In the kitchen", "Hit the road", "Bird is the word", "On the menu")
+
+class Player():
+  user_id: int
+  name: str
+  # 0 (struggles) to 1 (always gets it)
+  skill: float
+  # chance of playing a given game on a given day
+  participation: dict[PuzzleName, float]
+  dark_mode: bool
+
+  def __init__(self, user_id: int, name: str, skill: float, participation: dict[PuzzleName, float], dark_mode: bool) -> None:
+    self.user_id = user_id
+    self.name = name
+    self.skill = skill
+    self.participation = participation
+    self.dark_mode = dark_mode
+
+class DatasetGenerator():
+  """
+  `players` players and the last `puzzles` puzzles of each game, up to `today`. On average a
+  player plays a game on `participation` of the days, some much more and some hardly at all.
+  """
+  players: list[Player]
+  puzzles: int
+  seed: int
+
+  _random: random.Random
+  _parser: SubmissionParser
+
+  def __init__(self, players: int = 200, puzzles: int = 365, participation: float = 0.6, seed: int = 1) -> None:
+    self.puzzles = puzzles
+    self.seed = seed
+    self._random = random.Random(seed)
+    self._parser = SubmissionParser()
+
+    self.players = []
+    for i in range(players):
+      habit = min(max(self._random.gauss(participation, 0.25), 0.02), 1.0)
+      self.players.append(Player(
+        100_000_000_000_000_000 + i,
+        f"player{i:05d}",
+        self._random.betavariate(4, 3),
+        {game: min(max(habit + self._random.uniform(-0.2, 0.2), 0.0), 1.0) for game in GAMES},
+        self._random.random() < 0.7,
+      ))
+
+  ####################
+  #  RESULT METHODS  #
+  ####################
+
+  def content(self, game: PuzzleName, player: Player, puzzle_id: int) -> str:
+    """
+    The message `player` would paste after playing `game` puzzle `puzzle_id`.
+    """
+    match game:
+      case PuzzleName.WORDLE:
+        return self.wordle(player, puzzle_id)
+      case PuzzleName.CONNECTIONS:
+        return self.connections(player, puzzle_id)
+      case PuzzleName.STRANDS:
+        return self.strands(player, puzzle_id)
+    raise ValueError(f"No results for {game.value}.")
+
+  def wordle(self, player: Player, puzzle_id: int) -> str:
+    rng = self._random
+    guesses = min(max(round(rng.gauss(5.2 - 2 * player.skill, 1.0)), 1), 7)
+    other = '⬛' if player.dark_mode else '⬜'
+    rows = []
+    for row in range(min(guesses, 6)):
+      if row == guesses - 1:
+        rows.append('🟩' * 5)
+        continue
+      greens = min(rng.randint(0, 1 + row), 4)
+      tiles = ['🟩'] * greens + [rng.choice(('🟨', other, other)) for _ in range(5 - greens)]
+      rng.shuffle(tiles)
+      rows.append(''.join(tiles))
+    hard_mode = '*' if rng.random() < 0.1 else ''
+    return f"Wordle {puzzle_id:,} {guesses if guesses <= 6 else 'X'}/6{hard_mode}\n\n" + '\n'.join(rows)
+
+  def connections(self, player: Player, puzzle_id: int) -> str:
+    rng = self._random
+    mistakes = min(max(round(rng.gauss(2.4 - 2.4 * player.skill, 1.2)), 0), 4)
+    remaining = list(CONNECTIONS_COLORS)
+    rng.shuffle(remaining)
+    rows = []
+    made = 0
+    while len(remaining) > 0 and made < 4:
+      if made < mistakes and rng.random() < 0.5:
+        # three of one group and one of another
+        tiles = [remaining[0]] * 3 + [rng.choice([color for color in CONNECTIONS_COLORS if color != remaining[0]])]
+        rng.shuffle(tiles)
+        rows.append(''.join(tiles))
+        made += 1
+      else:
+        rows.append(remaining.pop(0) * 4)
+    return f"Connections\nPuzzle #{puzzle_id:,}\n" + '\n'.join(rows)
+
+  def strands(self, player: Player, puzzle_id: int) -> str:
+    rng = self._random
+    hints = min(max(round(rng.gauss(2 - 2.5 * player.skill, 1.0)), 0), 5)
+    words = ['🔵'] * rng.randint(6, 8)
+    words.insert(rng.randrange(len(words) + 1), '🟡')
+    for _ in range(hints):
+      words.insert(rng.randrange(len(words) + 1), '💡')
+    rows = [''.join(words[i:i + 4]) for i in range(0, len(words), 4)]
+    return f"Strands #{puzzle_id:,}\n“{rng.choice(STRANDS_THEMES)}”\n" + '\n'.join(rows)
+
+  def results(self, game: PuzzleName, puzzle_ids: typing.Iterable[int]) -> typing.Iterator[tuple[Player, int, str]]:
+    """
+    `(player, puzzle_id, content)` for every result posted for `puzzle_ids`, in posting order.
+    """
+    for puzzle_id in puzzle_ids:
+      for player in self.players:
+        if self._random.random() < player.participation[game]:
+          yield player, puzzle_id, self.content(game, player, puzzle_id)
+
+  ####################
+  #  WRITE METHODS   #
+  ####################
+
+  async def populate(self, games: dict[PuzzleName, "BaseDatabaseHandler"], today: date, batch_size: int = 20_000) -> int:
+    """
+    Writes every player and every result for the last `puzzles` puzzles up to `today` through the
+    handlers' bulk path, then builds ratings and streaks. Returns the number of entries.
+    """
+    utils = next(iter(games.values())).utils
+    await utils.connection.executemany(
+      "insert into users values (?, ?, ?) on conflict do nothing",
+      [(player.user_id, player.name, utils.convert_date_to_str(today)) for player in self.players]
+    )
+    utils.users_version += 1
+
+    total = 0
+    for game, db in games.items():
+      todays_puzzle: int = db.get_puzzle_by_date(today)
+      puzzle_ids = range(todays_puzzle - self.puzzles + 1, todays_puzzle + 1)
+      batch: list[tuple[int, ParsedSubmission, str]] = []
+      for player, puzzle_id, content in self.results(game, puzzle_ids):
+        submission = typing.cast(ParsedSubmission, self._parser.parse(content))
+        posted = utils.convert_date_to_str(today - timedelta(days=todays_puzzle - puzzle_id))
+        batch.append((player.user_id, submission, posted))
+        if len(batch) >= batch_size:
+          await db.write_entries(batch)
+          total += len(batch)
+          batch = []
+      await db.write_entries(batch)
+      total += len(batch)
+      await db.rebuild_derived()
+    return total
@@ -0,0 +1,221 @@
+"""
+Offline stand-ins for the discord.py objects the bot works with: users and members, a guild,
+channels, messages, command contexts and interactions. Anything that would be an API call goes
+through a `FakeHTTP`, so latency and rate limits apply, and what the bot sent is recorded on the
+object it was sent from, with the time it arrived.
+"""
+import asyncio, itertools, time, typing
+from datetime import datetime, timezone
+from PIL import Image
+
+from benchmarks.fake_http import FakeHTTP
+from utils.dispatcher import OutboundDispatcher
+
+if typing.TYPE_CHECKING:
+  from models.table import Table
+
+CHROMEDRIVER: str = '/usr/bin/chromedriver'
+
+_ids = itertools.count(1_250_000_000_000_000_000)
+
+def next_id() -> int:
+  return next(_ids)
+
+def make_http(latency: float = 0.02) -> FakeHTTP:
+  """
+  A `FakeHTTP` with Discord's limits and roughly its latency.
+  """
+  return FakeHTTP(dict(OutboundDispatcher.ROUTE_LIMITS), OutboundDispatcher.GLOBAL_LIMIT, latency)
+
+def placeholder_table(table: "Table | None") -> Image.Image:
+  """
+  A blank image the size of a rendered `table`, for machines without Chrome.
+  """
+  rows = len(table) + 1 if table is not None else 12
+  return Image.new('RGB', (640, 28 * rows), (255, 255, 255))
+
+class Sent():
+  """
+  A message the bot sent: its content, how many files (and bytes) it attached and when it arrived.
+  """
+  content: str | None
+  files: int
+  size: int
+  ephemeral: bool
+  at: float
+
+  def __init__(self, content: str | None, kwargs: dict[str, typing.Any]) -> None:
+    files = list(kwargs.get('files') or [])
+    if kwargs.get('file') is not None:
+      files.append(kwargs['file'])
+    self.content = content
+    self.files = len(files)
+    self.size = sum(len(file.fp.read()) for file in files)
+    self.ephemeral = kwargs.get('ephemeral', False)
+    self.at = time.perf_counter()
+
+class FakeUser():
+  def __init__(self, id: int, name: str, bot: bool = False) -> None:
+    self.id = id
+    self.name = name
+    self.display_name = name
+    self.global_name = name
+    self.bot = bot
+    self.mention = f"<@{id}>"
+
+  def __str__(self) -> str:
+    return self.name
+
+class FakeMember(FakeUser):
+  def __init__(self, user: FakeUser, guild: "FakeGuild") -> None:
+    super().__init__(user.id, user.name, user.bot)
+    self.guild = guild
+
+class FakeGuild():
+  def __init__(self, id: int | None = None, name: str = 'Puzzle Club') -> None:
+    self.id = id or next_id()
+    self.name = name
+    self._members: dict[int, FakeMember] = {}
+
+  @property
+  def members(self) -> list[FakeMember]:
+    return list(self._members.values())
+
+  def add_member(self, user: FakeUser) -> FakeMember:
+    member = self._members[user.id] = FakeMember(user, self)
+    return member
+
+  def get_member(self, user_id: int) -> FakeMember | None:
+    return self._members.get(user_id)
+
+class FakeChannel():
+  def __init__(self, guild: FakeGuild, http: FakeHTTP, id: int | None = None, name: str = 'puzzles') -> None:
+    self.id = id or next_id()
+    self.name = name
+    self.guild = guild
+    self.http = http
+    self.sent: list[Sent] = []
+
+  async def send(self, content: str | None = None, **kwargs: typing.Any) -> "FakeMessage":
+    await self.deliver(content, kwargs)
+    return FakeMessage(self, content or '')
+
+  async def deliver(self, content: str | None, kwargs: dict[str, typing.Any]) -> Sent:
+    await self.http.request('message', self.id)
+    sent = Sent(content, kwargs)
+    self.sent.append(sent)
+    return sent
+
+class FakeMessage():
+  def __init__(self, channel: FakeChannel, content: str = '', author: FakeUser | None = None,
+               created_at: datetime | None = None) -> None:
+    self.id = next_id()
+    self.channel = channel
+    self.guild = channel.guild
+    self.author = author
+    self.content = content
+    self.created_at = created_at or datetime.now(timezone.utc)
+    self.reactions: list[str] = []
+    self.replies: list[Sent] = []
+    # time.perf_counter() when the first reaction arrived
+    self.reacted_at: float | None = None
+    self.reacted = asyncio.Event()
+
+  async def add_reaction(self, emoji: str) -> None:
+    await self.channel.http.request('reaction', self.channel.id)
+    self.reactions.append(emoji)
+    if self.reacted_at is None:
+      self.reacted_at = time.perf_counter()
+      self.reacted.set()
+
+  async def reply(self, content: str | None = None, **kwargs: typing.Any) -> "FakeMessage":
+    self.replies.append(await self.channel.deliver(content, kwargs))
+    return FakeMessage(self.channel, content or '')
+
+class FakeContext():
+  """
+  The context of a prefix command sent as `message`. `answered` is set once anything is sent
+  back, `sent` keeps everything that was.
+  """
+  def __init__(self, bot: typing.Any, command: typing.Any, message: FakeMessage) -> None:
+    self.bot = bot
+    self.command = command
+    self.invoked_with = command.name if command is not None else None
+    self.prefix = '!'
+    self.message = message
+    self.author = message.author
+    self.channel = message.channel
+    self.guild = message.guild
+    self.interaction = None
+    self.sent: list[Sent] = []
+    self.answered = asyncio.Event()
+    # what the command raised, if anything
+    self.error: Exception | None = None
+
+  async def send(self, content: str | None = None, **kwargs: typing.Any) -> FakeMessage:
+    self._record(await self.channel.deliver(content, kwargs))
+    return FakeMessage(self.channel, content or '')
+
+  async def reply(self, content: str | None = None, **kwargs: typing.Any) -> FakeMessage:
+    sent = await self.channel.deliver(content, kwargs)
+    self.message.replies.append(sent)
+    self._record(sent)
+    return FakeMessage(self.channel, content or '')
+
+  async def defer(self, *, ephemeral: bool = False) -> None:
+    # a prefix command has nothing to acknowledge
+    pass
+
+  def _record(self, sent: Sent) -> None:
+    self.sent.append(sent)
+    self.answered.set()
+
+class FakeInteractionResponse():
+  def __init__(self, interaction: "FakeInteraction") -> None:
+    self._interaction = interaction
+    self._done = False
+
+  def is_done(self) -> bool:
+    return self._done
+
+  async def defer(self, *, ephemeral: bool = False, thinking: bool = False) -> None:
+    await self._interaction.http.request('interaction', self._interaction.channel.id)
+    self._done = True
+
+  async def send_message(self, content: str | None = None, **kwargs: typing.Any) -> None:
+    await self._interaction.http.request('interaction', self._interaction.channel.id)
+    self._done = True
+    self._interaction.record(Sent(content, kwargs))
+
+class FakeFollowup():
+  def __init__(self, interaction: "FakeInteraction") -> None:
+    self._interaction = interaction
+
+  async def send(self, content: str | None = None, **kwargs: typing.Any) -> None:
+    await self._interaction.http.request('interaction', self._interaction.channel.id)
+    self._interaction.record(Sent(content, kwargs))
+
+class FakeInteraction():
+  """
+  A context menu or slash command interaction from `user` in `channel`.
+  """
+  def __init__(self, command_name: str, user: FakeUser, channel: FakeChannel) -> None:
+    self.id = next_id()
+    self.command = FakeCommand(command_name)
+    self.user = user
+    self.channel = channel
+    self.guild = channel.guild
+    self.http = channel.http
+    self.response = FakeInteractionResponse(self)
+    self.followup = FakeFollowup(self)
+    self.sent: list[Sent] = []
+    self.answered = asyncio.Event()
+
+  def record(self, sent: Sent) -> None:
+    self.sent.append(sent)
+    self.answered.set()
+
+class FakeCommand():
+  def __init__(self, name: str) -> None:
+    self.name = name
+    self.qualified_name = name
@@ -0,0 +1,77 @@
+"""
+An offline stand-in for Discord's HTTP API with per-route and global rate limits.
+
+Each `(route, channel)` pair and the global limit are fixed windows, like Discord's buckets.
+A request made while its bucket is empty counts as a 429 and then waits for the bucket to
+reset, which is what discord.py does for us after a 429.
+"""
+import asyncio, time
+
+class FakeHTTP():
+  route_limits: dict[str, tuple[int, float]]
+  global_limit: tuple[int, float]
+  latency: float
+
+  requests: int
+  rate_limited: int
+
+  _windows: dict[tuple[str, int], list[float]]
+
+  def __init__(self, route_limits: dict[str, tuple[int, float]], global_limit: tuple[int, float], latency: float = 0.001) -> None:
+    self.route_limits = route_limits
+    self.global_limit = global_limit
+    self.latency = latency
+    self.requests = 0
+    self.rate_limited = 0
+    self._windows = {}
+
+  async def request(self, route: str, channel_id: int) -> None:
+    while True:
+      # routes without a limit of their own (e.g. interaction responses) only count globally
+      route_limit = self.route_limits.get(route)
+      wait = self._take(('global', 0), self.global_limit)
+      if route_limit is not None:
+        wait = max(wait, self._take((route, channel_id), route_limit))
+      if wait <= 0:
+        break
+      self.rate_limited += 1
+      await asyncio.sleep(wait)
+
+    self.requests += 1
+    await asyncio.sleep(self.latency)
+
+  def _take(self, key: tuple[str, int], limit: tuple[int, float]) -> float:
+    # window = [remaining, reset_at]
+    now = time.monotonic()
+    window = self._windows.get(key)
+    if window is None or now >= window[1]:
+      window = self._windows[key] = [limit[0], now + limit[1]]
+    if window[0] <= 0:
+      return window[1] - now
+    window[0] -= 1
+    return 0.0
+
+class FakeChannel():
+  def __init__(self, id: int) -> None:
+    self.id = id
+
+class FakeMessage():
+  def __init__(self, id: int, channel: FakeChannel, http: FakeHTTP, content: str = '', author=None) -> None:
+    self.id = id
+    self.channel = channel
+    self.content = content
+    self.author = author
+    self.reactions: list[str] = []
+    self.replies: list[str] = []
+    # time.perf_counter() when the last reply was delivered
+    self.replied_at: float | None = None
+    self._http = http
+
+  async def add_reaction(self, emoji: str) -> None:
+    await self._http.request('reaction', self.channel.id)
+    self.reactions.append(emoji)
+
+  async def reply(self, content: str, **kwargs) -> None:
+    await self._http.request('message', self.channel.id)
+    self.replies.append(content)
+    self.replied_at = time.perf_counter()
@@ -0,0 +1,334 @@
+"""
+Load-tests the real `DiscordBot` (cogs, ingestion, handlers, database) offline. The bot is
+started against a generated server in a scratch database (see `benchmarks.dataset`) and the
+gateway is replaced by `benchmarks.fake_discord`: a seeded script of puzzle submissions and
+commands is replayed at `--rate` events per second, and the time until each submission got its
+✅ and each command its first reply is reported per kind, with error counts.
+
+  python -m benchmarks.load [--rate 20] [--duration 30] [--command-share 0.2]
+                            [--players 200] [--puzzles 90] [--output load.json]
+
+`LoadHarness` can also be used on its own to drive the bot from a test.
+"""
+import argparse, asyncio, contextlib, json, os, random, statistics, tempfile, time, typing
+from datetime import timedelta
+from discord.ext import commands
+
+from benchmarks.dataset import GAMES, DatasetGenerator
+from benchmarks.fake_discord import (
+  CHROMEDRIVER, FakeChannel, FakeContext, FakeGuild, FakeInteraction, FakeMember, FakeMessage, FakeUser,
+  make_http, next_id, placeholder_table,
+)
+from benchmarks.fake_http import FakeHTTP
+from utils.responder import DeferredResponder
+
+if typing.TYPE_CHECKING:
+  from bot import DiscordBot
+
+# (weight, command, arguments), the arguments for `stats`/`missing`/... are a game
+COMMAND_MIX: list[tuple[int, str, tuple[str, ...]]] = [
+  (6, 'ranks', ('wordle', '')), (3, 'ranks', ('wordle', 'today')), (2, 'ranks', ('wordle', 'all-time')),
+  (3, 'ranks', ('connections', '')), (2, 'ranks', ('strands', '')), (1, 'ranks', ('wordle', 'rating')),
+  (3, 'ranks', ('all', '')), (1, 'ranks', ('all', 'all-time')),
+  (3, 'stats', ('wordle',)), (1, 'stats', ('connections',)), (1, 'stats', ('strands',)),
+  (2, 'missing', ('wordle',)), (1, 'streaks', ('wordle',)), (1, 'entries', ()),
+  (1, 'versus', ('wordle',)),
+]
+# replies that mean a command failed
+FAILURE_REPLIES: set[str] = {DeferredResponder.TIMEOUT_MESSAGE, DeferredResponder.ERROR_MESSAGE}
+
+class LoadHarness():
+  """
+  The real bot wired to a fake guild and channel instead of a gateway. Use it as an async context
+  manager: it starts the bot's database, ingestion and cogs on entry, and closes the bot (which
+  waits for queued work) on exit.
+  """
+  database: str
+  metrics: bool
+  http: FakeHTTP
+  guild: FakeGuild
+  channel: FakeChannel
+  bot: "DiscordBot"
+
+  _stack: contextlib.AsyncExitStack
+
+  def __init__(self, database: str, http_latency: float = 0.02, metrics: bool = False) -> None:
+    self.database = database
+    self.metrics = metrics
+    self.http = make_http(http_latency)
+    self.guild = FakeGuild()
+    self.channel = FakeChannel(self.guild, self.http)
+    self._stack = contextlib.AsyncExitStack()
+
+  async def __aenter__(self) -> "LoadHarness":
+    # imported here so that callers can set LOG_LEVEL and friends first
+    from bot import DiscordBot
+
+    self.bot = DiscordBot()
+    self.bot.metrics.enabled = self.metrics
+    await self._stack.enter_async_context(self.bot)
+    if not await self.bot.init_db(self.database):
+      raise RuntimeError(f"Couldn't open {self.database}.")
+
+    # what the gateway would have filled in on connect
+    self.bot._connection.user = FakeUser(next_id(), 'NYT Games Bot', bot=True) # type: ignore
+    self.bot._connection._guilds[self.guild.id] = self.guild # type: ignore
+    if not os.path.exists(CHROMEDRIVER):
+      self.bot.utils.get_image_from_table = placeholder_table # type: ignore
+
+    self.bot.watchdog.start()
+    self.bot.ingestion.start()
+    await self.bot.load_extension('cogs.members')
+    return self
+
+  async def __aexit__(self, *exc_info: typing.Any) -> None:
+    await self._stack.aclose()
+
+  def add_member(self, user_id: int, name: str) -> FakeMember:
+    member = self.guild.add_member(FakeUser(user_id, name))
+    self.bot.utils.names.on_member_join(member) # type: ignore
+    return member
+
+  ####################
+  #  ACTION METHODS  #
+  ####################
+
+  async def post(self, author: FakeMember, content: str) -> FakeMessage:
+    """
+    `author` posts `content` in the channel.
+    """
+    message = FakeMessage(self.channel, content, author)
+    await self.bot.on_message(message) # type: ignore
+    return message
+
+  async def invoke(self, name: str, *args: str, author: FakeMember) -> FakeContext:
+    """
+    Runs a prefix command the way discord.py does once it has parsed the message (without its
+    checks and argument conversion), including the bot's command hooks.
+    """
+    command = self.bot.get_command(name)
+    if command is None:
+      raise ValueError(f"No command named `{name}`.")
+
+    ctx = FakeContext(self.bot, command, FakeMessage(self.channel, f"!{name} {' '.join(args)}".strip(), author))
+    await self.bot.on_command(ctx) # type: ignore
+    try:
+      await command.callback(command.cog, ctx, *args) # type: ignore
+    except Exception as e:
+      ctx.error = e
+      with contextlib.suppress(commands.CommandInvokeError):
+        await self.bot.on_command_error(ctx, commands.CommandInvokeError(e)) # type: ignore
+    else:
+      await self.bot.on_command_completion(ctx) # type: ignore
+    return ctx
+
+  async def add_puzzle_entry(self, message: FakeMessage, user: FakeMember) -> FakeInteraction:
+    """
+    `user` adds `message` through the "Add Puzzle Entry" context menu.
+    """
+    interaction = FakeInteraction('Add Puzzle Entry', user, self.channel)
+    cog = typing.cast(typing.Any, self.bot.get_cog('members-cog'))
+    await cog.add_puzzle_entry(interaction, message)
+    return interaction
+
+  async def settle(self, timeout: float = 120.0) -> bool:
+    """
+    Waits (up to `timeout` seconds) until no responses, ingestion or outbound requests are left,
+    rather than leaving it to `close()`, which gives up on them sooner. Returns whether it did.
+    """
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+      ingestion = self.bot.ingestion.stats()
+      if (self.bot.responder.stats()['running'] == 0 and ingestion['enqueued'] == ingestion['processed'] + ingestion['failed']
+          and self.bot.dispatcher.stats()['pending'] == 0):
+        return True
+      await asyncio.sleep(0.05)
+    return False
+
+class Event():
+  """
+  One step of the script: a submission or a command, `at` seconds after the start.
+  """
+  at: float
+  kind: str
+  author: FakeMember
+  content: str
+  command: str
+  args: tuple[str, ...]
+
+  # filled in when it runs
+  started: float
+  target: FakeMessage | FakeContext | None
+
+  def __init__(self, at: float, kind: str, author: FakeMember, content: str = '',
+               command: str = '', args: tuple[str, ...] = ()) -> None:
+    self.at = at
+    self.kind = kind
+    self.author = author
+    self.content = content
+    self.command = command
+    self.args = args
+    self.started = 0.0
+    self.target = None
+
+  def finished_at(self) -> float | None:
+    if isinstance(self.target, FakeMessage):
+      return self.target.reacted_at
+    if isinstance(self.target, FakeContext) and len(self.target.sent) > 0:
+      return self.target.sent[0].at
+    return None
+
+  def failed(self) -> bool:
+    if self.finished_at() is None:
+      return True
+    if isinstance(self.target, FakeContext):
+      return self.target.error is not None or any(sent.content in FAILURE_REPLIES for sent in self.target.sent)
+    return False
+
+def build_script(harness: LoadHarness, dataset: DatasetGenerator, members: dict[int, FakeMember],
+                 rate: float, duration: float, command_share: float, seed: int) -> list[Event]:
+  """
+  `rate * duration` events: today's (and, if that runs out, the following days') results in a
+  shuffled order, with commands from random players mixed in.
+  """
+  rng = random.Random(seed)
+  today = harness.bot.utils.get_todays_date()
+  todays_puzzles = {game: harness.bot.games[game].db.get_puzzle_by_date(today) for game in GAMES}
+  weights, mix = zip(*[(weight, (command, args)) for weight, command, args in COMMAND_MIX])
+
+  def submissions() -> typing.Iterator[tuple[int, str]]:
+    day = 0
+    while True:
+      results = [
+        (player.user_id, content) for game in GAMES
+        for player, _, content in dataset.results(game, [todays_puzzles[game] + day])
+      ]
+      rng.shuffle(results)
+      yield from results
+      day += 1
+
+  pending = submissions()
+  script: list[Event] = []
+  players = list(members.values())
+  for i in range(int(rate * duration)):
+    if rng.random() < command_share:
+      command, args = rng.choices(mix, weights)[0]
+      script.append(Event(i / rate, f"{command} {' '.join(args)}".strip(), rng.choice(players), command=command, args=args))
+    else:
+      user_id, content = next(pending)
+      script.append(Event(i / rate, 'submission', members[user_id], content))
+  return script
+
+async def run_event(harness: LoadHarness, event: Event) -> None:
+  event.started = time.perf_counter()
+  if event.kind == 'submission':
+    event.target = await harness.post(event.author, event.content)
+  else:
+    args = tuple(arg for arg in event.args if arg)
+    event.target = await harness.invoke(event.command, *args, author=event.author)
+
+async def replay(harness: LoadHarness, script: list[Event]) -> float:
+  """
+  Starts every event on schedule, whether or not earlier ones have finished. Returns how long
+  starting them took.
+  """
+  started = time.perf_counter()
+  tasks: list[asyncio.Task] = []
+  for event in script:
+    delay = started + event.at - time.perf_counter()
+    if delay > 0:
+      await asyncio.sleep(delay)
+    tasks.append(asyncio.create_task(run_event(harness, event)))
+  await asyncio.gather(*tasks)
+  return time.perf_counter() - started
+
+def summarize(script: list[Event]) -> dict[str, dict[str, float | int]]:
+  kinds: dict[str, list[Event]] = {}
+  for event in script:
+    kinds.setdefault(event.kind, []).append(event)
+
+  summary: dict[str, dict[str, float | int]] = {}
+  for kind, events in sorted(kinds.items(), key = lambda item: -len(item[1])):
+    latencies = sorted(
+      (finished - event.started) * 1000 for event in events
+      if not event.failed() and (finished := event.finished_at()) is not None
+    )
+    percentiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    summary[kind] = {
+      'count': len(events),
+      'errors': sum(1 for event in events if event.failed()),
+      'p50_ms': round(percentiles[49], 2) if len(percentiles) > 0 else 0.0,
+      'p95_ms': round(percentiles[94], 2) if len(percentiles) > 0 else 0.0,
+      'p99_ms': round(percentiles[98], 2) if len(percentiles) > 0 else 0.0,
+      'max_ms': round(latencies[-1], 2) if len(latencies) > 0 else 0.0,
+    }
+  return summary
+
+def parse_args() -> argparse.Namespace:
+  parser = argparse.ArgumentParser(prog='python -m benchmarks.load', description="Load-test the bot offline.")
+  parser.add_argument('--rate', type=float, default=20, help="events started per second")
+  parser.add_argument('--duration', type=float, default=30, help="seconds of events")
+  parser.add_argument('--command-share', type=float, default=0.2, help="share of events that are commands")
+  parser.add_argument('--players', type=int, default=200)
+  parser.add_argument('--puzzles', type=int, default=90, help="puzzles of history before today")
+  parser.add_argument('--seed', type=int, default=1)
+  parser.add_argument('--http-latency', type=float, default=0.02, help="seconds per fake API request")
+  parser.add_argument('--settle', type=float, default=120, help="seconds to wait for queued work afterwards")
+  parser.add_argument('--metrics', action='store_true', help="also print the bot's own latency metrics")
+  parser.add_argument('--output', help="write the results to this JSON file")
+  return parser.parse_args()
+
+async def main(args: argparse.Namespace) -> None:
+  dataset = DatasetGenerator(args.players, args.puzzles, seed=args.seed)
+  with tempfile.TemporaryDirectory() as directory:
+    harness = LoadHarness(os.path.join(directory, 'load.db'), args.http_latency, args.metrics)
+    async with harness:
+      bot = harness.bot
+      members = {player.user_id: harness.add_member(player.user_id, player.name) for player in dataset.players}
+      yesterday = bot.utils.get_todays_date() - timedelta(days=1)
+      entries = await dataset.populate({game: bot.games[game].db for game in GAMES}, yesterday)
+      print(f"Generated {len(members)} players and {entries:,} entries.")
+
+      script = build_script(harness, dataset, members, args.rate, args.duration, args.command_share, args.seed)
+      print(f"Replaying {len(script)} events at {args.rate:g}/s...")
+      elapsed = await replay(harness, script)
+      drain_started = time.perf_counter()
+      if not await harness.settle(args.settle):
+        print(f"Work still queued after {args.settle:g}s, counting it as errors.")
+      drained = time.perf_counter() - drain_started
+
+    stats = {
+      'ingestion': bot.ingestion.stats(),
+      'outbound': bot.dispatcher.stats(),
+      'responses': bot.responder.stats(),
+      'single_flight': bot.utils.single_flight.stats(),
+      'loop': bot.watchdog.stats(),
+      'http': {'requests': harness.http.requests, 'rate_limited': harness.http.rate_limited},
+    }
+    summary = summarize(script)
+
+  print(f"Started {len(script)} events in {elapsed:.1f}s ({len(script) / elapsed:.1f}/s), drained in {drained:.1f}s.\n")
+  print(f"{'kind':<24} {'count':>6} {'errors':>6} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}")
+  for kind, row in summary.items():
+    print(
+      f"{kind:<24} {row['count']:>6} {row['errors']:>6} {row['p50_ms']:>8.1f}ms {row['p95_ms']:>8.1f}ms "
+      f"{row['p99_ms']:>8.1f}ms {row['max_ms']:>8.1f}ms"
+    )
+  print()
+  for name, values in stats.items():
+    print(f"{name}: {values}")
+
+  if args.metrics:
+    print(f"\n{'series':<42} {'count':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for series, count, p50, p95, p99, _ in bot.metrics.summary()[:20]:
+      print(f"{series[:42]:<42} {count:>7} {p50 * 1000:>6.1f}ms {p95 * 1000:>6.1f}ms {p99 * 1000:>6.1f}ms")
+
+  if args.output:
+    with open(args.output, 'w', encoding='utf-8') as file:
+      json.dump({'args': vars(args), 'results': summary, 'stats': stats}, file, indent=2)
+    print(f"\nWrote {args.output}.")
+
+if __name__ == '__main__':
+  # the bot logs every command at INFO, which would drown out the report
+  os.environ.setdefault('LOG_LEVEL', 'WARNING')
+  asyncio.run(main(parse_args()))
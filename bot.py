@@ -1,15 +1,28 @@
+import time
+# taken before anything else is imported, so the startup report includes imports
+STARTED = time.perf_counter()
+
 from typing import cast
-import aiosqlite, asyncio, os, discord, logging, platform, random, traceback
+import aiosqlite, asyncio, os, discord, platform, random, sys, traceback
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
 
-from handlers.commands.connections import ConnectionsCommandHandler
-from handlers.commands.strands import StrandsCommandHandler
-from handlers.commands.wordle import WordleCommandHandler
 from models import PuzzleName
+from utils.bot_logging import setup_logging
+from utils.backfill import HistoryBackfill
 from utils.bot_typing import MyBotType
-from utils.bot_utilities import BotUtilities, DiscordReactions
+from utils.bot_utilities import BotUtilities
+from utils.dispatcher import OutboundDispatcher
+from utils.hot_reload import RESTART_EXIT_CODE, HotReloader
+from utils.ingestion import IngestionPipeline
+from utils.metrics import Metrics
+from utils.profiler import Profiler
+from utils.responder import DeferredResponder
+from utils.watchdog import LoopWatchdog
 from utils.help_handler import HelpMenuHandler
+from utils.lazy_import import preload
+
+IMPORTED = time.perf_counter()
 
 # parse environment variables
 try:
@@ -21,54 +34,24 @@ TOKEN = os.getenv('TOKEN', 'XXXX')
 DISCORD_ENV = os.getenv('DISCORD_ENV', 'prod')
 APPLICATION_ID = int(os.getenv('CLIENT_ID', -1))
 INVITE_LINK = os.getenv("INVITE_LINK")
-
-class LoggingFormatter(logging.Formatter):
-  # Colors
-  black = "\x1b[30m"
-  red = "\x1b[31m"
-  green = "\x1b[32m"
-  yellow = "\x1b[33m"
-  blue = "\x1b[34m"
-  gray = "\x1b[38m"
-  # Styles
-  reset = "\x1b[0m"
-  bold = "\x1b[1m"
-
-  COLORS = {
-    logging.DEBUG: gray + bold,
-    logging.INFO: blue + bold,
-    logging.WARNING: yellow + bold,
-    logging.ERROR: red,
-    logging.CRITICAL: red + bold,
-  }
-
-  def format(self, record):
-    log_color = self.COLORS[record.levelno]
-    format = "(black){asctime}(reset) (levelcolor){levelname:<8}(reset) (green){name}(reset) {message}"
-    format = format.replace("(black)", self.black + self.bold)
-    format = format.replace("(reset)", self.reset)
-    format = format.replace("(levelcolor)", log_color)
-    format = format.replace("(green)", self.green + self.bold)
-    formatter = logging.Formatter(format, "%Y-%m-%d %H:%M:%S", style="{")
-    return formatter.format(record)
+INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', 2))
+INGEST_QUEUE_SIZE = int(os.getenv('INGEST_QUEUE_SIZE', 500))
+BACKFILL_CHANNELS = [int(channel_id) for channel_id in os.getenv('BACKFILL_CHANNELS', '').split(',') if channel_id.strip()]
+BACKFILL_DAYS = int(os.getenv('BACKFILL_DAYS', 7))
+COMMAND_TIMEOUT = float(os.getenv('COMMAND_TIMEOUT', 30))
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() in ['1', 'true', 'yes']
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+LOOP_LAG_THRESHOLD = float(os.getenv('LOOP_LAG_THRESHOLD', 0.5))
+LOOP_DEBUG = os.getenv('LOOP_DEBUG', 'false').lower() in ['1', 'true', 'yes']
+HOT_RELOAD = os.getenv('HOT_RELOAD', 'false').lower() in ['1', 'true', 'yes']
+
+ROOT = os.path.realpath(os.path.dirname(__file__))
+DATABASE = f"{ROOT}/database/database.db"
 
 # setup logging
-logger = logging.getLogger("DiscordBot")
-logger.setLevel(logging.DEBUG)
-
-# Console handler
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(LoggingFormatter())
-# File handler
-file_handler = logging.FileHandler(filename="discord.log", encoding="utf-8", mode="w")
-file_handler_formatter = logging.Formatter(
-    "[{asctime}] [{levelname:<8}] {name}: {message}", "%Y-%m-%d %H:%M:%S", style="{"
-)
-file_handler.setFormatter(file_handler_formatter)
-
-# Add the handlers
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+logger, log_listener = setup_logging("DiscordBot", "discord.log", 'DEBUG' if DISCORD_ENV == 'dev' else 'INFO')
 
 # build Discord client
 intents = discord.Intents.default()
@@ -77,6 +60,8 @@ intents.guilds = True
 intents.messages = True
 intents.guild_messages = True
 intents.guild_reactions = True
+# privileged, lets `MemberNameResolver` see member joins and name changes
+intents.members = True
 client = discord.Client(intents=intents)
 
 class DiscordBot(commands.Bot):
@@ -102,36 +87,106 @@ class DiscordBot(commands.Bot):
       self.invite_link = INVITE_LINK
       self.guild_id = int(os.getenv('GUILD_ID', -1))
       self.help_menu = HelpMenuHandler()
-
-    async def init_db(self) -> bool:
+      self.metrics = Metrics(METRICS_ENABLED)
+      self.profiler = Profiler(self, PROFILE_DIR) # type: ignore
+      self.watchdog = LoopWatchdog(self, threshold=LOOP_LAG_THRESHOLD) # type: ignore
+      self.ingestion = IngestionPipeline(self, INGEST_WORKERS, INGEST_QUEUE_SIZE) # type: ignore
+      self.dispatcher = OutboundDispatcher(self) # type: ignore
+      self.responder = DeferredResponder(self, COMMAND_TIMEOUT) # type: ignore
+      self.reloader = HotReloader(self, ROOT) # type: ignore
+      self._close_task: asyncio.Task | None = None
+      # time.perf_counter() at each step of starting up, see report_startup()
+      self.startup: dict[str, float] = {'started': STARTED, 'imported': IMPORTED}
+
+    async def init_db(self, database: str = DATABASE) -> bool:
       try:
-        async with aiosqlite.connect(
-          f"{os.path.realpath(os.path.dirname(__file__))}/database/database.db"
-        ) as db:
-          with open(
-            f"{os.path.realpath(os.path.dirname(__file__))}/database/schema.sql",
-            encoding = "utf-8"
-          ) as file:
+        async with aiosqlite.connect(database) as db:
+          with open(f"{ROOT}/database/schema.sql", encoding = "utf-8") as file:
             await db.executescript(file.read())
           await db.commit()
-          connection: aiosqlite.Connection = await aiosqlite.connect(
-            f"{os.path.realpath(os.path.dirname(__file__))}/database/database.db",
-
-          )
+          connection: aiosqlite.Connection = await aiosqlite.connect(database)
 
         self.logger.info("Database loaded & successfully logged in.")
 
         self.utils = BotUtilities(client, self, connection) # type: ignore
-
-        # create games
-        self.connections = ConnectionsCommandHandler(self.utils)
-        self.strands = StrandsCommandHandler(self.utils)
-        self.wordle = WordleCommandHandler(self.utils)
+        self.init_handlers()
+        self.backfill = HistoryBackfill(self, BACKFILL_CHANNELS, BACKFILL_DAYS) # type: ignore
+        self.init_metrics()
         return True
       except Exception as e:
         self.logger.error(f"Failed to load database: {e}")
         return False
 
+    def init_handlers(self) -> None:
+      """
+      Creates the games and the submission log around `self.utils`. The hot reloader calls this
+      again after importing the handler modules anew.
+      """
+      # imported here so that a hot reload picks up the new classes
+      from handlers.commands.combined import CombinedCommandHandler
+      from handlers.commands.connections import ConnectionsCommandHandler
+      from handlers.commands.strands import StrandsCommandHandler
+      from handlers.commands.wordle import WordleCommandHandler
+      from handlers.database.submissions import SubmissionsDatabaseHandler
+
+      # create games
+      connections = ConnectionsCommandHandler(self.utils)
+      strands = StrandsCommandHandler(self.utils)
+      wordle = WordleCommandHandler(self.utils)
+      combined = CombinedCommandHandler(self.utils, [wordle.db, connections.db, strands.db])
+      submissions = SubmissionsDatabaseHandler(self.utils)
+
+      self.connections, self.strands, self.wordle, self.combined = connections, strands, wordle, combined
+      self.games = {
+        PuzzleName.CONNECTIONS: self.connections,
+        PuzzleName.STRANDS: self.strands,
+        PuzzleName.WORDLE: self.wordle,
+      }
+      self.submissions = submissions
+      for game in [*self.games.values(), self.combined]:
+        self.metrics.instrument(game.db, 'db_query_seconds', handler=game.__class__.__name__.removesuffix('CommandHandler').lower())
+      self.metrics.instrument(self.submissions, 'db_query_seconds', handler='submissions')
+
+    def init_metrics(self) -> None:
+      self.metrics.instrument(
+        self.utils, 'render_seconds', ['get_image_from_table', 'fig_to_image', 'combine_images', 'resize_image'], label='step'
+      )
+      self.metrics.add_collector('ingestion', self.ingestion.stats)
+      self.metrics.add_collector('outbound', self.dispatcher.stats)
+      self.metrics.add_collector('responses', self.responder.stats)
+      self.metrics.add_collector('single_flight', self.utils.single_flight.stats)
+      self.metrics.add_collector('loop', self.watchdog.stats)
+      self.metrics.add_collector('startup', self.startup_stats)
+      self.metrics.add_collector('hot_reload', self.reloader.stats)
+
+    def startup_stats(self) -> dict[str, float]:
+      """
+      Seconds spent on each step of starting up that has happened so far.
+      """
+      steps = [('imports', 'started', 'imported'), ('login', 'imported', 'logged_in'),
+               ('setup', 'logged_in', 'set_up'), ('connect', 'set_up', 'ready'), ('total', 'started', 'ready')]
+      return {
+        f"{name}_seconds": round(self.startup[end] - self.startup[start], 3)
+        for name, start, end in steps if start in self.startup and end in self.startup
+      }
+
+    def report_startup(self) -> None:
+      stats = self.startup_stats()
+      self.logger.info(
+        "Ready in %.2fs (imports %.2fs, login %.2fs, setup %.2fs, connecting %.2fs).",
+        stats.get('total_seconds', 0.0), stats.get('imports_seconds', 0.0), stats.get('login_seconds', 0.0),
+        stats.get('setup_seconds', 0.0), stats.get('connect_seconds', 0.0)
+      )
+
+    async def preload_renderers(self) -> None:
+      try:
+        timings = await asyncio.to_thread(preload)
+      except Exception as e:
+        self.logger.warning(f"Failed to preload rendering libraries: {e}")
+        return
+      if len(timings) > 0:
+        self.logger.info("Preloaded %s in %.2fs.", ', '.join(timings), sum(timings.values()))
+
     @tasks.loop(minutes=1.0)
     async def status_task(self) -> None:
         """
@@ -157,8 +212,17 @@ class DiscordBot(commands.Bot):
         f"Running on: {platform.system()} {platform.release()}"
       )
       self.logger.info("-------------------")
+      self.startup['logged_in'] = time.perf_counter()
+      self.watchdog.start(LOOP_DEBUG)
       if not await self.init_db():
         return
+      self.ingestion.start()
+      if self.metrics.enabled and METRICS_PORT > 0:
+        try:
+          await self.metrics.start_server(METRICS_HOST, METRICS_PORT)
+          self.logger.info(f"Serving metrics at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+        except OSError as e:
+          self.logger.error(f"Failed to start the metrics server: {e}")
 
       for extension in ['cogs.members', 'cogs.owner']:
         try:
@@ -177,13 +241,22 @@ class DiscordBot(commands.Bot):
         self.logger.debug(f"Slash commands synced for guild ID {self.guild_id}.")
       except Exception as e:
         self.logger.error(f"Failed to sync slash commands for guild ID {self.guild_id}.\n{e}")
+      if HOT_RELOAD:
+        self.reloader.start()
+      self.startup['set_up'] = time.perf_counter()
 
     @client.event
     async def on_ready(self):
       if self.user is not None:
         self.logger.info(f"Logged in as {self.user.name}")
         self.logger.debug(f'{self.user} has connected to Discord!')
-        # TODO: check for new messages in chat history and add them to the database
+        if 'ready' not in self.startup:
+          self.startup['ready'] = time.perf_counter()
+          self.report_startup()
+          # import the rendering libraries now rather than during the first command
+          asyncio.create_task(self.preload_renderers())
+        # catch up on messages sent while the bot was offline
+        self.backfill.start_catch_up()
       else:
         self.logger.warning("self.user is None in on_ready()")
 
@@ -195,41 +268,25 @@ class DiscordBot(commands.Bot):
       self.logger.debug("*** on_message() ***")
       user = message.author
       app_user_id = self.user.id
-      self.logger.debug(f"Message from {message.author}: {message.content}")
-      content_length: int = message.content.count("\n")
-      self.logger.debug(f"user_id: {user} | content_length: {content_length} | is_bot: {user.id == app_user_id}")
+      self.logger.debug("Message from %s: %s", message.author, message.content)
       if user.id == app_user_id:
         self.logger.debug("Ignoring message from bot itself...")
         # ignore messages from the bot itself
         return
 
-      try:
-        if content_length >= 2:
-          # parse non-puzzle lines from message
-          first_line = message.content.splitlines()[0].strip()
-          first_two_lines = '\n'.join(message.content.splitlines()[:2])
-          content: str = ''
-          if PuzzleName.CONNECTIONS.value in first_line and self.utils.is_connections_submission(first_two_lines):
-            self.logger.debug("Connections puzzle submitted.")
-            content = '\n'.join(message.content.splitlines()[2:])
-            if await self.connections.add_entry(user, first_two_lines, content):
-              await message.add_reaction(DiscordReactions['checkmark'])
-          elif PuzzleName.STRANDS.value in first_line and self.utils.is_strands_submission(first_two_lines):
-            self.logger.debug("Strands puzzle submitted.")
-            content = '\n'.join(message.content.splitlines()[2:])
-            if await self.strands.add_entry(user, first_two_lines, content):
-              await message.add_reaction(DiscordReactions['checkmark'])
-          elif PuzzleName.WORDLE.value in first_line and self.utils.is_wordle_submission(first_line):
-            self.logger.debug("Wordle puzzle submitted.")
-            content = '\n'.join(message.content.splitlines()[1:])
-            if await self.wordle.add_entry(user, first_line, content):
-              await message.add_reaction(DiscordReactions['checkmark'])
-        else:
-          self.logger.info("Non-puzzle message received.")
-          # await self.process_commands(message)
+      # parsing, the database write and the reaction happen on the ingestion workers
+      if not await self.ingestion.submit(message):
+        self.logger.info("Non-puzzle message received.")
+        # await self.process_commands(message)
 
-      except Exception as e:
-        raise e
+    async def on_member_join(self, member: discord.Member) -> None:
+      self.utils.names.on_member_join(member)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
+      self.utils.names.on_member_update(after)
+
+    async def on_command(self, context: commands.Context) -> None:
+      self.metrics.command_started(context)
 
     async def on_command_completion(self, context: commands.Context) -> None:
       """
@@ -237,6 +294,7 @@ class DiscordBot(commands.Bot):
 
       :param context: The context of the command that has been executed.
       """
+      self.metrics.command_finished(context)
       if context.command is None:
         self.logger.warning("`context.command` is `None` in on_command_completion()")
         return
@@ -260,6 +318,7 @@ class DiscordBot(commands.Bot):
         :param context: The context of the normal command that failed executing.
         :param error: The error that has been faced.
         """
+        self.metrics.command_finished(context, error=True)
         if isinstance(error, commands.CommandOnCooldown):
           minutes, seconds = divmod(error.retry_after, 60)
           hours, minutes = divmod(minutes, 60)
@@ -310,13 +369,35 @@ class DiscordBot(commands.Bot):
 
     async def close(self) -> None:
       """
-      This is called when the bot is closed.
+      This is called when the bot is closed. Both the hot reloader and main() close the bot, so a
+      second call waits for the first one to finish.
       """
+      if self._close_task is None:
+        self._close_task = asyncio.create_task(self._close())
+      await asyncio.shield(self._close_task)
+
+    async def _close(self) -> None:
+      await self.reloader.close()
+      # safe to interrupt, the next catch-up resumes from the last checkpoint
+      await self.backfill.cancel()
+      if self.profiler.active:
+        await self.profiler.stop()
+      self.logger.info("Finishing command responses...")
+      await self.responder.close()
+      self.logger.info("Draining the ingestion queue...")
+      await self.ingestion.close()
+      self.logger.info("Sending queued reactions and replies...")
+      await self.dispatcher.close()
+      await self.metrics.close()
+      await self.watchdog.close()
+
       if self.utils.connection:
         self.logger.info("Closing the database connection...")
         try:
-          await self.utils.connection.commit()
-          await self.utils.connection.close()
+          # after any write still in progress, rather than committing half of it
+          async with self.utils.write_lock:
+            await self.utils.connection.commit()
+            await self.utils.connection.close()
         except Exception as e:
           self.logger.error(f"Failed to close the database connection: {e}")
           raise e
@@ -329,7 +410,7 @@ class DiscordBot(commands.Bot):
         self.logger.error(f"Failed to close the bot: {e}")
         raise e
 
-async def main() -> None:
+async def main() -> int:
   bot = DiscordBot()
 
   try:
@@ -348,9 +429,13 @@ async def main() -> None:
     traceback.print_exception(e)
   finally:
     await bot.close()
+    # flush any queued log records
+    log_listener.stop()
+  # `_reload.py` starts the bot again when it exits with this
+  return RESTART_EXIT_CODE if bot.reloader.restart_requested else 0
 
 if __name__ == "__main__":
   if platform.system() == 'Windows':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-  asyncio.run(main())
+  sys.exit(asyncio.run(main()))
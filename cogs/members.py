@@ -47,7 +47,7 @@ class MembersCog(commands.Cog, name="members-cog"):
     self.bot.tree.remove_command(self.ctx_menu.name, type=self.ctx_menu.type)
 
   async def add_puzzle_entry(self, interaction: discord.Interaction, message: discord.Message) -> None:
-      self.bot.logger.debug(f"add_puzzle_entry() :: {interaction}\n{message}")
+      self.bot.logger.debug("add_puzzle_entry() :: %s\n%s", interaction, message)
 
       if interaction is None or message is None:
         self.bot.logger.error(f"Interaction and Message cannot be `None`")
@@ -60,38 +60,22 @@ class MembersCog(commands.Cog, name="members-cog"):
 
       content = message.content
       user = typing.cast(discord.User, message.author)
-      self.bot.logger.debug(f"{content}\n<{user}>")
-
-      puzzle_type: str = ''
-      try:
-        if self.utils.is_connections_submission(content):
-          await self.connections.add_score(message, user, content)
-          puzzle_type = PuzzleName.CONNECTIONS.value
-        elif self.utils.is_strands_submission(content):
-          await self.strands.add_score(message, user, content)
-          puzzle_type = PuzzleName.STRANDS.value
-        elif self.utils.is_wordle_submission(content):
-          await self.wordle.add_score(message, user, content)
-          puzzle_type = PuzzleName.WORDLE.value
-        else:
-          await interaction.response.send_message(
-            content=f"Unknown puzzle type, couldn't add puzzle.",
-            ephemeral=True,
-            delete_after=60,
-          )
-          return
+      self.bot.logger.debug("%s\n<%s>", content, user)
 
+      submission = self.utils.parser.parse(content)
+      if submission is None:
         await interaction.response.send_message(
-          content=f"{puzzle_type} puzzle added succesfully!",
-          ephemeral=True,
-          delete_after=5,
-        )
-      except Exception as e:
-        await interaction.response.send_message(
-          content=f"An error ocurred: {e}",
+          content=f"Unknown puzzle type, couldn't add puzzle.",
           ephemeral=True,
           delete_after=60,
         )
+        return
+
+      # the write happens after the interaction is acknowledged
+      async def work() -> None:
+        await self.bot.games[submission.game].add_score(message, user, submission)
+        await interaction.followup.send(content=f"{submission.game.value} puzzle added succesfully!", ephemeral=True)
+      await self.bot.responder.respond_to_interaction(interaction, work)
 
 
   #####################
@@ -111,20 +95,22 @@ class MembersCog(commands.Cog, name="members-cog"):
     description='Show ranks of players in the server'
   )
   @app_commands.describe(
-    puzzle_type="The puzzle type to get ranks for."
+    puzzle_type="The puzzle type to get ranks for, or `all` for a combined leaderboard.",
+    query="today, weekly, 10-day, all-time, rating, a puzzle # or a Sunday (MM/DD/YYYY)."
   )
-  async def get_ranks(self, ctx: commands.Context, puzzle_type: str = '') -> None:
-    try:
+  async def get_ranks(self, ctx: commands.Context, puzzle_type: str = '', query: str = '') -> None:
+    args: list[str] = [query] if query else []
+    async def work() -> None:
       match self.utils.get_game_type(puzzle_type):
+        case NYTGame.ALL:
+          await self.bot.combined.get_ranks(ctx, *args)
         case NYTGame.CONNECTIONS:
-          await self.connections.get_ranks(ctx)
+          await self.connections.get_ranks(ctx, *args)
         case NYTGame.STRANDS:
-          await self.strands.get_ranks(ctx)
+          await self.strands.get_ranks(ctx, *args)
         case NYTGame.WORDLE:
-          await self.wordle.get_ranks(ctx)
-    except Exception as e:
-      self.bot.logger.error(f"Caught exception: {e}")
-      traceback.print_exception(e)
+          await self.wordle.get_ranks(ctx, *args)
+    await self.bot.responder.respond(ctx, work)
 
   @commands.hybrid_command(
     name='missing',
@@ -132,7 +118,7 @@ class MembersCog(commands.Cog, name="members-cog"):
   )
   @app_commands.describe(puzzle_type="The puzzle type to check for missing entries.")
   async def get_missing(self, ctx: commands.Context, puzzle_type: str) -> None:
-    try:
+    async def work() -> None:
       match self.utils.get_game_type(puzzle_type):
         case NYTGame.CONNECTIONS:
           await self.connections.get_missing(ctx)
@@ -140,22 +126,18 @@ class MembersCog(commands.Cog, name="members-cog"):
           await self.strands.get_missing(ctx)
         case NYTGame.WORDLE:
           await self.wordle.get_missing(ctx)
-    except Exception as e:
-      self.bot.logger.error(f"Caught exception: {e}")
-      traceback.print_exception(e)
+    await self.bot.responder.respond(ctx, work)
 
   @commands.hybrid_command(
     name='entries',
     description='Show all recorded entries for a player'
   )
   async def get_entries(self, ctx: commands.Context) -> None:
-    try:
+    async def work() -> None:
       await self.connections.get_entries(ctx)
       await self.strands.get_entries(ctx)
       await self.wordle.get_entries(ctx)
-    except Exception as e:
-      self.bot.logger.error(f"Caught exception: {e}")
-      traceback.print_exception(e)
+    await self.bot.responder.respond(ctx, work)
 
   @commands.hybrid_command(
     name="view",
@@ -166,7 +148,7 @@ class MembersCog(commands.Cog, name="members-cog"):
     puzzle_number="The puzzle number to view."
   )
   async def get_entry(self, ctx: commands.Context, puzzle_type: str, puzzle_number: str) -> None:
-    try:
+    async def work() -> None:
       match self.utils.get_game_type(puzzle_type):
         case NYTGame.CONNECTIONS:
           await self.connections.get_entry(ctx, puzzle_number)
@@ -174,16 +156,53 @@ class MembersCog(commands.Cog, name="members-cog"):
           await self.strands.get_entry(ctx, puzzle_number)
         case NYTGame.WORDLE:
           await self.wordle.get_entry(ctx, puzzle_number)
-    except Exception as e:
-      self.bot.logger.error(f"Caught exception: {e}")
-      traceback.print_exception(e)
+    await self.bot.responder.respond(ctx, work)
+
+  @commands.hybrid_command(
+    name='streaks',
+    description='Show current and longest daily streaks'
+  )
+  @app_commands.describe(
+    puzzle_type="The puzzle type to get streaks for.",
+    user="Only show streaks for this player."
+  )
+  async def get_streaks(self, ctx: commands.Context, puzzle_type: str, user: str = '') -> None:
+    args: list[str] = [user] if user else []
+    async def work() -> None:
+      match self.utils.get_game_type(puzzle_type):
+        case NYTGame.CONNECTIONS:
+          await self.connections.get_streaks(ctx, *args)
+        case NYTGame.STRANDS:
+          await self.strands.get_streaks(ctx, *args)
+        case NYTGame.WORDLE:
+          await self.wordle.get_streaks(ctx, *args)
+    await self.bot.responder.respond(ctx, work)
+
+  @commands.hybrid_command(
+    name='versus',
+    description='Show head-to-head results between players'
+  )
+  @app_commands.describe(
+    puzzle_type="The puzzle type to compare players on.",
+    players="`all` or one or more players to compare."
+  )
+  async def get_versus(self, ctx: commands.Context, puzzle_type: str, players: str = 'all') -> None:
+    async def work() -> None:
+      match self.utils.get_game_type(puzzle_type):
+        case NYTGame.CONNECTIONS:
+          await self.connections.get_versus(ctx, *players.split())
+        case NYTGame.STRANDS:
+          await self.strands.get_versus(ctx, *players.split())
+        case NYTGame.WORDLE:
+          await self.wordle.get_versus(ctx, *players.split())
+    await self.bot.responder.respond(ctx, work)
 
   @commands.hybrid_command(name="stats", description="Show basic stats for a player")
   @app_commands.describe(
     puzzle_type="The puzzle type to get stats for."
   )
   async def get_stats(self, ctx: commands.Context, puzzle_type: str) -> None:
-    try:
+    async def work() -> None:
       match self.utils.get_game_type(puzzle_type):
         case NYTGame.CONNECTIONS:
           await self.connections.get_stats(ctx)
@@ -191,9 +210,7 @@ class MembersCog(commands.Cog, name="members-cog"):
           await self.strands.get_stats(ctx)
         case NYTGame.WORDLE:
           await self.wordle.get_stats(ctx)
-    except Exception as e:
-      self.bot.logger.error(f"Caught exception: {e}")
-      traceback.print_exception(e)
+    await self.bot.responder.respond(ctx, work)
 
   ######################
   #   HELPER METHODS   #
@@ -202,8 +219,8 @@ class MembersCog(commands.Cog, name="members-cog"):
   def build_help_menu(self) -> None:
     self.help_menu.add('ranks', \
         explanation = "View the leaderboard over time or for a specific puzzle.", \
-        usage = "`?ranks (today|weekly|10-day|all-time)`\n`?ranks <MM/DD/YYYY>`\n`?ranks <puzzle #>`", \
-        notes = "- `?ranks` will default to `?ranks weekly`.\n- When using MM/DD/YYYY format, the date must be a Sunday.")
+        usage = "`?ranks (today|weekly|10-day|all-time|rating)`\n`?ranks <MM/DD/YYYY>`\n`?ranks <puzzle #>`", \
+        notes = "- `?ranks` will default to `?ranks weekly`.\n- When using MM/DD/YYYY format, the date must be a Sunday.\n- `rating` ranks players by a skill rating where each puzzle is a match against everyone else who played it.\n- `?ranks all` combines Wordle, Connections and Strands into one score out of 100 (`rating` isn't supported).")
     self.help_menu.add('missing', \
         explanation = "View and mention all players who have not yet submitted a puzzle.", \
         usage = "`?missing [<puzzle #>]`", \
@@ -215,6 +232,14 @@ class MembersCog(commands.Cog, name="members-cog"):
         explanation = "View more details stats on one or players.", \
         usage = "`?stats <player1> [<player2> ...]`", \
         notes = "`?stats` will default to just query for the calling user.")
+    self.help_menu.add('streaks', \
+        explanation = "View everyone's active daily streak and their longest streak ever.", \
+        usage = "`?streaks <puzzle type> [<player>]`", \
+        notes = "A streak stays active until a full day is missed.")
+    self.help_menu.add('versus', \
+        explanation = "View how often players beat each other on puzzles they both played.", \
+        usage = "`?versus <puzzle type> all`\n`?versus <puzzle type> <player1> [<player2> ...]`", \
+        notes = "- `all` compares the most active players.\n- With a single player, you are compared against them.")
     self.help_menu.add('view', \
         explanation = "View specific details of one or more entries.", \
         usage = "`?view [<player>] <puzzle #1> [<puzzle #2> ...]`")
@@ -6,8 +6,10 @@ if typing.TYPE_CHECKING:
   from handlers.commands.connections import ConnectionsCommandHandler
   from handlers.commands.strands import StrandsCommandHandler
   from handlers.commands.wordle import WordleCommandHandler
+  from utils.backfill import BackfillProgress
   from utils.bot_typing import MyBotType
   from utils.bot_utilities import BotUtilities, NYTGame
+  from utils.profiler import ProfileReport
 
 class OwnerCog(commands.Cog, name="owner-cog"):
     # class variables
@@ -57,16 +59,105 @@ class OwnerCog(commands.Cog, name="owner-cog"):
     )
     async def update(self, ctx: commands.Context) -> None:
       await ctx.defer()
-      count = 0
-      async for message in ctx.channel.history(limit=5):
-        if (len(message.reactions) == 0):
-          await self.bot.on_message(message)
-          count += 1
+      status = await ctx.send(content="Reading channel history...", silent=True)
+
+      async def on_progress(progress: "BackfillProgress") -> None:
+        await status.edit(content=f"Reading channel history... {progress}")
+
+      progress = await self.bot.backfill.backfill(ctx.channel, on_progress)
+      await status.edit(content=f"Update completed. {progress}")
+
+    @commands.is_owner()
+    @commands.hybrid_command(
+      name='rebuild',
+      description='Re-parses every logged submission and rebuilds the entries from them',
+    )
+    async def rebuild(self, ctx: commands.Context) -> None:
+      await ctx.defer()
+      try:
+        count = await self.bot.submissions.rebuild(self.bot.games)
+        await ctx.send(content=f"Rebuild completed. {count} entries written.", silent=True)
+      except Exception as e:
+        self.bot.logger.error(f"Failed to rebuild entries: {e}")
+        await ctx.send(content="Rebuild failed.", silent=True)
+        traceback.print_exception(e)
+
+    @commands.is_owner()
+    @commands.hybrid_command(
+      name='metrics',
+      description='Shows command, ingestion, query and render latencies',
+    )
+    async def metrics(self, ctx: commands.Context) -> None:
+      if not self.bot.metrics.enabled:
+        await ctx.send(content="Metrics are disabled, set `METRICS_ENABLED=1` to collect them.", ephemeral=True)
+        return
+
+      lines = [f"{'series':<42} {'count':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}"]
+      for series, count, p50, p95, p99, error_rate in self.bot.metrics.summary():
+        lines.append(f"{series[:42]:<42} {count:>7} {p50 * 1000:>6.1f}ms {p95 * 1000:>6.1f}ms {p99 * 1000:>6.1f}ms {error_rate:>5.0%}")
+
+      # stay under Discord's message length limit
+      content = ''
+      for line in lines:
+        if len(content) + len(line) > 1900:
+          break
+        content += line + '\n'
+      await ctx.send(content=f"```\n{content}```", ephemeral=True)
+
+    @commands.is_owner()
+    @commands.hybrid_group(
+      name='profile',
+      description='Profiles the running bot',
+    )
+    async def profile(self, ctx: commands.Context) -> None:
+      await ctx.send(content="Use `profile start` or `profile stop`.", ephemeral=True)
+
+    @commands.is_owner()
+    @profile.command(
+      name='start',
+      description='Starts profiling for a number of seconds and/or commands',
+    )
+    @app_commands.rename(command_count='commands')
+    @app_commands.describe(
+      seconds="Stop after this many seconds.",
+      command_count="Stop after this many commands have been answered.",
+      mode="cprofile (every call, .pstats) or sample (stack samples, flamegraph .folded).",
+    )
+    async def profile_start(self, ctx: commands.Context, seconds: float | None = None,
+                            command_count: int | None = None, mode: str = 'cprofile') -> None:
+      if seconds is None and command_count is None:
+        seconds = 30.0
+
+      channel = ctx.channel
+      async def on_finish(report: "ProfileReport") -> None:
+        await channel.send(content=self._format_report(report), silent=True)
+
+      try:
+        self.bot.profiler.start(mode, seconds, command_count, on_finish)
+      except ValueError as e:
+        await ctx.send(content=str(e), ephemeral=True)
+        return
+
+      limits = [f"{seconds:g}s" if seconds is not None else '', f"{command_count} commands" if command_count is not None else '']
       await ctx.send(
-        content=f"Update completed. {count} messages processed.",
-        silent=True,
+        content=f"Profiling with {mode} for {' or '.join(limit for limit in limits if limit)}.",
+        ephemeral=True,
       )
 
+    @commands.is_owner()
+    @profile.command(
+      name='stop',
+      description='Stops profiling and posts the results',
+    )
+    async def profile_stop(self, ctx: commands.Context) -> None:
+      if not self.bot.profiler.active:
+        await ctx.send(content="No profiling session is running.", ephemeral=True)
+        return
+
+      await ctx.defer()
+      report = await self.bot.profiler.stop()
+      await ctx.send(content=self._format_report(report), silent=True)
+
     @commands.is_owner()
     @commands.hybrid_command(
       name='reset',
@@ -94,6 +185,19 @@ class OwnerCog(commands.Cog, name="owner-cog"):
         )
         traceback.print_exception(e)
 
+    ######################
+    #   HELPER METHODS   #
+    ######################
+
+    def _format_report(self, report: "ProfileReport") -> str:
+      # stay under Discord's message length limit
+      content = ''
+      for line in report.top:
+        if len(content) + len(line) > 1700:
+          break
+        content += line + '\n'
+      return f"{report}\n```\n{content}```"
+
 async def setup(bot: "MyBotType") -> None:
   try:
     await bot.add_cog(OwnerCog(bot))
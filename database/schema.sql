@@ -36,3 +36,61 @@ CREATE TABLE IF NOT EXISTS `wordle` (
   PRIMARY KEY (`puzzle_id`, `user_id`),
   FOREIGN KEY (`user_id`) REFERENCES `users`(`user_id`) ON DELETE CASCADE
 );
+
+CREATE TABLE IF NOT EXISTS `ratings` (
+  `puzzle_name` VARCHAR(32) NOT NULL,
+  `user_id` INTEGER NOT NULL,
+  `rating` REAL NOT NULL,
+  `games` INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (`puzzle_name`, `user_id`),
+  FOREIGN KEY (`user_id`) REFERENCES `users`(`user_id`) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS `ratings_by_rating` ON `ratings` (`puzzle_name`, `rating` DESC);
+
+CREATE TABLE IF NOT EXISTS `rating_changes` (
+  `puzzle_name` VARCHAR(32) NOT NULL,
+  `puzzle_id` INTEGER NOT NULL,
+  `user_id` INTEGER NOT NULL,
+  `delta` REAL NOT NULL,
+  PRIMARY KEY (`puzzle_name`, `puzzle_id`, `user_id`),
+  FOREIGN KEY (`user_id`) REFERENCES `users`(`user_id`) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS `streaks` (
+  `puzzle_name` VARCHAR(32) NOT NULL,
+  `user_id` INTEGER NOT NULL,
+  `start_id` INTEGER NOT NULL,
+  `end_id` INTEGER NOT NULL,
+  PRIMARY KEY (`puzzle_name`, `user_id`, `start_id`),
+  FOREIGN KEY (`user_id`) REFERENCES `users`(`user_id`) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS `streaks_by_user_end` ON `streaks` (`puzzle_name`, `user_id`, `end_id`);
+CREATE INDEX IF NOT EXISTS `streaks_by_end` ON `streaks` (`puzzle_name`, `end_id`);
+
+CREATE TABLE IF NOT EXISTS `channel_checkpoints` (
+  `channel_id` INTEGER NOT NULL PRIMARY KEY,
+  `message_id` INTEGER NOT NULL,
+  `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS `pending_rebuilds` (
+  `puzzle_name` VARCHAR(32) NOT NULL PRIMARY KEY,
+  `puzzle_id` INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS `submissions` (
+  `message_id` INTEGER NOT NULL PRIMARY KEY,
+  `channel_id` INTEGER NOT NULL,
+  `user_id` INTEGER NOT NULL,
+  `created_at` TIMESTAMP NOT NULL,
+  `content_hash` CHAR(32) NOT NULL,
+  `content` TEXT NOT NULL,
+  `puzzle_name` VARCHAR(32) NOT NULL,
+  `puzzle_id` INTEGER NOT NULL,
+  `score` INTEGER NOT NULL,
+  FOREIGN KEY (`user_id`) REFERENCES `users`(`user_id`) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS `submissions_by_puzzle` ON `submissions` (`puzzle_name`, `puzzle_id`, `user_id`);
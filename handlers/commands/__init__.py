@@ -2,12 +2,25 @@ import discord, typing
 from datetime import date
 from discord.ext import commands
 
+from models.submission import ParsedSubmission
+from models.table import Table
+from utils.lazy_import import lazy_import
+
 if typing.TYPE_CHECKING:
+  import matplotlib.pyplot as plt
+  import seaborn as sns
+  from matplotlib.figure import Figure
   from handlers.database import BaseDatabaseHandler
   from utils.bot_utilities import BotUtilities
+else:
+  plt = lazy_import('matplotlib.pyplot')
+  sns = lazy_import('seaborn')
 
 class BaseCommandHandler(typing.Protocol):
-  MAX_DATAFRAME_ROWS: int = 10
+  MAX_TABLE_ROWS: int = 10
+  MAX_VERSUS_PLAYERS: int = 12
+  # what each of `db.distribution`'s buckets is shown as, best to worst
+  BUCKET_LABELS: list[str] = []
 
   db: "BaseDatabaseHandler"
   utils: "BotUtilities"
@@ -20,13 +33,48 @@ class BaseCommandHandler(typing.Protocol):
   #   MEMBER METHODS   #
   ######################
 
-  async def add_entry(self, user: discord.User | discord.Member, title: str, puzzle: str, datetime = None) -> bool:
+  async def add_entry(self, user: discord.User | discord.Member, submission: ParsedSubmission, datetime = None,
+                      message: discord.Message | None = None) -> bool:
     if not datetime:
       datetime = self.utils.convert_date_to_str(self.utils.get_todays_date())
     else:
       datetime = self.utils.convert_date_to_str(datetime)
 
-    return await self.db.add_entry(user, title, puzzle, datetime)
+    async with self.utils.write_lock:
+      if message is None:
+        return await self.db.add_entry(user, submission, datetime)
+      if await self.utils.bot.submissions.is_logged(message):
+        # a replay of a message that has already been added
+        return True
+      try:
+        # the entry and its log row are committed together
+        if await self.db.add_entry(user, submission, datetime, commit=False):
+          await self.utils.bot.submissions.log(message, user.id, submission)
+          await self.utils.connection.commit()
+          return True
+      except Exception:
+        await self._discard_entry()
+        raise
+      await self._discard_entry()
+      return False
+
+  async def get_puzzle_distributions(self, puzzle_ids: list[int]) -> str | None:
+    """
+    How everyone did on each of `puzzle_ids`, one line per puzzle, from the in-memory histograms.
+    """
+    lines: list[str] = []
+    for puzzle_id in puzzle_ids:
+      counts = await self.db.distribution.get_puzzle_histogram(puzzle_id)
+      if sum(counts) > 0:
+        buckets = [f"{label} ×{count}" for label, count in zip(self.BUCKET_LABELS, counts) if count > 0]
+        lines.append(f"#{puzzle_id}: {' · '.join(buckets)}")
+    return '\n'.join(lines) if len(lines) > 0 else None
+
+  async def _discard_entry(self) -> None:
+    await self.utils.connection.rollback()
+    # the histograms, and anything cached while the entry was visible, may include it
+    self.db.distribution.invalidate()
+    self.db.data_version += 1
 
   async def get_ranks(self, ctx: commands.Context, *args: str) -> None:
     pass
@@ -43,6 +91,120 @@ class BaseCommandHandler(typing.Protocol):
   async def get_stats(self, ctx: commands.Context, *args: str) -> None:
     pass
 
+  async def get_rating_ranks(self, ctx: commands.Context) -> None:
+    leaders: list[tuple[int, float, int]] = await self.db.ratings.get_leaderboard(self.MAX_TABLE_ROWS + 1)
+    if len(leaders) == 0:
+      await ctx.reply(f"Sorry, no users could be found for this query.")
+      return
+
+    names = await self.utils.names.resolve_many([user_id for user_id, _, _ in leaders], ctx.guild)
+    table = Table(['Rank', 'User', 'Rating', '🧩'])
+    rank: int = 0
+    for i, (user_id, rating, games) in enumerate(leaders):
+      if i == 0 or round(rating) != round(leaders[i - 1][1]):
+        rank = i + 1
+      table.add_row(
+        rank,
+        names.get(user_id),
+        f"{rating:.0f}",
+        games
+      )
+
+    ranks_img = self.utils.get_image_from_table(table)
+
+    if ranks_img is not None:
+      image_binary = self.utils.image_to_binary(ranks_img)
+      await ctx.send(
+        f"Leaderboard 🧩: Skill Rating",
+        file=discord.File(fp=image_binary, filename='image.png')
+      )
+    else:
+      await ctx.reply("Sorry, there was an issue fetching ranks. Please try again later.")
+
+  async def get_streaks(self, ctx: commands.Context, *args: str) -> None:
+    todays_puzzle_id: int = self.db.get_puzzle_by_date(self.utils.get_todays_date())
+    if len(args) == 1 and self.utils.is_user(args[0]):
+      user_id = int(args[0].strip("<@!> "))
+      current, longest = await self.db.streaks.get_player_streaks(user_id, todays_puzzle_id)
+      await ctx.reply(f"<@{user_id}> is on a {current} day streak (longest: {longest}).", silent=True)
+      return
+    elif len(args) > 0:
+      await ctx.reply("Couldn't understand command. Try `/help streaks`.")
+      return
+
+    streaks: list[tuple[int, int, int]] = await self.db.streaks.get_active_streaks(todays_puzzle_id, self.MAX_TABLE_ROWS + 1)
+    if len(streaks) == 0:
+      await ctx.reply(f"Sorry, nobody has an active streak right now.")
+      return
+
+    names = await self.utils.names.resolve_many([user_id for user_id, _, _ in streaks], ctx.guild)
+    table = Table(['Rank', 'User', 'Current 🔥', 'Longest'])
+    rank: int = 0
+    for i, (user_id, current, longest) in enumerate(streaks):
+      if i == 0 or current != streaks[i - 1][1]:
+        rank = i + 1
+      table.add_row(
+        rank,
+        names.get(user_id),
+        current,
+        longest
+      )
+
+    streaks_img = self.utils.get_image_from_table(table)
+
+    if streaks_img is not None:
+      image_binary = self.utils.image_to_binary(streaks_img)
+      await ctx.send(
+        f"Streaks 🔥: Puzzle #{todays_puzzle_id}",
+        file=discord.File(fp=image_binary, filename='image.png')
+      )
+    else:
+      await ctx.reply("Sorry, there was an issue fetching streaks. Please try again later.")
+
+  async def get_versus(self, ctx: commands.Context, *args: str) -> None:
+    matrix = await self.db.get_versus_matrix()
+    if len(args) == 0 or (len(args) == 1 and args[0] == 'all'):
+      user_ids = matrix.most_active(self.MAX_VERSUS_PLAYERS)
+    elif all(self.utils.is_user(arg) for arg in args):
+      user_ids = [int(arg.strip("<@!> ")) for arg in args]
+      if len(user_ids) == 1:
+        # `/versus @player` compares the caller against that player
+        user_ids.insert(0, ctx.author.id)
+    else:
+      await ctx.reply("Couldn't understand command. Try `/help versus`.")
+      return
+
+    user_ids, wins, shared = matrix.select(list(dict.fromkeys(user_ids)))
+    if len(user_ids) < 2:
+      await ctx.reply(f"Sorry, need at least two players with recorded entries.")
+      return
+
+    resolved = await self.utils.names.resolve_many(user_ids, ctx.guild)
+    names = [self.utils.remove_emojis(resolved.get(user_id) or str(user_id)) for user_id in user_ids]
+    labels = [[f"{wins[i, j]}-{wins[j, i]}" if i != j else '' for j in range(len(user_ids))] for i in range(len(user_ids))]
+
+    plt.rcParams.update({'font.size': 14})
+    fig: Figure = plt.figure(figsize=(2 + 1.2 * len(user_ids), 1 + 1.0 * len(user_ids)))
+    ax = sns.heatmap(
+      matrix.win_rates(wins, shared) * 100,
+      annot=labels, fmt='', cmap='RdYlGn', vmin=0, vmax=100,
+      xticklabels=names, yticklabels=names, cbar_kws={'label': 'Win %'},
+    )
+    ax.set_xlabel('Opponent')
+    ax.set_ylabel('Player')
+    fig.tight_layout()
+    versus_img = self.utils.fig_to_image(fig)
+    plt.close(fig)
+
+    if versus_img is not None:
+      versus_binary = self.utils.image_to_binary(versus_img)
+      await ctx.send(
+        f"Head-to-head 🧩: wins-losses on puzzles both players submitted",
+        file=discord.File(fp=versus_binary, filename='image.png')
+      )
+    else:
+      await ctx.reply("Sorry, there was an issue comparing players. Please try again later.")
+
   ######################
   #   OWNER METHODS    #
   ######################
@@ -50,5 +212,12 @@ class BaseCommandHandler(typing.Protocol):
   async def remove_entry(self, ctx: commands.Context, *args: str) -> None:
     pass
 
-  async def add_score(self, message: discord.Message | None, user: discord.User, *args: str) -> None:
-    pass
+  async def add_score(self, message: discord.Message, user: discord.User, submission: ParsedSubmission) -> bool:
+    self.utils.bot.logger.debug("%s->add_score() :: %s\n<%s>\n%s", self.db.puzzle_name, message, user, submission)
+
+    if await self.add_entry(user, submission, message.created_at, message):
+      self.utils.bot.dispatcher.react(message, '✅')
+      return True
+    else:
+      self.utils.bot.dispatcher.react(message, '❌')
+      return False
@@ -0,0 +1,118 @@
+import discord, typing
+from datetime import date, timedelta
+from discord.ext import commands
+
+from handlers.database.combined import CombinedDatabaseHandler
+from models import PuzzleQueryType
+from models.table import Table
+from utils.single_flight import coalesce_command
+
+if typing.TYPE_CHECKING:
+  from handlers.database import BaseDatabaseHandler
+  from utils.bot_utilities import BotUtilities
+
+class CombinedCommandHandler():
+  MAX_TABLE_ROWS: int = 10
+
+  db: CombinedDatabaseHandler
+  utils: "BotUtilities"
+
+  def __init__(self, utils: "BotUtilities", games: list["BaseDatabaseHandler"]) -> None:
+    self.utils = utils
+    self.db = CombinedDatabaseHandler(utils, games)
+
+  ######################
+  #   MEMBER METHODS   #
+  ######################
+
+  @coalesce_command()
+  async def get_ranks(self, ctx: commands.Context, *args: str) -> None:
+    today: date = self.utils.get_todays_date()
+    start_date: date | None = None
+    end_date: date | None = None
+
+    if len(args) == 0 or (len(args) == 1 and args[0] in ['week', 'weekly']):
+      # WEEKLY
+      start_date, end_date = self.utils.get_week_start(today), today
+      explanation_str = "This Week (so far)"
+      query_type = PuzzleQueryType.MULTI_PUZZLE
+    elif len(args) == 1 and args[0] == 'today':
+      # TODAY ONLY
+      start_date, end_date = today, today
+      explanation_str = f"Today ({self.utils.convert_date_to_str(today)})"
+      query_type = PuzzleQueryType.SINGLE_PUZZLE
+    elif len(args) == 1 and args[0] in ['10day', '10-day']:
+      # 10-DAY AVERAGE
+      start_date = today - timedelta(days=10)
+      end_date = start_date + timedelta(days=9)
+      explanation_str = "Last 10 Days"
+      query_type = PuzzleQueryType.MULTI_PUZZLE
+    elif len(args) == 1 and args[0] in ['alltime', 'all-time']:
+      # ALL TIME
+      explanation_str = "All-time"
+      query_type = PuzzleQueryType.ALL_TIME
+    elif len(args) == 1 and self.utils.is_date(args[0]):
+      # WEEKLY (BY SPECIFIC DATE)
+      query_date = self.utils.get_date_from_str(args[0])
+      if self.utils.is_sunday(query_date):
+        start_date, end_date = query_date, min(query_date + timedelta(days=6), today)
+        explanation_str = f"Week of {self.utils.convert_date_to_str(query_date)}"
+        query_type = PuzzleQueryType.MULTI_PUZZLE
+      else:
+        await ctx.reply("Query date is not a Sunday. Try `/help ranks`.")
+        return
+    else:
+      await ctx.reply("Couldn't understand your command. Try `/help ranks`.")
+      return
+
+    totals = await self.db.get_totals_by_player(start_date, end_date)
+    if len(totals) == 0 or (start_date is not None and end_date is not None and end_date < start_date):
+      await ctx.reply(f"Sorry, no users could be found for this query.")
+      return
+
+    # every game missed in the period counts as a failed game, except for all-time
+    expected_games: int = 0
+    if start_date is not None and end_date is not None:
+      expected_games = ((end_date - start_date).days + 1) * len(self.db.games)
+
+    stats: list[tuple[int, float, float, list[int], int]] = []
+    for user_id, (total, game_counts) in totals.items():
+      played: int = sum(game_counts)
+      raw_mean: float = total / played
+      if query_type == PuzzleQueryType.ALL_TIME:
+        stats.append((user_id, raw_mean, raw_mean, game_counts, 0))
+      else:
+        missed: int = max(0, expected_games - played)
+        stats.append((user_id, (total + missed) / max(expected_games, played), raw_mean, game_counts, missed))
+    stats.sort(key = lambda p: (p[1], p[2]))
+
+    game_names: list[str] = [game.puzzle_name.capitalize() for game in self.db.games]
+    names = await self.utils.names.resolve_many([user_id for user_id, *_ in stats[:self.MAX_TABLE_ROWS + 1]], ctx.guild)
+    table = Table(['Rank', 'User', 'Score', *game_names, '🚫'])
+    rank: int = 0
+    for i, (user_id, adj_mean, raw_mean, game_counts, missed) in enumerate(stats):
+      if i == 0 or (adj_mean, raw_mean) != stats[i - 1][1:3]:
+        rank = i + 1
+
+      if i <= self.MAX_TABLE_ROWS:
+        score_str = f"{100 * (1 - adj_mean):.1f}"
+        if query_type == PuzzleQueryType.MULTI_PUZZLE:
+          score_str += f" ({100 * (1 - raw_mean):.1f})"
+        table.add_row(
+          rank,
+          names.get(user_id),
+          score_str,
+          *game_counts,
+          missed
+        )
+
+    ranks_img = self.utils.get_image_from_table(table)
+
+    if ranks_img is not None:
+      image_binary = self.utils.image_to_binary(ranks_img)
+      await ctx.send(
+        f"Combined Leaderboard 🧩: {explanation_str}",
+        file=discord.File(fp=image_binary, filename='image.png')
+      )
+    else:
+      await ctx.reply("Sorry, there was an issue fetching ranks. Please try again later.")
@@ -1,8 +1,4 @@
-import discord, io, re, typing
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-import pandas as pd
-import seaborn as sns
+import discord, re, typing
 from datetime import date, timedelta
 from discord.ext import commands
 
@@ -10,11 +6,22 @@ from handlers.database.connections import ConnectionsDatabaseHandler
 from handlers.commands import BaseCommandHandler
 from models import PuzzleQueryType
 from models.connections import ConnectionsPlayerStats, ConnectionsPuzzleEntry
+from models.table import Table
+from utils.lazy_import import lazy_import
+from utils.single_flight import coalesce_command
 
 if typing.TYPE_CHECKING:
+  import matplotlib.pyplot as plt
+  import seaborn as sns
+  from matplotlib.figure import Figure
   from utils.bot_utilities import BotUtilities
+else:
+  plt = lazy_import('matplotlib.pyplot')
+  sns = lazy_import('seaborn')
 
 class ConnectionsCommandHandler(BaseCommandHandler):
+  BUCKET_LABELS: list[str] = ['4/7', '5/7', '6/7', '7/7', 'X/7']
+
   def __init__(self, utils: "BotUtilities") -> None:
     super().__init__(utils, ConnectionsDatabaseHandler(utils))
     self.player_stats: ConnectionsPlayerStats = ConnectionsPlayerStats()
@@ -23,6 +30,7 @@ class ConnectionsCommandHandler(BaseCommandHandler):
   #   MEMBER METHODS   #
   ######################
 
+  @coalesce_command()
   async def get_ranks(self, ctx: commands.Context, *args: str) -> None:
       explanation_str: str = ""
       query_type: PuzzleQueryType = PuzzleQueryType.SINGLE_PUZZLE
@@ -33,6 +41,10 @@ class ConnectionsCommandHandler(BaseCommandHandler):
         valid_puzzles = await self.db.get_all_puzzles()
         explanation_str = "All-time"
         query_type = PuzzleQueryType.ALL_TIME
+      elif len(args) == 1 and args[0] == 'rating':
+        # SKILL RATING
+        await self.get_rating_ranks(ctx)
+        return
       elif len(args) == 1 and args[0] in ['week', 'weekly']:
         # WEEKLY
         start_of_week: date = self.utils.get_week_start(self.utils.get_todays_date())
@@ -86,66 +98,66 @@ class ConnectionsCommandHandler(BaseCommandHandler):
         # for all-time queries, we must rank on the raw score (since adj. will be skewed)
         stats.sort(key = lambda p: (p.raw_mean))
 
+      names = await self.utils.names.resolve_many([p.user_id for p in stats[:self.MAX_TABLE_ROWS + 1]], ctx.guild)
       if query_type == PuzzleQueryType.SINGLE_PUZZLE:
         # stats for just 1 puzzle
-        df = pd.DataFrame(columns=['Rank', 'User', 'Score'])
+        table = Table(['Rank', 'User', 'Score'])
         for i, player_stats in enumerate(stats):
           if i > 0 and player_stats.get_stat_list() == stats[i - 1].get_stat_list():
             player_stats.rank = stats[i - 1].rank
           else:
             player_stats.rank = i + 1
 
-          if i <= self.MAX_DATAFRAME_ROWS:
-            df.loc[i] = [
+          if i <= self.MAX_TABLE_ROWS:
+            table.add_row(
               player_stats.rank,
-              self.utils.get_nickname(player_stats.user_id),
+              names.get(player_stats.user_id),
               f"{player_stats.raw_mean:d}/7"
-            ]
+            )
       elif query_type == PuzzleQueryType.MULTI_PUZZLE:
         # stats for 2+ puzzles, but not all-time
-        df = pd.DataFrame(columns=['Rank', 'User', 'Average', '🧩', '🚫'])
+        table = Table(['Rank', 'User', 'Average', '🧩', '🚫'])
         for i, player_stats in enumerate(stats):
           if i > 0 and player_stats.get_stat_list() == stats[i - 1].get_stat_list():
             player_stats.rank = stats[i - 1].rank
           else:
             player_stats.rank = i + 1
-          if i <= self.MAX_DATAFRAME_ROWS:
-            df.loc[i] = [
+          if i <= self.MAX_TABLE_ROWS:
+            table.add_row(
               player_stats.rank,
-              self.utils.get_nickname(player_stats.user_id),
+              names.get(player_stats.user_id),
               f"{player_stats.adj_mean:.2f}/7 ({player_stats.raw_mean:.2f}/7)",
               len(valid_puzzles) - player_stats.missed_games,
               player_stats.missed_games
-            ]
+            )
       elif query_type == PuzzleQueryType.ALL_TIME:
         # stats for 2+ puzzles, for all-time
-        df = pd.DataFrame(columns=['Rank', 'User', 'Average', '🧩'])
+        table = Table(['Rank', 'User', 'Average', '🧩'])
         for i, player_stats in enumerate(stats):
           if i > 0 and player_stats.get_stat_list() == stats[i - 1].get_stat_list():
             player_stats.rank = stats[i - 1].rank
           else:
             player_stats.rank = i + 1
-          if i <= self.MAX_DATAFRAME_ROWS:
-            df.loc[i] = [
+          if i <= self.MAX_TABLE_ROWS:
+            table.add_row(
               player_stats.rank,
-              self.utils.get_nickname(player_stats.user_id),
+              names.get(player_stats.user_id),
               f"{player_stats.raw_mean:.2f}/7",
               len(valid_puzzles) - player_stats.missed_games
-            ]
+            )
 
-      ranks_img = self.utils.get_image_from_df(df)
+      ranks_img = self.utils.get_image_from_table(table)
 
       if ranks_img is not None:
-        with io.BytesIO() as image_binary:
-          ranks_img.save(image_binary, 'PNG')
-          image_binary.seek(0)
-          await ctx.send(
-            f"Leaderboard 🧩: {explanation_str}",
-            file=discord.File(fp=image_binary, filename='image.png')
-          )
+        image_binary = self.utils.image_to_binary(ranks_img)
+        await ctx.send(
+          f"Leaderboard 🧩: {explanation_str}",
+          file=discord.File(fp=image_binary, filename='image.png')
+        )
       else:
         await ctx.reply("Sorry, there was an issue fetching ranks. Please try again later.")
 
+  @coalesce_command()
   async def get_missing(self, ctx: commands.Context, *args: str) -> None:
     if len(args) == 0:
       puzzle_id = self.db.get_puzzle_by_date(self.utils.get_todays_date())
@@ -205,33 +217,31 @@ class ConnectionsCommandHandler(BaseCommandHandler):
 
     if user_id in await self.db.get_all_players():
       user_puzzles: list[ConnectionsPuzzleEntry] = await self.db.get_entries_by_player(user_id)
-      df = pd.DataFrame(columns=['User', 'Puzzle', 'Score'])
+      table = Table(['User', 'Puzzle', 'Score'])
       for i, puzzle_id in enumerate(puzzle_ids):
         found_match = False
         for entry in user_puzzles:
           if entry.puzzle_id == puzzle_id:
             score_str = 'X' if entry.score == 8 else str(entry.score)
-            df.loc[i] = [
+            table.add_row(
               ctx.author.display_name,
               f"#{puzzle_id}",
               f"{score_str}/7",
-            ]
+            )
             found_match = True
             break
 
         if not found_match:
-          df.loc[i] = [
+          table.add_row(
             ctx.author.display_name,
             f"#{puzzle_id}",
             "?/7",
-          ]
+          )
 
-      entries_img = self.utils.get_image_from_df(df)
+      entries_img = self.utils.get_image_from_table(table)
       if entries_img is not None:
-        with io.BytesIO() as image_binary:
-          entries_img.save(image_binary, 'PNG')
-          image_binary.seek(0)
-          await ctx.reply(file=discord.File(fp=image_binary, filename='image.png'))
+        image_binary = self.utils.image_to_binary(entries_img)
+        await ctx.reply(await self.get_puzzle_distributions(puzzle_ids), file=discord.File(fp=image_binary, filename='image.png'))
       else:
         await ctx.reply(
           "Sorry, failed to fetch stats.",
@@ -246,6 +256,7 @@ class ConnectionsCommandHandler(BaseCommandHandler):
         ephemeral=True,
       )
 
+  @coalesce_command(per_author=True)
   async def get_stats(self, ctx: commands.Context, *args: str) -> None:
     user_ids: list[int] = []
     unknown_ids: list[int] = []
@@ -279,43 +290,42 @@ class ConnectionsCommandHandler(BaseCommandHandler):
           )
           return
 
-    df = pd.DataFrame(columns=['User', 'Avg Score', '🧩', '🚫'])
+    table = Table(['User', 'Avg Score', '%ile', '🧩', '🚫'])
     for i, user_id in enumerate(user_ids):
       puzzle_list: list[int] = await self.db.get_puzzles_by_player(user_id)
       player_stats: ConnectionsPlayerStats = await self.player_stats.initialize(user_id, puzzle_list, self.db)
-      df.loc[i] = [
+      percentile: float | None = await self.db.distribution.get_percentile(user_id)
+      table.add_row(
         ctx.author.display_name,
         f"{player_stats.raw_mean:.4f}",
+        f"{percentile:.0f}" if percentile is not None else "?",
         len(puzzle_list),
         len(await self.db.get_all_puzzles()) - len(puzzle_list),
-      ]
+      )
 
-    stats_img = self.utils.get_image_from_df(df)
+    stats_img = self.utils.get_image_from_table(table)
 
     hist_img = None
     if len(user_ids) < 5:
       valid_scores = ['4/7', '5/7', '6/7', '7/7', 'X/7']
       plt.rcParams.update({'font.size': 20})
 
-      df = pd.DataFrame(columns=['Player', 'Score', 'Count'])
+      table = Table(['Player', 'Score', 'Count'])
       for i, user_id in enumerate(user_ids):
         user_name = ctx.author.display_name
         if user_name is None:
           continue
 
-        score_counts = [0] * len(valid_scores)
-        entries: list[ConnectionsPuzzleEntry] = await self.db.get_entries_by_player(user_id)
-        for score in [entry.score for entry in entries]:
-          score_counts[score - 4] += 1
+        score_counts: list[int] = await self.db.distribution.get_player_histogram(user_id)
 
         for j in range(0, len(valid_scores)):
-          df.loc[i*len(valid_scores) + j] = [
+          table.add_row(
             self.utils.remove_emojis(user_name),
             valid_scores[j],
             score_counts[j]
-          ]
+          )
 
-      g = sns.catplot(x='Score', y='Count', hue='Player', data=df, kind='bar')
+      g = sns.catplot(x='Score', y='Count', hue='Player', data=table.data, kind='bar')
       for ax in g.axes.ravel():
         for c in ax.containers:
           labels = ['%d' % v.get_height() for v in c]
@@ -363,25 +373,9 @@ class ConnectionsCommandHandler(BaseCommandHandler):
       return
 
     if user_id in await self.db.get_all_players() and puzzle_id in await self.db.get_all_puzzles():
-      if self.db.remove_entry(user_id, puzzle_id):
+      if await self.db.remove_entry(user_id, puzzle_id):
         await ctx.message.add_reaction('✅')
       else:
         await ctx.message.add_reaction('❌')
     else:
       await ctx.reply(f"Could not find entry for Puzzle #{puzzle_id} and user <@{user_id}>.")
-
-  async def add_score(self, message: discord.Message | None, user: discord.User, *args: str) -> None:
-    self.utils.bot.logger.debug(f"Connections->add_score() :: {message}\n<{user}>\n{args}")
-
-    if message is not None and args is not None:
-      puzzle_type = message.content.splitlines()[0].strip()
-      title = '\n'.join(message.content.splitlines()[:2])
-      content = '\n'.join(message.content.splitlines()[2:])
-      self.utils.bot.logger.debug(f"{puzzle_type}::{title}\n{content}\n")
-
-      if await self.add_entry(user, title, content, message.created_at):
-        await message.add_reaction('✅')
-      else:
-        await message.add_reaction('❌')
-    # else:
-    #   await ctx.reply("To manually add a Connections score, please use `/add <puzzle_type> <user> <Connections output>` (specifying a user is optional).")
@@ -1,8 +1,4 @@
-import discord, io, re, typing
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-import pandas as pd
-import seaborn as sns
+import discord, re, typing
 from datetime import timedelta
 from discord.ext import commands
 
@@ -10,11 +6,22 @@ from handlers.commands import BaseCommandHandler
 from handlers.database.strands import StrandsDatabaseHandler
 from models import PuzzleQueryType
 from models.strands import StrandsPlayerStats, StrandsPuzzleEntry
+from models.table import Table
+from utils.lazy_import import lazy_import
+from utils.single_flight import coalesce_command
 
 if typing.TYPE_CHECKING:
+  import matplotlib.pyplot as plt
+  import seaborn as sns
+  from matplotlib.figure import Figure
   from utils.bot_utilities import BotUtilities
+else:
+  plt = lazy_import('matplotlib.pyplot')
+  sns = lazy_import('seaborn')
 
 class StrandsCommandHandler(BaseCommandHandler):
+  BUCKET_LABELS: list[str] = ['0 💡', '1 💡', '2 💡', '3 💡', '4 💡', '5 💡', '6 💡', '7+ 💡']
+
   def __init__(self, utils: "BotUtilities") -> None:
       super().__init__(utils, StrandsDatabaseHandler(utils))
       self.player_stats = StrandsPlayerStats()
@@ -23,6 +30,7 @@ class StrandsCommandHandler(BaseCommandHandler):
   #   MEMBER METHODS   #
   ######################
 
+  @coalesce_command()
   async def get_ranks(self, ctx: commands.Context, *args: str) -> None:
     explanation_str: str = ""
     query_type: PuzzleQueryType = PuzzleQueryType.SINGLE_PUZZLE
@@ -33,6 +41,10 @@ class StrandsCommandHandler(BaseCommandHandler):
       valid_puzzles = await self.db.get_all_puzzles()
       explanation_str = "All-time"
       query_type = PuzzleQueryType.ALL_TIME
+    elif len(args) == 1 and args[0] == 'rating':
+      # SKILL RATING
+      await self.get_rating_ranks(ctx)
+      return
     elif len(args) == 1 and args[0] in ['week', 'weekly']:
       # WEEKLY
       start_of_week = self.utils.get_week_start(self.utils.get_todays_date())
@@ -93,71 +105,70 @@ class StrandsCommandHandler(BaseCommandHandler):
       # for all-time queries, we must rank on the raw rating (since adj. will be skewed)
       stats.sort(key = lambda p: (p.avg_rating_raw))
 
+    names = await self.utils.names.resolve_many([p.user_id for p in stats[:self.MAX_TABLE_ROWS + 1]], ctx.guild)
     if query_type == PuzzleQueryType.SINGLE_PUZZLE:
         # stats for just 1 puzzle
-        df = pd.DataFrame(columns=['Rank', 'User', 'Rating', 'Hints', '🟡 Index'])
+        table = Table(['Rank', 'User', 'Rating', 'Hints', '🟡 Index'])
         for i, player_stats in enumerate(stats):
           if i > 0 and player_stats.get_stat_list() == stats[i - 1].get_stat_list():
             player_stats.rank = stats[i - 1].rank
           else:
             player_stats.rank = i + 1
 
-          if i <= self.MAX_DATAFRAME_ROWS:
-            df.loc[i] = [
+          if i <= self.MAX_TABLE_ROWS:
+            table.add_row(
               player_stats.rank,
-              self.utils.get_nickname(player_stats.user_id),
+              names.get(player_stats.user_id),
               f"{player_stats.avg_rating_raw:.3f}",
               f"{player_stats.avg_hints:d}",
               f"{player_stats.avg_spangram_index:d}"
-            ]
+            )
     elif query_type == PuzzleQueryType.MULTI_PUZZLE:
       # stats for 2+ puzzles, but not all-time
-      df = pd.DataFrame(columns=['Rank', 'User', 'Avg Rating', 'Avg Hints', 'Avg 🟡 Index', '🧩', '🚫'])
+      table = Table(['Rank', 'User', 'Avg Rating', 'Avg Hints', 'Avg 🟡 Index', '🧩', '🚫'])
       for i, player_stats in enumerate(stats):
         if i > 0 and player_stats.get_stat_list() == stats[i - 1].get_stat_list():
           player_stats.rank = stats[i - 1].rank
         else:
           player_stats.rank = i + 1
 
-        if i <= self.MAX_DATAFRAME_ROWS:
-          df.loc[i] = [
+        if i <= self.MAX_TABLE_ROWS:
+          table.add_row(
             player_stats.rank,
-            self.utils.get_nickname(player_stats.user_id),
+            names.get(player_stats.user_id),
             f"{player_stats.avg_rating_adj:.3f} ({player_stats.avg_rating_raw:.3f})",
             f"{player_stats.avg_hints:.2f}",
             f"{player_stats.avg_spangram_index:.2f}",
             len(valid_puzzles) - player_stats.missed_games,
             player_stats.missed_games
-          ]
+          )
     elif query_type == PuzzleQueryType.ALL_TIME:
       # stats for 2+ puzzles, for all-time
-      df = pd.DataFrame(columns=['Rank', 'User', 'Avg Rating', 'Avg Hints', 'Avg 🟡 Index', '🧩', '🚫'])
+      table = Table(['Rank', 'User', 'Avg Rating', 'Avg Hints', 'Avg 🟡 Index', '🧩', '🚫'])
       for i, player_stats in enumerate(stats):
         if i > 0 and player_stats.get_stat_list() == stats[i - 1].get_stat_list():
           player_stats.rank = stats[i - 1].rank
         else:
           player_stats.rank = i + 1
-        if i <= self.MAX_DATAFRAME_ROWS:
-          df.loc[i] = [
+        if i <= self.MAX_TABLE_ROWS:
+          table.add_row(
             player_stats.rank,
-            self.utils.get_nickname(player_stats.user_id),
+            names.get(player_stats.user_id),
             f"{player_stats.avg_rating_raw:.3f}",
             f"{player_stats.avg_hints:.2f}",
             f"{player_stats.avg_spangram_index:.2f}",
             len(valid_puzzles) - player_stats.missed_games,
             player_stats.missed_games
-          ]
+          )
 
-    ranks_img = self.utils.get_image_from_df(df)
+    ranks_img = self.utils.get_image_from_table(table)
 
     if ranks_img is not None:
-      with io.BytesIO() as image_binary:
-        ranks_img.save(image_binary, 'PNG')
-        image_binary.seek(0)
-        await ctx.send(
-          f"Leaderboard 🧩: {explanation_str}",
-          file=discord.File(fp=image_binary, filename='image.png'),
-        )
+      image_binary = self.utils.image_to_binary(ranks_img)
+      await ctx.send(
+        f"Leaderboard 🧩: {explanation_str}",
+        file=discord.File(fp=image_binary, filename='image.png'),
+      )
     else:
       await ctx.reply(
         f"Sorry, there was an issue fetching ranks. Please try again later.",
@@ -165,6 +176,7 @@ class StrandsCommandHandler(BaseCommandHandler):
         ephemeral=True,
       )
 
+  @coalesce_command()
   async def get_missing(self, ctx: commands.Context, *args: str) -> None:
     if len(args) == 0:
       puzzle_id = self.db.get_puzzle_by_date(self.utils.get_todays_date())
@@ -231,43 +243,43 @@ class StrandsCommandHandler(BaseCommandHandler):
 
     if user_id in await self.db.get_all_players():
       user_puzzles: list[StrandsPuzzleEntry] = await self.db.get_entries_by_player(user_id)
-      df = pd.DataFrame(columns=['User', 'Puzzle #', 'Rating', 'Hints', '🟡 Index', 'Puzzle'])
+      user_name = (await self.utils.names.resolve_many([user_id], ctx.guild)).get(user_id)
+      table = Table(['User', 'Puzzle #', 'Rating', 'Hints', '🟡 Index', 'Puzzle'])
       for i, puzzle_id in enumerate(puzzle_ids):
         found_match = False
         for entry in user_puzzles:
           if entry.puzzle_id == puzzle_id:
-            df.loc[i] = [
+            table.add_row(
                 ctx.author.display_name,
                 f"#{puzzle_id}",
                 f"{entry.rating:.2f}",
                 f"{entry.hints:d}",
                 f"{entry.spangram_index:d}",
                 f"{entry.puzzle_str}"
-            ]
+            )
             found_match = True
             break
 
         if not found_match:
-          df.loc[i] = [
-              self.utils.get_nickname(user_id),
+          table.add_row(
+              user_name,
               f"#{puzzle_id}",
               "?",
               "?",
               "?",
               "?"
-          ]
+          )
 
-      entries_img = self.utils.get_image_from_df(df)
+      entries_img = self.utils.get_image_from_table(table)
       if entries_img is not None:
-        with io.BytesIO() as image_binary:
-          entries_img.save(image_binary, 'PNG')
-          image_binary.seek(0)
-          await ctx.reply(file=discord.File(fp=image_binary, filename='image.png'))
+        image_binary = self.utils.image_to_binary(entries_img)
+        await ctx.reply(await self.get_puzzle_distributions(puzzle_ids), file=discord.File(fp=image_binary, filename='image.png'))
       else:
         await ctx.reply("Sorry, failed to fetch stats.")
     else:
       await ctx.reply(f"No records found for user <@{user_id}>.")
 
+  @coalesce_command(per_author=True)
   async def get_stats(self, ctx: commands.Context, *args: str) -> None:
       user_ids: list[int] = []
       unknown_ids: list[int] = []
@@ -294,43 +306,43 @@ class StrandsCommandHandler(BaseCommandHandler):
                 await ctx.reply(f"Couldn't find user(s): <@{'>, <@'.join(ids_list)}>")
                 return
 
-      df = pd.DataFrame(columns=['User', 'Avg Rating', 'Avg Hints', 'Avg 🟡 Index', '🧩', '🚫'])
+      names = await self.utils.names.resolve_many(user_ids, ctx.guild)
+      table = Table(['User', 'Avg Rating', 'Avg Hints', 'Hints %ile', 'Avg 🟡 Index', '🧩', '🚫'])
       for i, user_id in enumerate(user_ids):
           puzzle_list: list[int] = await self.db.get_puzzles_by_player(user_id)
           player_stats: StrandsPlayerStats = await self.player_stats.initialize(user_id, puzzle_list, self.db)
-          df.loc[i] = [
-              self.utils.get_nickname(user_id),
+          percentile: float | None = await self.db.distribution.get_percentile(user_id)
+          table.add_row(
+              names.get(user_id),
               f"{player_stats.avg_rating_raw:.2f}",
               f"{player_stats.avg_hints:.2f}",
+              f"{percentile:.0f}" if percentile is not None else "?",
               f"{player_stats.avg_spangram_index:.2f}",
               len(puzzle_list),
               len(await self.db.get_all_puzzles()) - len(puzzle_list),
-          ]
+          )
 
-      stats_img = self.utils.get_image_from_df(df)
+      stats_img = self.utils.get_image_from_table(table)
 
       hist_img = None
       if len(user_ids) < 5:
           valid_hints = ['0', '1', '2', '3', '4', '5', '6', '7']
           plt.rcParams.update({'font.size': 20})
 
-          df = pd.DataFrame(columns=['Player', 'Hints', 'Count'])
+          table = Table(['Player', 'Hints', 'Count'])
           for i, user_id in enumerate(user_ids):
-            user_name = self.utils.get_nickname(user_id)
+            user_name = names.get(user_id)
             if user_name is None:
               continue
 
-            hint_counts = [0] * len(valid_hints)
-            entries: list[StrandsPuzzleEntry] = await self.db.get_entries_by_player(user_id)
-            for hints in [entry.hints for entry in entries]:
-              hint_counts[hints] += 1
+            hint_counts: list[int] = await self.db.distribution.get_player_histogram(user_id)
             for j in range(0, len(valid_hints)):
-              df.loc[i*len(valid_hints) + j] = [
+              table.add_row(
                   self.utils.remove_emojis(user_name),
                   valid_hints[j],
                   hint_counts[j]
-              ]
-          g = sns.catplot(x='Hints', y='Count', hue='Player', data=df, kind='bar')
+              )
+          g = sns.catplot(x='Hints', y='Count', hue='Player', data=table.data, kind='bar')
           for ax in g.axes.ravel():
               for c in ax.containers:
                   labels = ['%d' % v.get_height() for v in c]
@@ -378,17 +390,3 @@ class StrandsCommandHandler(BaseCommandHandler):
         await ctx.message.add_reaction('❌')
     else:
       await ctx.reply(f"Could not find entry for Puzzle #{puzzle_id} for user <@{user_id}>.")
-
-  async def add_score(self, message: discord.Message | None, user: discord.User, *args: str) -> None:
-    self.utils.bot.logger.debug(f"Strands->add_score() :: {message}\n{user}\n{args}")
-
-    if message is not None and args is not None:
-      title = message.content.splitlines()[0].strip()
-      content = '\n'.join(message.content.splitlines()[2:])
-      self.utils.bot.logger.debug(f"{title}\n{content}\n")
-      if await self.add_entry(user, title, content, message.created_at):
-        await message.add_reaction('✅')
-      else:
-        await message.add_reaction('❌')
-    # else:
-    #   await ctx.reply("To manually add a Strands score, please use `?add <user> <Strands output>` (specifying a user is optional).")
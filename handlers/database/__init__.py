@@ -1,21 +1,40 @@
 import aiosqlite, discord, typing
 from datetime import date
 
-from numpy import True_
-
+from handlers.database.distributions import DistributionsDatabaseHandler
+from handlers.database.ratings import RatingsDatabaseHandler
+from handlers.database.streaks import StreaksDatabaseHandler
+from models.submission import ParsedSubmission
+from models.versus import VersusMatrix
 from utils.bot_utilities import BotUtilities
 
 class BaseDatabaseHandler(typing.Protocol):
+  # distinct queries kept by `fetch_cached` before it starts over
+  QUERY_CACHE_SIZE: int = 1024
+
   connection: aiosqlite.Connection
+  data_version: int
+  distribution: DistributionsDatabaseHandler
   puzzle_name: str
+  ratings: RatingsDatabaseHandler
+  streaks: StreaksDatabaseHandler
   utils: BotUtilities
 
   _arbitrary_date: date
   _arbitrary_date_puzzle: int
+  _query_cache: dict[tuple[str, tuple], tuple[typing.Hashable, list]]
+  _versus_cache: tuple[int, VersusMatrix] | None
 
   def __init__(self, utils: BotUtilities) -> None:
     self.connection: aiosqlite.Connection = utils.connection
     self.utils = utils
+    self.ratings = RatingsDatabaseHandler(self)
+    self.streaks = StreaksDatabaseHandler(self)
+
+    # bumped on every write so cached results know when they're stale
+    self.data_version = 0
+    self._query_cache = {}
+    self._versus_cache = None
 
     self.puzzle_name = ''
 
@@ -23,25 +42,121 @@ class BaseDatabaseHandler(typing.Protocol):
   # ABSTRACT METHODS #
   ####################
 
-  async def add_entry(self, user: discord.User | discord.Member, title: str, puzzle: str, datetime: str) -> bool: # type: ignore
+  async def add_entry(self, user: discord.User | discord.Member, submission: ParsedSubmission, datetime: str, # type: ignore
+                      commit: bool = True) -> bool:
+    """
+    Adds or updates one entry along with its derived tables. With `commit=False`, the caller
+    commits, so that it can write more in the same transaction.
+    """
     pass
 
   async def get_entries_by_player[T](self, user_id: int, puzzle_list: list[int] = []) -> list[T]: # type: ignore
     pass
 
+  async def get_scores(self, where: str = '1', values: tuple = ()) -> list[tuple[int, int, float]]: # type: ignore
+    pass
+
+  def get_normalized_scores_sql(self) -> str: # type: ignore
+    pass
+
+  def get_upsert_sql(self) -> str: # type: ignore
+    pass
+
+  def get_entry_values(self, user_id: int, submission: ParsedSubmission, datetime: str) -> tuple: # type: ignore
+    pass
+
   ####################
   #   BASE METHODS   #
   ####################
 
   async def reset_puzzle(self) -> None:
     self.utils.bot.logger.debug(f"Resetting {self.puzzle_name} database.")
-    await self.connection.execute(f"delete from {self.puzzle_name}")
-    await self.connection.commit()
+    # the connection is shared, a commit outside the lock could commit someone else's half-written entry
+    async with self.utils.write_lock:
+      await self.connection.execute(f"delete from {self.puzzle_name}")
+      await self.connection.execute("delete from submissions where puzzle_name = ?", (self.puzzle_name,))
+      await self.ratings.reset()
+      await self.streaks.reset()
+      await self.connection.commit()
+      self.distribution.invalidate()
+      self.data_version += 1
 
   async def remove_entry(self, user_id: int, puzzle_id: int) -> bool:
-    await self.connection.execute(f"delete from {self.puzzle_name} where user_id = ? and puzzle_id = ?", (user_id, puzzle_id))
-    await self.connection.commit()
-    return self.connection.total_changes > 0
+    async with self.utils.write_lock:
+      previous_value: int | None = await self.distribution.get_value(user_id, puzzle_id)
+      if previous_value is None:
+        return False
+
+      await self.connection.execute(f"delete from {self.puzzle_name} where user_id = ? and puzzle_id = ?", (user_id, puzzle_id))
+      # otherwise rebuilding from the log would bring the entry back
+      await self.connection.execute(
+        "delete from submissions where puzzle_name = ? and puzzle_id = ? and user_id = ?",
+        (self.puzzle_name, puzzle_id, user_id,)
+      )
+      await self.ratings.recompute(puzzle_id)
+      await self.streaks.remove(user_id, puzzle_id)
+      await self.connection.commit()
+      self.distribution.remove(user_id, puzzle_id, previous_value)
+      self.data_version += 1
+      return True
+
+  async def add_entries(self, entries: list[tuple[discord.User | discord.Member, ParsedSubmission, str]],
+                        rebuild: bool = True) -> int:
+    """
+    Writes many `(user, submission, datetime)` entries in one transaction. Rather than updating
+    ratings, streaks and distributions entry by entry, they're rebuilt once for the whole batch.
+    With `rebuild=False` nothing is rebuilt or committed, for callers writing several batches that
+    call `rebuild_derived` once at the end.
+    """
+    if len(entries) == 0:
+      return 0
+
+    users = {user.id: (user.id, user.name, self.utils.get_todays_date()) for user, _, _ in entries}
+    await self.connection.executemany("insert into users values (?, ?, ?) on conflict do nothing", users.values())
+    self.utils.users_version += 1
+    await self.write_entries([(user.id, submission, datetime) for user, submission, datetime in entries])
+    if rebuild:
+      await self.rebuild_derived(min(submission.puzzle_id for _, submission, _ in entries))
+    else:
+      # the histograms can't follow a bulk write, load them again on next use
+      self.distribution.invalidate()
+      self.data_version += 1
+    return len(entries)
+
+  async def write_entries(self, entries: list[tuple[int, ParsedSubmission, str]]) -> None:
+    """
+    Upserts `(user_id, submission, datetime)` entries without touching derived tables or committing.
+    """
+    await self.connection.executemany(
+      self.get_upsert_sql(),
+      [self.get_entry_values(user_id, submission, datetime) for user_id, submission, datetime in entries]
+    )
+
+  async def rebuild_derived(self, from_puzzle_id: int = 0, commit: bool = True) -> None:
+    """
+    Brings ratings (from `from_puzzle_id` on), streaks and distributions up to date after entries
+    were written in bulk, then commits unless `commit` is False.
+    """
+    if await self.ratings.is_built():
+      await self.ratings.recompute(from_puzzle_id)
+    else:
+      await self.ratings.recompute()
+    await self.streaks.rebuild()
+    if commit:
+      await self.connection.commit()
+    self.distribution.invalidate()
+    self.data_version += 1
+
+  async def on_entry_saved(self, user_id: int, puzzle_id: int, previous_score: float | None) -> None:
+    # keep derived tables in step with the entry, inside the same transaction
+    await self.ratings.update(user_id, puzzle_id, previous_score)
+    if previous_score is None:
+      await self.streaks.add(user_id, puzzle_id)
+      await self.distribution.add(user_id, puzzle_id)
+    else:
+      # the old value is gone, so rebuild the histograms on next use
+      self.distribution.invalidate()
+    self.data_version += 1
 
   async def add_user_if_not_exists(self, user: discord.User | discord.Member) -> None:
     if user is None:
@@ -50,33 +165,65 @@ class BaseDatabaseHandler(typing.Protocol):
     user_id = user.id
     user_name = user.name
     if not await self.user_exists(user_id):
-      self.utils.bot.logger.debug(f"Adding user to database: {user}")
+      self.utils.bot.logger.debug("Adding user to database: %s", user)
 
       await self.connection.execute(f"insert into users values (?, ?, ?)", (user_id, user_name, self.utils.get_todays_date(),))
       await self.connection.commit()
+      self.utils.users_version += 1
       if self.connection.total_changes <= 0:
         raise Exception("Failed to add user to the database")
 
   async def user_exists(self, user_id: int) -> bool:
-    self.utils.bot.logger.debug(f"Checking if user exists: {user_id}")
+    self.utils.bot.logger.debug("Checking if user exists: %s", user_id)
     async with self.connection.execute(
       f"select * from users where user_id = (?)",
       (user_id,)
     ) as cursor:
       user: aiosqlite.Row | None = await cursor.fetchone()
-      self.utils.bot.logger.debug(f"User exists? {user_id}: {cursor.rowcount} | {user}")
+      self.utils.bot.logger.debug("User exists? %s: %s | %s", user_id, cursor.rowcount, user)
       return False if user is None else True
 
   async def entry_exists(self, user_id: int, puzzle_id: int) -> bool:
-    self.utils.bot.logger.debug(f"Checking if entry exists: {user_id} | {puzzle_id}")
+    self.utils.bot.logger.debug("Checking if entry exists: %s | %s", user_id, puzzle_id)
     async with self.connection.execute(
       f"select * from {self.puzzle_name} where user_id = ? and puzzle_id = ?",
       (user_id, puzzle_id,)
     ) as cursor:
       entry: aiosqlite.Row | None = await cursor.fetchone()
-      self.utils.bot.logger.debug(f"Entry for user {user_id} and puzzle {puzzle_id}: {entry}")
+      self.utils.bot.logger.debug("Entry for user %s and puzzle %s: %s", user_id, puzzle_id, entry)
       return False if entry is None else True
 
+  async def get_score(self, user_id: int, puzzle_id: int) -> float | None:
+    scores = await self.get_scores("user_id = ? and puzzle_id = ?", (user_id, puzzle_id,))
+    return scores[0][2] if len(scores) > 0 else None
+
+  async def get_scores_by_puzzle(self, puzzle_id: int) -> dict[int, float]:
+    return {user_id: score for _, user_id, score in await self.get_scores("puzzle_id = ?", (puzzle_id,))}
+
+  async def fetch_cached(self, query: str, values: tuple = (), version: typing.Hashable = None) -> list:
+    """
+    Rows of `query`, kept until `version` (this game's `data_version` by default) changes, so
+    repeated reads in and across commands don't go back to the database until the next write.
+    """
+    # read before querying, so rows fetched while a write is in progress are never kept past it
+    version = self.data_version if version is None else version
+    cached = self._query_cache.get((query, values))
+    if cached is not None and cached[0] == version:
+      return cached[1]
+
+    async with self.connection.execute_fetchall(query, values) as rows:
+      rows = list(rows)
+    if len(self._query_cache) >= self.QUERY_CACHE_SIZE:
+      self._query_cache.clear()
+    self._query_cache[(query, values)] = (version, rows)
+    return rows
+
+  async def get_versus_matrix(self) -> VersusMatrix:
+    if self._versus_cache is None or self._versus_cache[0] != self.data_version:
+      version = self.data_version
+      self._versus_cache = (version, VersusMatrix(await self.get_scores()))
+    return self._versus_cache[1]
+
   ####################
   #  PUZZLE METHODS  #
   ####################
@@ -92,30 +239,25 @@ class BaseDatabaseHandler(typing.Protocol):
     return []
 
   async def get_all_puzzles(self) -> list[int]:
-    async with self.connection.execute_fetchall(f"select distinct puzzle_id from {self.puzzle_name}") as rows:
-      return [row[0] for row in rows]
+    rows = await self.fetch_cached(f"select distinct puzzle_id from {self.puzzle_name}")
+    return [row[0] for row in rows]
 
   ####################
   #  PLAYER METHODS  #
   ####################
 
   async def get_all_players(self) -> list[int]:
-    async with self.connection.execute_fetchall("select distinct user_id from users") as rows:
-      self.utils.bot.logger.debug(f"get_all_players():: {rows}")
-      return [row[0] for row in rows]
+    # users are shared by every game, so this follows their version rather than the game's
+    rows = await self.fetch_cached("select distinct user_id from users", version=self.utils.users_version)
+    self.utils.bot.logger.debug("get_all_players():: %d rows", len(rows))
+    return [row[0] for row in rows]
 
   async def get_puzzles_by_player(self, user_id: int) -> list[int]:
-    async with self.connection.execute_fetchall(
-      f"select distinct puzzle_id from {self.puzzle_name} where user_id = ?",
-      (user_id,)
-    ) as rows:
-      self.utils.bot.logger.debug(f"get_puzzles_by_player():: {rows}")
-      return [row[0] for row in rows]
+    rows = await self.fetch_cached(f"select distinct puzzle_id from {self.puzzle_name} where user_id = ?", (user_id,))
+    self.utils.bot.logger.debug("get_puzzles_by_player():: %d rows", len(rows))
+    return [row[0] for row in rows]
 
   async def get_players_by_puzzle_id(self, puzzle_id: int) -> list[int]:
-    async with self.connection.execute_fetchall(
-      f"select distinct user_id from {self.puzzle_name} where puzzle_id = ?",
-      (puzzle_id,)
-    ) as rows:
-      self.utils.bot.logger.debug(f"get_players_by_puzzle_id():: {rows}")
-      return [row[0] for row in rows]
+    rows = await self.fetch_cached(f"select distinct user_id from {self.puzzle_name} where puzzle_id = ?", (puzzle_id,))
+    self.utils.bot.logger.debug("get_players_by_puzzle_id():: %d rows", len(rows))
+    return [row[0] for row in rows]
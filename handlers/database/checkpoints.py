@@ -0,0 +1,56 @@
+from utils.bot_utilities import BotUtilities
+
+class CheckpointsDatabaseHandler():
+  """
+  The last message each channel's history has been read up to, so a backfill can resume where
+  the previous one stopped, and the oldest puzzle of each game whose ratings and streaks still
+  have to be rebuilt for the entries backfilled so far.
+  """
+  utils: BotUtilities
+
+  def __init__(self, utils: BotUtilities) -> None:
+    utils.bot.logger.debug(f"Initializing {self.__class__.__name__} class.")
+    self.utils = utils
+
+  ########################
+  #  CHECKPOINT METHODS  #
+  ########################
+
+  async def get_checkpoint(self, channel_id: int) -> int | None:
+    async with self.utils.connection.execute_fetchall(
+      "select message_id from channel_checkpoints where channel_id = ?",
+      (channel_id,)
+    ) as rows:
+      return rows[0][0] if len(rows) > 0 else None
+
+  async def get_channels(self) -> list[int]:
+    async with self.utils.connection.execute_fetchall("select channel_id from channel_checkpoints") as rows:
+      return [row[0] for row in rows]
+
+  async def set_checkpoint(self, channel_id: int, message_id: int) -> None:
+    # never move a checkpoint backwards
+    await self.utils.connection.execute(
+      """insert into channel_checkpoints (channel_id, message_id) values (?, ?) on conflict (channel_id)
+      do update set message_id = max(message_id, excluded.message_id), updated_at = current_timestamp""",
+      (channel_id, message_id,)
+    )
+    await self.utils.connection.commit()
+
+  async def mark_rebuild(self, puzzle_name: str, puzzle_id: int) -> None:
+    """
+    Records that `puzzle_name` needs rebuilding from `puzzle_id` on. Doesn't commit, so that it's
+    committed with the entries that need it.
+    """
+    await self.utils.connection.execute(
+      """insert into pending_rebuilds (puzzle_name, puzzle_id) values (?, ?) on conflict (puzzle_name)
+      do update set puzzle_id = min(puzzle_id, excluded.puzzle_id)""",
+      (puzzle_name, puzzle_id,)
+    )
+
+  async def get_pending_rebuilds(self) -> dict[str, int]:
+    async with self.utils.connection.execute_fetchall("select puzzle_name, puzzle_id from pending_rebuilds") as rows:
+      return {row[0]: row[1] for row in rows}
+
+  async def clear_rebuild(self, puzzle_name: str) -> None:
+    # doesn't commit, the rebuild it was done by does
+    await self.utils.connection.execute("delete from pending_rebuilds where puzzle_name = ?", (puzzle_name,))
@@ -0,0 +1,49 @@
+from datetime import date
+
+from handlers.database import BaseDatabaseHandler
+from utils.bot_utilities import BotUtilities
+
+class CombinedDatabaseHandler():
+  """
+  Queries across every game at once. Each game contributes a query of `(user_id, normalized)`
+  rows, where 0.0 is a perfect game and 1.0 is a failed one, and the union of all of them is
+  aggregated per player in a single statement.
+  """
+  games: list[BaseDatabaseHandler]
+  utils: BotUtilities
+
+  def __init__(self, utils: BotUtilities, games: list[BaseDatabaseHandler]) -> None:
+    utils.bot.logger.debug(f"Initializing {self.__class__.__name__} class.")
+    self.utils = utils
+    self.games = games
+
+  @property
+  def data_version(self) -> tuple[int, ...]:
+    return tuple(game.data_version for game in self.games)
+
+  ####################
+  #  PLAYER METHODS  #
+  ####################
+
+  async def get_totals_by_player(self, start_date: date | None, end_date: date | None) -> dict[int, tuple[float, list[int]]]:
+    """
+    Returns `user_id -> (sum of normalized scores, [entries per game])` for puzzles between the
+    two dates (inclusive). Either date may be `None` to leave that end of the range open.
+    """
+    queries: list[str] = []
+    values: list[int] = []
+    for i, game in enumerate(self.games):
+      queries.append(f"select {i} as game, user_id, normalized from ({game.get_normalized_scores_sql()})")
+      values.append(game.get_puzzle_by_date(start_date) if start_date is not None else 0)
+      values.append(game.get_puzzle_by_date(end_date) if end_date is not None else 2 ** 31)
+
+    game_counts = ', '.join([f"sum(game = {i})" for i in range(len(self.games))])
+    totals: dict[int, tuple[float, list[int]]] = {}
+    async with self.utils.connection.execute_fetchall(
+      f"select user_id, sum(normalized), {game_counts} from ({' union all '.join(queries)}) group by user_id",
+      values
+    ) as rows:
+      for row in rows:
+        totals[row[0]] = (row[1], list(row[2:]))
+
+    return totals
@@ -1,11 +1,10 @@
-import discord, re
-from collections import Counter
+import discord
 from datetime import date
 
-from numpy import True_
-
 from handlers.database import BaseDatabaseHandler
+from handlers.database.distributions import DistributionsDatabaseHandler
 from models import PuzzleName
+from models.submission import ParsedSubmission
 from models.connections import ConnectionsPuzzleEntry
 from utils.bot_utilities import BotUtilities
 
@@ -16,6 +15,7 @@ class ConnectionsDatabaseHandler(BaseDatabaseHandler):
     # init
     super().__init__(utils)
     self.puzzle_name = PuzzleName.CONNECTIONS.value.lower()
+    self.distribution = DistributionsDatabaseHandler(self, 'score', list(range(4, 9)))
 
     # puzzles
     self._arbitrary_date = date(2023, 6, 12)
@@ -25,29 +25,27 @@ class ConnectionsDatabaseHandler(BaseDatabaseHandler):
   #  PUZZLE METHODS  #
   ####################
 
-  async def add_entry(self, user: discord.User | discord.Member, title: str, puzzle: str, datetime) -> bool:
-    puzzle_id_title: list[str] = re.findall(r'[\d,]+', title)
-    score: int = self.__get_score_from_puzzle(puzzle)
-    self.utils.bot.logger.debug(f"Connections->add_entry() :: {puzzle_id_title}\n{puzzle}\n->{score}")
-
-    if puzzle_id_title:
-      puzzle_id = int(str(puzzle_id_title[0]).replace(',', ''))
-    else:
-      return False
+  async def add_entry(self, user: discord.User | discord.Member, submission: ParsedSubmission, datetime,
+                      commit: bool = True) -> bool:
+    puzzle_id: int = submission.puzzle_id
+    puzzle: str = submission.puzzle
+    score: int = submission.score
+    self.utils.bot.logger.debug("Connections->add_entry() :: %s\n%s\n->%s", puzzle_id, puzzle, score)
 
     await self.add_user_if_not_exists(user)
     user_id: int = user.id
 
     try:
-      if await self.entry_exists(user_id, puzzle_id):
-        self.utils.bot.logger.debug(f"Entry already exists for {user_id} and {puzzle_id}.")
+      previous_score: float | None = await self.get_score(user_id, puzzle_id)
+      if previous_score is not None:
+        self.utils.bot.logger.debug("Entry already exists for %s and %s.", user_id, puzzle_id)
         await self.connection.execute(
           f"update {self.puzzle_name} set score = ? where user_id = ? and puzzle_id = ?",
           (score, user_id, puzzle_id,)
         )
       else:
         values = (puzzle_id, user_id, puzzle, score, datetime,)
-        self.utils.bot.logger.debug(f"Adding entry for {user_id} and {puzzle_id}...")
+        self.utils.bot.logger.debug("Adding entry for %s and %s...", user_id, puzzle_id)
         self.utils.bot.logger.debug(values)
 
         await self.connection.execute(
@@ -55,11 +53,20 @@ class ConnectionsDatabaseHandler(BaseDatabaseHandler):
           values,
         )
 
-      await self.connection.commit()
+      await self.on_entry_saved(user_id, puzzle_id, previous_score)
+      if commit:
+        await self.connection.commit()
       return True
     except Exception as e:
       return False
 
+  def get_upsert_sql(self) -> str:
+    return f"""insert into {self.puzzle_name} values (?, ?, ?, ?, ?) on conflict (puzzle_id, user_id)
+      do update set score = excluded.score"""
+
+  def get_entry_values(self, user_id: int, submission: ParsedSubmission, datetime: str) -> tuple:
+    return (submission.puzzle_id, user_id, submission.puzzle, submission.score, datetime,)
+
   ####################
   #  PLAYER METHODS  #
   ####################
@@ -73,22 +80,21 @@ class ConnectionsDatabaseHandler(BaseDatabaseHandler):
       query = f"select puzzle_id, score, puzzle_str from {self.puzzle_name} where user_id = ? and puzzle_id in (?)"
       query_values = (user_id,puzzle_list_str,)
 
-    self.utils.bot.logger.debug(f"Connections->Getting entries for user: <{user_id}>...")
+    self.utils.bot.logger.debug("Connections->Getting entries for user: <%s>...", user_id)
     entries: list[ConnectionsPuzzleEntry] = []
     async with self.connection.execute_fetchall(query, query_values) as rows:
       for row in rows:
-        self.utils.bot.logger.debug(f"row -> {row}")
         entries.append(ConnectionsPuzzleEntry(row[0], user_id, row[1], row[2]))
 
     return entries
 
-  ####################
-  #  HELPER METHODS  #
-  ####################
+  def get_normalized_scores_sql(self) -> str:
+    # no mistakes -> 0.0, 4 mistakes -> 1.0
+    return f"select user_id, (score - 4) / 4.0 as normalized from {self.puzzle_name} where puzzle_id between ? and ?"
 
-  def __get_score_from_puzzle(self, puzzle: str) -> int:
-    puzzle_lines: list[str] = puzzle.split('\n')
-    if len(Counter(puzzle_lines[-1]).keys()) == 1:
-      return len(puzzle_lines)
-    else:
-      return 8
+  async def get_scores(self, where: str = '1', values: tuple = ()) -> list[tuple[int, int, float]]:
+    async with self.connection.execute_fetchall(
+      f"select puzzle_id, user_id, score from {self.puzzle_name} where {where} order by puzzle_id, rowid",
+      values
+    ) as rows:
+      return [(row[0], row[1], float(row[2])) for row in rows]
@@ -0,0 +1,139 @@
+import asyncio, typing
+
+if typing.TYPE_CHECKING:
+  from handlers.database import BaseDatabaseHandler
+
+class DistributionsDatabaseHandler():
+  """
+  In-memory histograms of a single column (score, hints, ...) for one game.
+
+  Histograms are kept for the whole game, per player and per puzzle. They are loaded with two
+  grouped queries the first time they're needed and then updated as entries are added or
+  removed, so lookups never touch the database. Buckets are ordered best to worst.
+
+  Only one load runs at a time, and it's built aside and kept only if nothing changed while its
+  queries were running (otherwise it runs again).
+  """
+  db: "BaseDatabaseHandler"
+  column: str
+  buckets: list[int]
+
+  _game: list[int]
+  _players: dict[int, list[int]]
+  _puzzles: dict[int, list[int]]
+  _loaded: bool
+  _load_lock: asyncio.Lock
+  # bumped by anything that changes the counts, so that a load in progress knows it's out of date
+  _generation: int
+
+  def __init__(self, db: "BaseDatabaseHandler", column: str, buckets: list[int]) -> None:
+    self.db = db
+    self.column = column
+    self.buckets = buckets
+    self._load_lock = asyncio.Lock()
+    self._generation = 0
+    self.invalidate()
+
+  ########################
+  # DISTRIBUTION METHODS #
+  ########################
+
+  async def add(self, user_id: int, puzzle_id: int) -> None:
+    if not self._loaded:
+      self._generation += 1
+      return
+
+    value: int | None = await self.get_value(user_id, puzzle_id)
+    if value is not None:
+      self._count(user_id, puzzle_id, value, 1)
+
+  async def get_value(self, user_id: int, puzzle_id: int) -> int | None:
+    async with self.db.connection.execute_fetchall(
+      f"select {self.column} from {self.db.puzzle_name} where user_id = ? and puzzle_id = ?",
+      (user_id, puzzle_id,)
+    ) as rows:
+      return rows[0][0] if len(rows) > 0 else None
+
+  def remove(self, user_id: int, puzzle_id: int, value: int) -> None:
+    if self._loaded:
+      self._count(user_id, puzzle_id, value, -1)
+    else:
+      self._generation += 1
+
+  def invalidate(self) -> None:
+    self._generation += 1
+    self._game = [0] * len(self.buckets)
+    self._players = {}
+    self._puzzles = {}
+    self._loaded = False
+
+  ####################
+  #  QUERY METHODS   #
+  ####################
+
+  async def get_player_histogram(self, user_id: int) -> list[int]:
+    await self._load()
+    return list(self._players.get(user_id, [0] * len(self.buckets)))
+
+  async def get_puzzle_histogram(self, puzzle_id: int) -> list[int]:
+    await self._load()
+    return list(self._puzzles.get(puzzle_id, [0] * len(self.buckets)))
+
+  async def get_percentile(self, user_id: int) -> float | None:
+    """
+    Percentage of all of the game's entries that are worse than the player's average.
+    """
+    await self._load()
+    player = self._players.get(user_id)
+    total = sum(self._game)
+    if player is None or sum(player) == 0 or total == 0:
+      return None
+
+    mean = sum(bucket * count for bucket, count in zip(self.buckets, player)) / sum(player)
+    worse = sum(count for bucket, count in zip(self.buckets, self._game) if bucket > mean)
+    equal = sum(count for bucket, count in zip(self.buckets, self._game) if bucket == mean)
+    return 100.0 * (worse + 0.5 * equal) / total
+
+  ####################
+  #  HELPER METHODS  #
+  ####################
+
+  async def _load(self) -> None:
+    if self._loaded:
+      return
+
+    async with self._load_lock:
+      while not self._loaded:
+        generation = self._generation
+        game = [0] * len(self.buckets)
+        players: dict[int, list[int]] = {}
+        puzzles: dict[int, list[int]] = {}
+        async with self.db.connection.execute_fetchall(
+          f"select user_id, {self.column}, count(*) from {self.db.puzzle_name} group by user_id, {self.column}"
+        ) as rows:
+          for row in rows:
+            self._add_to(players, row[0], row[1], row[2])
+            game[self._index(row[1])] += row[2]
+        async with self.db.connection.execute_fetchall(
+          f"select puzzle_id, {self.column}, count(*) from {self.db.puzzle_name} group by puzzle_id, {self.column}"
+        ) as rows:
+          for row in rows:
+            self._add_to(puzzles, row[0], row[1], row[2])
+
+        if generation == self._generation:
+          self._game, self._players, self._puzzles = game, players, puzzles
+          self._loaded = True
+
+  def _count(self, user_id: int, puzzle_id: int, value: int, count: int) -> None:
+    self._game[self._index(value)] += count
+    self._add_to(self._players, user_id, value, count)
+    self._add_to(self._puzzles, puzzle_id, value, count)
+
+  def _add_to(self, histograms: dict[int, list[int]], key: int, value: int, count: int) -> None:
+    if key not in histograms:
+      histograms[key] = [0] * len(self.buckets)
+    histograms[key][self._index(value)] += count
+
+  def _index(self, value: int) -> int:
+    # anything past the last bucket is counted in it (e.g. a strands game with 9 hints)
+    return min(max(value - self.buckets[0], 0), len(self.buckets) - 1)
@@ -0,0 +1,177 @@
+import typing
+
+if typing.TYPE_CHECKING:
+  from handlers.database import BaseDatabaseHandler
+
+class RatingsDatabaseHandler():
+  """
+  Elo-style skill rating for a single game.
+
+  Every puzzle is treated as a multiplayer match among the players who submitted it. When a
+  new entry arrives, the submitter plays one pairwise match against each player that already
+  submitted the same puzzle (lower score wins), so an update is O(participants). The change
+  applied to each player for each puzzle is kept in `rating_changes`, which lets us rewind to
+  any puzzle and replay from there when an entry is removed, its score changes or it arrives
+  after later puzzles were already rated.
+  """
+  BASE_RATING: float = 1500.0
+  K_FACTOR: float = 32.0
+  SCALE: float = 400.0
+
+  db: "BaseDatabaseHandler"
+
+  def __init__(self, db: "BaseDatabaseHandler") -> None:
+    self.db = db
+
+  ####################
+  #  RATING METHODS  #
+  ####################
+
+  async def update(self, user_id: int, puzzle_id: int, previous_score: float | None) -> None:
+    scores: dict[int, float] = await self.db.get_scores_by_puzzle(puzzle_id)
+    if user_id not in scores:
+      return
+
+    if not await self.is_built():
+      # entries recorded before ratings existed, replay all of them including this one
+      await self.recompute()
+    elif previous_score is None and puzzle_id < await self.get_last_rated_puzzle():
+      # a late entry: the matches played since were rated without it
+      await self.recompute(puzzle_id)
+    elif previous_score is None:
+      ratings = await self.get_ratings(list(scores.keys()))
+      deltas = self.get_match_deltas(user_id, scores, ratings)
+      await self._apply_deltas(puzzle_id, user_id, deltas)
+    elif previous_score != scores[user_id]:
+      # a changed score invalidates every match played from this puzzle onward
+      await self.recompute(puzzle_id)
+
+  async def recompute(self, from_puzzle_id: int = 0) -> None:
+    self.db.utils.bot.logger.debug(f"Recomputing {self.db.puzzle_name} ratings from puzzle #{from_puzzle_id}...")
+    await self.db.connection.execute(
+      "delete from rating_changes where puzzle_name = ? and puzzle_id >= ?",
+      (self.db.puzzle_name, from_puzzle_id,)
+    )
+
+    # rewind the current ratings to just before `from_puzzle_id`
+    ratings: dict[int, float] = {}
+    games: dict[int, int] = {}
+    async with self.db.connection.execute_fetchall(
+      "select user_id, sum(delta), count(*) from rating_changes where puzzle_name = ? group by user_id",
+      (self.db.puzzle_name,)
+    ) as rows:
+      for row in rows:
+        ratings[row[0]] = self.BASE_RATING + row[1]
+        games[row[0]] = row[2]
+
+    # replay every remaining entry in submission order
+    changes: dict[tuple[int, int], float] = {}
+    puzzle_scores: dict[int, float] = {}
+    current_puzzle: int | None = None
+    for puzzle_id, user_id, score in await self.db.get_scores("puzzle_id >= ?", (from_puzzle_id,)):
+      if puzzle_id != current_puzzle:
+        current_puzzle = puzzle_id
+        puzzle_scores = {}
+      puzzle_scores[user_id] = score
+
+      for player_id, delta in self.get_match_deltas(user_id, puzzle_scores, ratings).items():
+        ratings[player_id] = ratings.get(player_id, self.BASE_RATING) + delta
+        changes[(puzzle_id, player_id)] = changes.get((puzzle_id, player_id), 0.0) + delta
+      games[user_id] = games.get(user_id, 0) + 1
+
+    await self.db.connection.executemany(
+      "insert into rating_changes values (?, ?, ?, ?)",
+      [(self.db.puzzle_name, p_id, u_id, delta) for (p_id, u_id), delta in changes.items()]
+    )
+    await self.db.connection.execute("delete from ratings where puzzle_name = ?", (self.db.puzzle_name,))
+    await self.db.connection.executemany(
+      "insert into ratings (puzzle_name, user_id, rating, games) values (?, ?, ?, ?)",
+      [(self.db.puzzle_name, u_id, rating, games.get(u_id, 0)) for u_id, rating in ratings.items()]
+    )
+
+  async def reset(self) -> None:
+    await self.db.connection.execute("delete from rating_changes where puzzle_name = ?", (self.db.puzzle_name,))
+    await self.db.connection.execute("delete from ratings where puzzle_name = ?", (self.db.puzzle_name,))
+
+  ####################
+  #  QUERY METHODS   #
+  ####################
+
+  async def get_ratings(self, user_ids: list[int]) -> dict[int, float]:
+    placeholders = ','.join(['?'] * len(user_ids))
+    async with self.db.connection.execute_fetchall(
+      f"select user_id, rating from ratings where puzzle_name = ? and user_id in ({placeholders})",
+      (self.db.puzzle_name, *user_ids,)
+    ) as rows:
+      return {row[0]: row[1] for row in rows}
+
+  async def get_last_rated_puzzle(self) -> int:
+    async with self.db.connection.execute_fetchall(
+      "select coalesce(max(puzzle_id), 0) from rating_changes where puzzle_name = ?",
+      (self.db.puzzle_name,)
+    ) as rows:
+      return rows[0][0]
+
+  async def is_built(self) -> bool:
+    async with self.db.connection.execute_fetchall(
+      "select exists(select 1 from ratings where puzzle_name = ?)",
+      (self.db.puzzle_name,)
+    ) as rows:
+      return bool(rows[0][0])
+
+  async def get_leaderboard(self, limit: int) -> list[tuple[int, float, int]]:
+    if not await self.is_built() and len(await self.db.get_all_puzzles()) > 0:
+      async with self.db.utils.write_lock:
+        # entries recorded before ratings existed, build them once from scratch (unless a command
+        # that was waiting for the lock already has)
+        if not await self.is_built():
+          await self.recompute()
+          await self.db.connection.commit()
+
+    async with self.db.connection.execute_fetchall(
+      "select user_id, rating, games from ratings where puzzle_name = ? order by rating desc limit ?",
+      (self.db.puzzle_name, limit,)
+    ) as rows:
+      return [(row[0], row[1], row[2]) for row in rows]
+
+  ####################
+  #  HELPER METHODS  #
+  ####################
+
+  def get_match_deltas(self, user_id: int, scores: dict[int, float], ratings: dict[int, float]) -> dict[int, float]:
+    """
+    Rating changes from `user_id` playing everyone else in `scores` (lower score wins).
+    The K-factor is split across opponents so a crowded puzzle doesn't swing ratings more.
+    """
+    deltas: dict[int, float] = {user_id: 0.0}
+    opponents = [u_id for u_id in scores if u_id != user_id]
+    if len(opponents) == 0:
+      return deltas
+
+    k_factor = self.K_FACTOR / len(opponents)
+    user_rating = ratings.get(user_id, self.BASE_RATING)
+    for opponent_id in opponents:
+      expected = 1.0 / (1.0 + 10 ** ((ratings.get(opponent_id, self.BASE_RATING) - user_rating) / self.SCALE))
+      if scores[user_id] < scores[opponent_id]:
+        actual = 1.0
+      elif scores[user_id] == scores[opponent_id]:
+        actual = 0.5
+      else:
+        actual = 0.0
+      change = k_factor * (actual - expected)
+      deltas[user_id] += change
+      deltas[opponent_id] = -change
+
+    return deltas
+
+  async def _apply_deltas(self, puzzle_id: int, user_id: int, deltas: dict[int, float]) -> None:
+    await self.db.connection.executemany(
+      """insert into ratings (puzzle_name, user_id, rating, games) values (?, ?, ?, ?)
+      on conflict (puzzle_name, user_id) do update set rating = rating + ?, games = games + excluded.games""",
+      [(self.db.puzzle_name, u_id, self.BASE_RATING + delta, int(u_id == user_id), delta) for u_id, delta in deltas.items()]
+    )
+    await self.db.connection.executemany(
+      """insert into rating_changes values (?, ?, ?, ?)
+      on conflict (puzzle_name, puzzle_id, user_id) do update set delta = delta + excluded.delta""",
+      [(self.db.puzzle_name, puzzle_id, u_id, delta) for u_id, delta in deltas.items()]
+    )
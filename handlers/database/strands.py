@@ -1,17 +1,23 @@
-import discord, re
+import discord
 from datetime import date
 
 from handlers.database import BaseDatabaseHandler
+from handlers.database.distributions import DistributionsDatabaseHandler
 from models import PuzzleName
+from models.submission import ParsedSubmission
 from models.strands import StrandsPuzzleEntry
 from utils.bot_utilities import BotUtilities
 
 class StrandsDatabaseHandler(BaseDatabaseHandler):
+  # rating penalty (above a perfect 1.0) that normalizes to the worst score
+  WORST_RATING_PENALTY: float = 1.25
+
   def __init__(self, utils: BotUtilities) -> None:
     utils.bot.logger.debug(f"Initializing {self.__class__.__name__} class.")
     # init
     super().__init__(utils)
     self.puzzle_name = PuzzleName.STRANDS.value.lower()
+    self.distribution = DistributionsDatabaseHandler(self, 'hints', list(range(0, 8)))
 
     # puzzles
     self._arbitrary_date = date(2024, 3, 5)
@@ -21,29 +27,27 @@ class StrandsDatabaseHandler(BaseDatabaseHandler):
   #  PUZZLE METHODS  #
   ####################
 
-  async def add_entry(self, user: discord.User | discord.Member, title: str, puzzle: str, datetime) -> bool:
-    puzzle_id_title = re.findall(r'[\d,]+', title)
-    hints: int = puzzle.count('💡')
-    self.utils.bot.logger.debug(f"Strands->add_entry() :: {puzzle_id_title}\n{puzzle}\n->{hints}")
-
-    if puzzle_id_title:
-      puzzle_id = int(str(puzzle_id_title[0]).replace(',', ''))
-    else:
-      return False
+  async def add_entry(self, user: discord.User | discord.Member, submission: ParsedSubmission, datetime,
+                      commit: bool = True) -> bool:
+    puzzle_id: int = submission.puzzle_id
+    puzzle: str = submission.puzzle
+    hints: int = submission.hints
+    self.utils.bot.logger.debug("Strands->add_entry() :: %s\n%s\n->%s", puzzle_id, puzzle, hints)
 
     await self.add_user_if_not_exists(user)
     user_id: int = user.id
 
     try:
-      if await self.entry_exists(user_id, puzzle_id):
-        self.utils.bot.logger.debug(f"Entry already exists for {user_id} and {puzzle_id}.")
+      previous_score: float | None = await self.get_score(user_id, puzzle_id)
+      if previous_score is not None:
+        self.utils.bot.logger.debug("Entry already exists for %s and %s.", user_id, puzzle_id)
         await self.connection.execute(
           f"update {self.puzzle_name} set hints = ?, puzzle_str = ? where user_id = ? and puzzle_id = ?",
           (hints, puzzle, user_id, puzzle_id,)
         )
       else:
         values = (puzzle_id, user_id, puzzle, hints, datetime,)
-        self.utils.bot.logger.debug(f"Adding entry for {user_id} and {puzzle_id}...")
+        self.utils.bot.logger.debug("Adding entry for %s and %s...", user_id, puzzle_id)
         self.utils.bot.logger.debug(values)
 
         await self.connection.execute(
@@ -51,11 +55,20 @@ class StrandsDatabaseHandler(BaseDatabaseHandler):
           values,
         )
 
-      await self.connection.commit()
+      await self.on_entry_saved(user_id, puzzle_id, previous_score)
+      if commit:
+        await self.connection.commit()
       return True
     except Exception as e:
       return False
 
+  def get_upsert_sql(self) -> str:
+    return f"""insert into {self.puzzle_name} values (?, ?, ?, ?, ?) on conflict (puzzle_id, user_id)
+      do update set hints = excluded.hints, puzzle_str = excluded.puzzle_str"""
+
+  def get_entry_values(self, user_id: int, submission: ParsedSubmission, datetime: str) -> tuple:
+    return (submission.puzzle_id, user_id, submission.puzzle, submission.hints, datetime,)
+
   ####################
   #  PLAYER METHODS  #
   ####################
@@ -69,11 +82,32 @@ class StrandsDatabaseHandler(BaseDatabaseHandler):
       query = f"select puzzle_id, hints, puzzle_str from {self.puzzle_name} where user_id = ? and puzzle_id in (?)"
       query_values = (user_id, puzzle_list_str,)
 
-    self.utils.bot.logger.debug(f"Strands->Getting entries for user: <{user_id}>...")
+    self.utils.bot.logger.debug("Strands->Getting entries for user: <%s>...", user_id)
     entries: list[StrandsPuzzleEntry] = []
     async with self.connection.execute_fetchall(query, query_values) as rows:
       for row in rows:
-        self.utils.bot.logger.debug(f"row -> {row}")
         entries.append(StrandsPuzzleEntry(row[0], user_id, row[1], row[2]))
 
     return entries
+
+  def get_normalized_scores_sql(self) -> str:
+    # same rating as StrandsPuzzleEntry, computed in SQL so it can be ranked with the other games
+    penalty = StrandsPuzzleEntry.HINT_PENALTY
+    return f"""select user_id, min(1.0, (
+        {penalty} * hints + case when words > 0 then {penalty} * (spangram - 1.0) / words else 0 end
+      ) / {self.WORST_RATING_PENALTY}) as normalized from (
+        select user_id, hints, length(grid) - length(replace(grid, '🔵', '')) as words,
+          coalesce(nullif(instr(grid, '🟡'), 0), length(grid) + 1) as spangram
+        from (
+          select user_id, hints, replace(replace(trim(puzzle_str), char(10), ''), ' ', '') as grid
+          from {self.puzzle_name} where puzzle_id between ? and ?
+        )
+      )"""
+
+  async def get_scores(self, where: str = '1', values: tuple = ()) -> list[tuple[int, int, float]]:
+    # strands are scored by their rating, which is derived from the puzzle string
+    async with self.connection.execute_fetchall(
+      f"select puzzle_id, user_id, hints, puzzle_str from {self.puzzle_name} where {where} order by puzzle_id, rowid",
+      values
+    ) as rows:
+      return [(row[0], row[1], StrandsPuzzleEntry(row[0], row[1], row[2], row[3]).rating) for row in rows]
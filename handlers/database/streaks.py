@@ -0,0 +1,145 @@
+import typing
+
+if typing.TYPE_CHECKING:
+  from handlers.database import BaseDatabaseHandler
+
+class StreaksDatabaseHandler():
+  """
+  Daily streaks for a single game.
+
+  Puzzle ids are consecutive days, so each player's history is stored as runs of consecutive
+  puzzle ids (`start_id`..`end_id`) with a gap between every pair of runs. Adding an entry
+  extends or merges the neighbouring runs and removing one splits the run containing it, so
+  both are a handful of indexed lookups no matter how long the history is.
+  """
+  db: "BaseDatabaseHandler"
+
+  def __init__(self, db: "BaseDatabaseHandler") -> None:
+    self.db = db
+
+  ####################
+  #  STREAK METHODS  #
+  ####################
+
+  async def add(self, user_id: int, puzzle_id: int) -> None:
+    if not await self.is_built():
+      # entries recorded before streaks existed, build them from scratch including this one
+      await self.rebuild()
+      return
+    if await self._get_run(user_id, "start_id <= ? and end_id >= ?", (puzzle_id, puzzle_id,)) is not None:
+      return
+
+    before = await self._get_run(user_id, "end_id = ?", (puzzle_id - 1,))
+    after = await self._get_run(user_id, "start_id = ?", (puzzle_id + 1,))
+
+    if before is not None and after is not None:
+      # the new entry fills the gap between two runs
+      await self._delete_run(user_id, after[0])
+      await self._set_run(user_id, before[0], before[0], after[1])
+    elif before is not None:
+      await self._set_run(user_id, before[0], before[0], puzzle_id)
+    elif after is not None:
+      await self._set_run(user_id, after[0], puzzle_id, after[1])
+    else:
+      await self.db.connection.execute(
+        "insert into streaks (puzzle_name, user_id, start_id, end_id) values (?, ?, ?, ?)",
+        (self.db.puzzle_name, user_id, puzzle_id, puzzle_id,)
+      )
+
+  async def remove(self, user_id: int, puzzle_id: int) -> None:
+    run = await self._get_run(user_id, "start_id <= ? and end_id >= ?", (puzzle_id, puzzle_id,))
+    if run is None:
+      return
+
+    await self._delete_run(user_id, run[0])
+    new_runs = [(s, e) for s, e in [(run[0], puzzle_id - 1), (puzzle_id + 1, run[1])] if s <= e]
+    await self.db.connection.executemany(
+      "insert into streaks (puzzle_name, user_id, start_id, end_id) values (?, ?, ?, ?)",
+      [(self.db.puzzle_name, user_id, s, e) for s, e in new_runs]
+    )
+
+  async def rebuild(self) -> None:
+    self.db.utils.bot.logger.debug(f"Rebuilding {self.db.puzzle_name} streaks...")
+    await self.reset()
+    # consecutive puzzle ids share the same `puzzle_id - row_number()` value
+    await self.db.connection.execute(
+      f"""insert into streaks (puzzle_name, user_id, start_id, end_id)
+      select ?, user_id, min(puzzle_id), max(puzzle_id) from (
+        select user_id, puzzle_id, puzzle_id - row_number() over (partition by user_id order by puzzle_id) as run
+        from {self.db.puzzle_name}
+      ) group by user_id, run""",
+      (self.db.puzzle_name,)
+    )
+
+  async def reset(self) -> None:
+    await self.db.connection.execute("delete from streaks where puzzle_name = ?", (self.db.puzzle_name,))
+
+  ####################
+  #  QUERY METHODS   #
+  ####################
+
+  async def get_active_streaks(self, todays_puzzle_id: int, limit: int) -> list[tuple[int, int, int]]:
+    """
+    Returns `(user_id, current, longest)` for every player whose latest run reaches yesterday
+    or today, longest current streak first.
+    """
+    await self._build_if_missing()
+    async with self.db.connection.execute_fetchall(
+      """select s.user_id, s.end_id - s.start_id + 1 as current, (
+        select max(l.end_id - l.start_id + 1) from streaks l
+        where l.puzzle_name = s.puzzle_name and l.user_id = s.user_id
+      ) as longest
+      from streaks s where s.puzzle_name = ? and s.end_id >= ?
+      order by current desc, longest desc limit ?""",
+      (self.db.puzzle_name, todays_puzzle_id - 1, limit,)
+    ) as rows:
+      return [(row[0], row[1], row[2]) for row in rows]
+
+  async def get_player_streaks(self, user_id: int, todays_puzzle_id: int) -> tuple[int, int]:
+    await self._build_if_missing()
+    async with self.db.connection.execute_fetchall(
+      """select coalesce(max(case when end_id >= ? then end_id - start_id + 1 end), 0), coalesce(max(end_id - start_id + 1), 0)
+      from streaks where puzzle_name = ? and user_id = ?""",
+      (todays_puzzle_id - 1, self.db.puzzle_name, user_id,)
+    ) as rows:
+      return rows[0][0], rows[0][1]
+
+  ####################
+  #  HELPER METHODS  #
+  ####################
+
+  async def is_built(self) -> bool:
+    async with self.db.connection.execute_fetchall(
+      "select exists(select 1 from streaks where puzzle_name = ?)",
+      (self.db.puzzle_name,)
+    ) as rows:
+      return bool(rows[0][0])
+
+  async def _build_if_missing(self) -> None:
+    if await self.is_built() or len(await self.db.get_all_puzzles()) == 0:
+      return
+    async with self.db.utils.write_lock:
+      # entries recorded before streaks existed, build them once from scratch (unless a command
+      # that was waiting for the lock already has)
+      if not await self.is_built():
+        await self.rebuild()
+        await self.db.connection.commit()
+
+  async def _get_run(self, user_id: int, where: str, values: tuple) -> tuple[int, int] | None:
+    async with self.db.connection.execute_fetchall(
+      f"select start_id, end_id from streaks where puzzle_name = ? and user_id = ? and {where}",
+      (self.db.puzzle_name, user_id, *values,)
+    ) as rows:
+      return (rows[0][0], rows[0][1]) if len(rows) > 0 else None
+
+  async def _set_run(self, user_id: int, start_id: int, new_start_id: int, new_end_id: int) -> None:
+    await self.db.connection.execute(
+      "update streaks set start_id = ?, end_id = ? where puzzle_name = ? and user_id = ? and start_id = ?",
+      (new_start_id, new_end_id, self.db.puzzle_name, user_id, start_id,)
+    )
+
+  async def _delete_run(self, user_id: int, start_id: int) -> None:
+    await self.db.connection.execute(
+      "delete from streaks where puzzle_name = ? and user_id = ? and start_id = ?",
+      (self.db.puzzle_name, user_id, start_id,)
+    )
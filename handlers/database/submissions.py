@@ -0,0 +1,117 @@
+import discord, hashlib, typing
+from datetime import datetime
+
+from models import PuzzleName
+from models.submission import ParsedSubmission
+from utils.bot_utilities import BotUtilities
+
+if typing.TYPE_CHECKING:
+  from handlers.commands import BaseCommandHandler
+
+class SubmissionsDatabaseHandler():
+  """
+  A log with one row per Discord message that produced an entry: where and when it was posted,
+  whose entry it is, its raw content (and a hash of it) and what it was parsed as.
+
+  Replays (backfill, `/update`, the context menu) look a message up by id instead of parsing and
+  writing it again, and the game tables can be rebuilt from the log when parsing rules change.
+  """
+  # bound parameters per `in (...)` lookup, well under SQLite's limit
+  LOOKUP_CHUNK_SIZE: int = 500
+
+  utils: BotUtilities
+
+  def __init__(self, utils: BotUtilities) -> None:
+    utils.bot.logger.debug(f"Initializing {self.__class__.__name__} class.")
+    self.utils = utils
+
+  ####################
+  #   LOG METHODS    #
+  ####################
+
+  def hash_content(self, content: str) -> str:
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+  async def is_logged(self, message: discord.Message) -> bool:
+    """
+    Whether `message` has already been added, unchanged since then.
+    """
+    logged = await self.get_logged([message.id])
+    return logged.get(message.id) == self.hash_content(message.content)
+
+  async def get_logged(self, message_ids: list[int]) -> dict[int, str]:
+    """
+    Returns `message_id -> content hash` for every one of `message_ids` in the log.
+    """
+    logged: dict[int, str] = {}
+    for i in range(0, len(message_ids), self.LOOKUP_CHUNK_SIZE):
+      chunk = message_ids[i:i + self.LOOKUP_CHUNK_SIZE]
+      async with self.utils.connection.execute_fetchall(
+        f"select message_id, content_hash from submissions where message_id in ({','.join(['?'] * len(chunk))})",
+        chunk
+      ) as rows:
+        logged.update({row[0]: row[1] for row in rows})
+    return logged
+
+  async def log(self, message: discord.Message, user_id: int, submission: ParsedSubmission) -> None:
+    await self.log_many([(message, user_id, submission)])
+
+  async def log_many(self, rows: list[tuple[discord.Message, int, ParsedSubmission]]) -> None:
+    """
+    Logs `(message, user_id, submission)` rows, replacing the row of an edited message. Doesn't commit.
+    """
+    await self.utils.connection.executemany(
+      """insert into submissions values (?, ?, ?, ?, ?, ?, ?, ?, ?) on conflict (message_id) do update set
+      user_id = excluded.user_id, content_hash = excluded.content_hash, content = excluded.content,
+      puzzle_name = excluded.puzzle_name, puzzle_id = excluded.puzzle_id, score = excluded.score""",
+      [
+        (
+          message.id, message.channel.id, user_id, message.created_at.isoformat(),
+          self.hash_content(message.content), message.content,
+          submission.game.value.lower(), submission.puzzle_id, submission.score,
+        )
+        for message, user_id, submission in rows
+      ]
+    )
+
+  async def rebuild(self, games: dict[PuzzleName, "BaseCommandHandler"]) -> int:
+    """
+    Parses every logged message again and replaces the entries that came from the log with the
+    result. Entries recorded before the log existed are left alone. Returns the number of entries
+    written.
+    """
+    self.utils.bot.logger.info("Rebuilding entries from the submissions log...")
+    entries: dict[PuzzleName, list[tuple[int, ParsedSubmission, str]]] = {game: [] for game in games}
+    parsed: list[tuple[str, int, int, int]] = []
+    async with self.utils.write_lock:
+      async with self.utils.connection.execute_fetchall(
+        "select message_id, user_id, created_at, content from submissions order by message_id"
+      ) as rows:
+        for message_id, user_id, created_at, content in rows:
+          submission = self.utils.parser.parse(content)
+          if submission is None or submission.game not in entries:
+            continue
+
+          entry_date = self.utils.convert_date_to_str(self.utils.get_local_date(datetime.fromisoformat(created_at)))
+          entries[submission.game].append((user_id, submission, entry_date))
+          parsed.append((submission.game.value.lower(), submission.puzzle_id, submission.score, message_id))
+
+      for game, handler in games.items():
+        # the log still holds what each message was parsed as before, which is what gets replaced
+        await self.utils.connection.execute(
+          f"""delete from {handler.db.puzzle_name} where (puzzle_id, user_id) in (
+            select puzzle_id, user_id from submissions where puzzle_name = ?
+          )""",
+          (handler.db.puzzle_name,)
+        )
+        await handler.db.write_entries(entries[game])
+        await handler.db.rebuild_derived(commit=False)
+
+      await self.utils.connection.executemany(
+        "update submissions set puzzle_name = ?, puzzle_id = ?, score = ? where message_id = ?",
+        parsed
+      )
+      # one transaction for every game and the log, so a failed rebuild leaves nothing half done
+      await self.utils.connection.commit()
+
+    return sum(len(game_entries) for game_entries in entries.values())
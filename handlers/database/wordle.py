@@ -1,8 +1,10 @@
-import discord, re
+import discord
 from datetime import date
 
 from handlers.database import BaseDatabaseHandler
+from handlers.database.distributions import DistributionsDatabaseHandler
 from models import PuzzleName
+from models.submission import ParsedSubmission
 from models.wordle import WordlePuzzleEntry
 from utils.bot_utilities import BotUtilities
 
@@ -13,6 +15,7 @@ class WordleDatabaseHandler(BaseDatabaseHandler):
     # init
     super().__init__(utils)
     self.puzzle_name = PuzzleName.WORDLE.value.lower()
+    self.distribution = DistributionsDatabaseHandler(self, 'score', list(range(1, 8)))
 
     # puzzles
     self._arbitrary_date = date(2021, 6, 19)
@@ -22,52 +25,32 @@ class WordleDatabaseHandler(BaseDatabaseHandler):
   #  PUZZLE METHODS  #
   ####################
 
-  async def add_entry(self, user: discord.User | discord.Member, title: str, puzzle: str, datetime) -> bool:
-    self.utils.bot.logger.debug(f"Wordle->add_entry()::<{user}>\n{title}\n{puzzle}")
-
-    # Extract puzzle ID and score from the title
-    puzzle_id_str: str = ''
-    score_str: str = ''
-    if 'X/6' in title:
-      reg_match: re.Match[str] | None = re.search(r'\d{1,3}(,\d{3})*', title)
-      if reg_match:
-        puzzle_id_str = reg_match.group(0).replace(',', '')
-        score_str = '7'
-      else:
-        return False
-    else:
-      reg_match = re.search(r'\d{1,3}(,\d{3})*', title)
-      if reg_match:
-        puzzle_id_str = reg_match.group(0).replace(',', '')
-        reg_match = re.search(r'(\d)\/(\d)', title)
-        if reg_match:
-          score_str = reg_match.group(1)
-        else:
-          return False
-      else:
-        return False
+  async def add_entry(self, user: discord.User | discord.Member, submission: ParsedSubmission, datetime,
+                      commit: bool = True) -> bool:
+    self.utils.bot.logger.debug("Wordle->add_entry()::<%s>\n%s\n%s", user, submission.title, submission.puzzle)
 
-    puzzle_id: int = int(puzzle_id_str)
-    score: int = int(score_str)
-    # puzzle = puzzle.replace("\n", ' ')
-    total_green: int = puzzle.count('🟩')
-    total_yellow: int = puzzle.count('🟨')
-    total_other: int = puzzle.count('⬜') + puzzle.count('⬛')
-    self.utils.bot.logger.debug(f"{puzzle_id}\n{puzzle}\n{total_green}g:{total_yellow}y:{total_other}o\n->{score}")
+    puzzle_id: int = submission.puzzle_id
+    puzzle: str = submission.puzzle
+    score: int = submission.score
+    total_green: int = submission.green
+    total_yellow: int = submission.yellow
+    total_other: int = submission.other
+    self.utils.bot.logger.debug("%s\n%s\n%sg:%sy:%so\n->%s", puzzle_id, puzzle, total_green, total_yellow, total_other, score)
 
     await self.add_user_if_not_exists(user)
     user_id: int = user.id
 
     try:
-      if await self.entry_exists(user_id, puzzle_id):
-        self.utils.bot.logger.debug(f"Entry already exists for {user_id} and {puzzle_id}.")
+      previous_score: float | None = await self.get_score(user_id, puzzle_id)
+      if previous_score is not None:
+        self.utils.bot.logger.debug("Entry already exists for %s and %s.", user_id, puzzle_id)
         await self.connection.execute(
           f"update {self.puzzle_name} set score = ?, green = ?, yellow = ?, other = ? where user_id = ? and puzzle_id = ?",
           (score, total_green, total_yellow, total_other, user_id, puzzle_id,)
         )
       else:
         values = (puzzle_id, user_id, puzzle, score, total_green, total_yellow, total_other, datetime)
-        self.utils.bot.logger.debug(f"Adding entry for {user_id} and {puzzle_id}...")
+        self.utils.bot.logger.debug("Adding entry for %s and %s...", user_id, puzzle_id)
         self.utils.bot.logger.debug(values)
 
         await self.connection.execute(
@@ -75,12 +58,24 @@ class WordleDatabaseHandler(BaseDatabaseHandler):
           values,
         )
 
-      await self.connection.commit()
+      await self.on_entry_saved(user_id, puzzle_id, previous_score)
+      if commit:
+        await self.connection.commit()
       return True
     except Exception as e:
       self.utils.bot.logger.error(e)
       return False
 
+  def get_upsert_sql(self) -> str:
+    return f"""insert into {self.puzzle_name} values (?,?,?,?,?,?,?,?) on conflict (puzzle_id, user_id)
+      do update set score = excluded.score, green = excluded.green, yellow = excluded.yellow, other = excluded.other"""
+
+  def get_entry_values(self, user_id: int, submission: ParsedSubmission, datetime: str) -> tuple:
+    return (
+      submission.puzzle_id, user_id, submission.puzzle, submission.score,
+      submission.green, submission.yellow, submission.other, datetime,
+    )
+
   ####################
   #  PLAYER METHODS  #
   ####################
@@ -94,11 +89,21 @@ class WordleDatabaseHandler(BaseDatabaseHandler):
       query = f"select puzzle_id, score, green, yellow, other from {self.puzzle_name} where user_id = ? and puzzle_id in (?)"
       query_values = (user_id, puzzle_list_str,)
 
-    self.utils.bot.logger.debug(f"Wordle->Getting entries for user: <{user_id}>...")
+    self.utils.bot.logger.debug("Wordle->Getting entries for user: <%s>...", user_id)
     entries: list[WordlePuzzleEntry] = []
     async with self.connection.execute_fetchall(query, query_values) as rows:
       for row in rows:
-        self.utils.bot.logger.debug(f"row -> {row}")
         entries.append(WordlePuzzleEntry(row[0], user_id, row[1], row[2], row[3], row[4]))
 
     return entries
+
+  def get_normalized_scores_sql(self) -> str:
+    # 1/6 -> 0.0, X/6 -> 1.0
+    return f"select user_id, (score - 1) / 6.0 as normalized from {self.puzzle_name} where puzzle_id between ? and ?"
+
+  async def get_scores(self, where: str = '1', values: tuple = ()) -> list[tuple[int, int, float]]:
+    async with self.connection.execute_fetchall(
+      f"select puzzle_id, user_id, score from {self.puzzle_name} where {where} order by puzzle_id, rowid",
+      values
+    ) as rows:
+      return [(row[0], row[1], float(row[2])) for row in rows]
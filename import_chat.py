@@ -0,0 +1,86 @@
+"""
+Imports puzzle results from DiscordChatExporter exports of a channel without connecting to Discord.
+
+  python import_chat.py export.json [more.json ...]
+  python import_chat.py export.csv --channel-id 123456789012345678
+
+Run it while the bot is stopped. Once it's done, the bot picks the channel up from the last
+imported message the next time it starts.
+"""
+from typing import cast
+import aiosqlite, argparse, asyncio, logging, os, sys, time
+
+from handlers.database.connections import ConnectionsDatabaseHandler
+from handlers.database.strands import StrandsDatabaseHandler
+from handlers.database.wordle import WordleDatabaseHandler
+from models import PuzzleName
+from utils.backfill import BackfillProgress
+from utils.bot_logging import LoggingFormatter, get_log_level
+from utils.bot_typing import MyBotType
+from utils.bot_utilities import BotUtilities
+from utils.chat_import import ChatImporter, read_csv_export, read_json_export
+
+ROOT = os.path.realpath(os.path.dirname(__file__))
+
+class OfflineBot():
+  """
+  Stands in for the bot so the database handlers can be used without a Discord client.
+  """
+  def __init__(self, logger: logging.Logger) -> None:
+    self.logger = logger
+
+def parse_args() -> argparse.Namespace:
+  parser = argparse.ArgumentParser(description="Import puzzle results from Discord chat exports.")
+  parser.add_argument('exports', nargs='+', help="JSON or CSV exports made with DiscordChatExporter")
+  parser.add_argument('--channel-id', type=int, help="channel the export is from (required for CSV exports)")
+  parser.add_argument('--database', default=f"{ROOT}/database/database.db", help="database to import into")
+  parser.add_argument('--batch-size', type=int, default=5000, help="messages written per transaction")
+  return parser.parse_args()
+
+async def main(args: argparse.Namespace) -> None:
+  logger = logging.getLogger("ChatImport")
+  handler = logging.StreamHandler()
+  handler.setFormatter(LoggingFormatter())
+  logger.addHandler(handler)
+  logger.setLevel(get_log_level('LOG_LEVEL', 'INFO'))
+
+  async with aiosqlite.connect(args.database) as connection:
+    with open(f"{ROOT}/database/schema.sql", encoding="utf-8") as file:
+      await connection.executescript(file.read())
+    await connection.commit()
+
+    utils = BotUtilities(None, cast(MyBotType, OfflineBot(logger)), connection) # type: ignore
+    importer = ChatImporter(utils, {
+      PuzzleName.CONNECTIONS: ConnectionsDatabaseHandler(utils),
+      PuzzleName.STRANDS: StrandsDatabaseHandler(utils),
+      PuzzleName.WORDLE: WordleDatabaseHandler(utils),
+    }, args.batch_size)
+
+    def report(progress: BackfillProgress) -> None:
+      logger.info("%s", progress)
+
+    started = time.perf_counter()
+    scanned = 0
+    for path in args.exports:
+      with open(path, encoding="utf-8-sig", newline='') as file:
+        if path.lower().endswith('.csv'):
+          if args.channel_id is None:
+            raise SystemExit("--channel-id is required for CSV exports.")
+          messages = read_csv_export(file, args.channel_id)
+        else:
+          messages = read_json_export(file, args.channel_id)
+
+        logger.info("Importing %s...", path)
+        progress = await importer.import_messages(messages, report)
+        logger.info("Imported %s: %s", path, progress)
+        scanned += progress.scanned
+
+    await importer.finish()
+    elapsed = time.perf_counter() - started
+    logger.info("Done: %d messages in %.1fs (%.0f messages/sec).", scanned, elapsed, scanned / elapsed if elapsed > 0 else 0.0)
+
+if __name__ == "__main__":
+  if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+  asyncio.run(main(parse_args()))
@@ -0,0 +1,35 @@
+from models import PuzzleName
+
+class ParsedSubmission():
+  """
+  A puzzle result pasted into chat, already split into its title and grid.
+
+  `score` is game-specific: the number of guesses for Wordle (7 = X/6), the number of guesses
+  for Connections (8 = failed) and the number of hints for Strands.
+  """
+  game: PuzzleName
+  puzzle_id: int
+  score: int
+  title: str
+  puzzle: str
+
+  # emoji counts from the grid
+  green: int
+  yellow: int
+  other: int
+  hints: int
+
+  def __init__(self, game: PuzzleName, puzzle_id: int, score: int, title: str, puzzle: str,
+               green: int = 0, yellow: int = 0, other: int = 0, hints: int = 0) -> None:
+    self.game = game
+    self.puzzle_id = puzzle_id
+    self.score = score
+    self.title = title
+    self.puzzle = puzzle
+    self.green = green
+    self.yellow = yellow
+    self.other = other
+    self.hints = hints
+
+  def __repr__(self) -> str:
+    return f"<ParsedSubmission {self.game.value} #{self.puzzle_id} score={self.score}>"
@@ -0,0 +1,57 @@
+import typing
+
+class Column():
+  """
+  One column of a `Table`: its title, how its cells are aligned and, optionally, a fixed width in
+  pixels (otherwise it's sized to fit).
+  """
+  name: str
+  align: typing.Literal['left', 'center', 'right']
+  width: int | None
+  values: list[typing.Any]
+
+  def __init__(self, name: str, align: typing.Literal['left', 'center', 'right'] = 'left', width: int | None = None) -> None:
+    self.name = name
+    self.align = align
+    self.width = width
+    self.values = []
+
+  def __repr__(self) -> str:
+    return f"<Column {self.name!r} ({len(self.values)} values)>"
+
+class Table():
+  """
+  What a command shows as a table. Handlers add it row by row, renderers read it column by
+  column (`data` is what Bokeh's `ColumnDataSource` and seaborn take), and every row is a plain
+  append to one list per column.
+  """
+  columns: list[Column]
+
+  def __init__(self, columns: typing.Iterable[str | Column]) -> None:
+    self.columns = [column if isinstance(column, Column) else Column(column) for column in columns]
+
+  def __len__(self) -> int:
+    return len(self.columns[0].values) if len(self.columns) > 0 else 0
+
+  def __repr__(self) -> str:
+    return f"<Table {[column.name for column in self.columns]} ({len(self)} rows)>"
+
+  @property
+  def names(self) -> list[str]:
+    return [column.name for column in self.columns]
+
+  @property
+  def data(self) -> dict[str, list[typing.Any]]:
+    """
+    `{column name: values}`, without copying the values.
+    """
+    return {column.name: column.values for column in self.columns}
+
+  def add_row(self, *values: typing.Any) -> None:
+    if len(values) != len(self.columns):
+      raise ValueError(f"Expected {len(self.columns)} values, got {len(values)}.")
+    for column, value in zip(self.columns, values):
+      column.values.append(value)
+
+  def rows(self) -> typing.Iterator[tuple[typing.Any, ...]]:
+    return zip(*(column.values for column in self.columns))
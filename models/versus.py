@@ -0,0 +1,69 @@
+import typing
+
+from utils.lazy_import import lazy_import
+
+if typing.TYPE_CHECKING:
+  import numpy as np
+else:
+  np = lazy_import('numpy')
+
+class VersusMatrix():
+  """
+  Head-to-head results for every pair of players in one game.
+
+  Scores are laid out as a dense `players x puzzles` matrix with NaN for puzzles a player
+  didn't submit. Comparisons against NaN are always False, so broadcasting the matrix against
+  itself counts wins only on puzzles both players played (lower score wins).
+  """
+  # max number of booleans materialised per broadcast chunk
+  CHUNK_CELLS: int = 1 << 24
+
+  user_ids: list[int]
+  puzzle_ids: list[int]
+  scores: "np.ndarray"
+  wins: "np.ndarray"
+  shared: "np.ndarray"
+
+  def __init__(self, scores: list[tuple[int, int, float]]) -> None:
+    self.puzzle_ids = sorted({puzzle_id for puzzle_id, _, _ in scores})
+    self.user_ids = sorted({user_id for _, user_id, _ in scores})
+
+    puzzle_index = {puzzle_id: i for i, puzzle_id in enumerate(self.puzzle_ids)}
+    user_index = {user_id: i for i, user_id in enumerate(self.user_ids)}
+
+    self.scores = np.full((len(self.user_ids), len(self.puzzle_ids)), np.nan)
+    if len(scores) > 0:
+      self.scores[
+        [user_index[user_id] for _, user_id, _ in scores],
+        [puzzle_index[puzzle_id] for puzzle_id, _, _ in scores]
+      ] = [score for _, _, score in scores]
+
+    played = (~np.isnan(self.scores)).astype(np.int32)
+    self.shared = played @ played.T
+    self.wins = np.zeros((len(self.user_ids), len(self.user_ids)), dtype=np.int32)
+
+    n_players, n_puzzles = self.scores.shape
+    chunk = max(1, self.CHUNK_CELLS // max(1, n_players * n_players))
+    for start in range(0, n_puzzles, chunk):
+      block = self.scores[:, start:start + chunk]
+      self.wins += (block[:, None, :] < block[None, :, :]).sum(axis=2, dtype=np.int32)
+
+  def select(self, user_ids: list[int]) -> tuple[list[int], "np.ndarray", "np.ndarray"]:
+    """
+    Returns the known players out of `user_ids` along with their `wins` and `shared` sub-matrices.
+    """
+    index = {user_id: i for i, user_id in enumerate(self.user_ids)}
+    known = [user_id for user_id in user_ids if user_id in index]
+    rows = [index[user_id] for user_id in known]
+    return known, self.wins[np.ix_(rows, rows)], self.shared[np.ix_(rows, rows)]
+
+  def most_active(self, limit: int) -> list[int]:
+    order = np.argsort(-np.diag(self.shared), kind='stable')[:limit]
+    return [self.user_ids[i] for i in order]
+
+  def win_rates(self, wins: "np.ndarray", shared: "np.ndarray") -> "np.ndarray":
+    with np.errstate(divide='ignore', invalid='ignore'):
+      rates = wins / shared
+    rates[shared == 0] = np.nan
+    np.fill_diagonal(rates, np.nan)
+    return rates
@@ -0,0 +1,219 @@
+import asyncio, discord, time, typing
+from datetime import datetime, timedelta, timezone
+
+from handlers.database.checkpoints import CheckpointsDatabaseHandler
+from models import PuzzleName
+from models.submission import ParsedSubmission
+from utils.bot_utilities import DiscordReactions
+
+if typing.TYPE_CHECKING:
+  from utils.bot_typing import MyBotType
+
+class BackfillProgress():
+  channel_id: int
+  pages: int
+  scanned: int
+  submissions: int
+  added: int
+  skipped: int
+  started: float
+
+  def __init__(self, channel_id: int) -> None:
+    self.channel_id = channel_id
+    self.pages = 0
+    self.scanned = 0
+    self.submissions = 0
+    self.added = 0
+    self.skipped = 0
+    self.started = time.perf_counter()
+
+  @property
+  def elapsed(self) -> float:
+    return time.perf_counter() - self.started
+
+  @property
+  def rate(self) -> float:
+    return self.scanned / self.elapsed if self.elapsed > 0 else 0.0
+
+  def __str__(self) -> str:
+    return (
+      f"{self.scanned} messages read, {self.added} entries added, {self.skipped} already added "
+      f"({self.elapsed:.1f}s, {self.rate:.0f} messages/sec)"
+    )
+
+class HistoryBackfill():
+  """
+  Reads channel history that the bot missed and adds any puzzle results in it.
+
+  History is read oldest first from the last message checkpointed for the channel (or the last
+  `initial_days` days for a channel without one). Pages are fetched from Discord while the
+  previous page is being written, and each page is written as one batch per game. A channel's
+  checkpoint is committed with a page's entries, so an interrupted backfill picks up from the last
+  complete page and re-reading a page is harmless. Rather than after every page, ratings and
+  streaks are rebuilt once per game when the backfill stops, from the oldest puzzle it added. That
+  puzzle is committed with each page too, so a rebuild cut short by a crash is done by the next
+  catch-up.
+  """
+  PAGE_SIZE: int = 100
+  # pages fetched ahead of the one being written
+  PREFETCH_PAGES: int = 2
+  # seconds between progress callbacks
+  PROGRESS_INTERVAL: float = 2.0
+
+  bot: "MyBotType"
+  checkpoints: CheckpointsDatabaseHandler
+  channel_ids: list[int]
+  initial_days: int
+
+  _locks: dict[int, asyncio.Lock]
+  _tasks: set[asyncio.Task]
+
+  def __init__(self, bot: "MyBotType", channel_ids: list[int] = [], initial_days: int = 7) -> None:
+    self.bot = bot
+    self.checkpoints = CheckpointsDatabaseHandler(bot.utils)
+    self.channel_ids = channel_ids
+    self.initial_days = initial_days
+    self._locks = {}
+    self._tasks = set()
+
+  ####################
+  # BACKFILL METHODS #
+  ####################
+
+  def start_catch_up(self) -> None:
+    task = asyncio.create_task(self.catch_up(), name="backfill-catch-up")
+    self._tasks.add(task)
+    task.add_done_callback(self._tasks.discard)
+
+  async def catch_up(self) -> None:
+    """
+    Backfills every configured or previously checkpointed channel, all at once.
+    """
+    # left over from a backfill that didn't get to finish
+    await self.rebuild_pending()
+    channel_ids = set(self.channel_ids) | set(await self.checkpoints.get_channels())
+    channels = [self.bot.get_channel(channel_id) for channel_id in channel_ids]
+    channels = [channel for channel in channels if isinstance(channel, discord.abc.Messageable)]
+    for result in await asyncio.gather(*[self.backfill(channel) for channel in channels], return_exceptions=True):
+      if isinstance(result, BaseException):
+        self.bot.logger.error(f"Backfill failed: {result}")
+      else:
+        self.bot.logger.info("Backfilled channel %s: %s", result.channel_id, result)
+
+  async def backfill(self, channel: discord.abc.Messageable,
+                     on_progress: typing.Callable[[BackfillProgress], typing.Awaitable[None]] | None = None) -> BackfillProgress:
+    channel_id: int = channel.id # type: ignore
+    async with self._locks.setdefault(channel_id, asyncio.Lock()):
+      checkpoint = await self.checkpoints.get_checkpoint(channel_id)
+      if checkpoint is not None:
+        after: discord.abc.Snowflake | datetime = discord.Object(id=checkpoint)
+      else:
+        after = datetime.now(timezone.utc) - timedelta(days=self.initial_days)
+
+      progress = BackfillProgress(channel_id)
+      last_report = time.perf_counter()
+      pages: asyncio.Queue[list[discord.Message] | None] = asyncio.Queue(maxsize=self.PREFETCH_PAGES)
+      reader = asyncio.create_task(self._read_pages(channel, after, pages))
+      try:
+        while (page := await pages.get()) is not None:
+          await self._write_page(channel_id, page, progress)
+          if on_progress is not None and time.perf_counter() - last_report >= self.PROGRESS_INTERVAL:
+            last_report = time.perf_counter()
+            await on_progress(progress)
+        # re-raise anything that stopped the reader early
+        await reader
+      finally:
+        reader.cancel()
+        # also after a failure, for the pages that were committed
+        await self.rebuild_pending()
+
+      return progress
+
+  async def rebuild_pending(self) -> None:
+    """
+    Rebuilds the ratings and streaks of every game with backfilled entries they don't include yet.
+    """
+    games = {handler.db.puzzle_name: handler.db for handler in self.bot.games.values()}
+    async with self.bot.utils.write_lock:
+      for puzzle_name, puzzle_id in (await self.checkpoints.get_pending_rebuilds()).items():
+        await self.checkpoints.clear_rebuild(puzzle_name)
+        if puzzle_name in games:
+          self.bot.logger.info("Rebuilding %s ratings and streaks from puzzle #%d...", puzzle_name, puzzle_id)
+          # commits, along with clearing the marker
+          await games[puzzle_name].rebuild_derived(puzzle_id)
+
+  async def cancel(self) -> None:
+    """
+    Stops the catch-up and waits for it to rebuild what it has committed so far.
+    """
+    for task in self._tasks:
+      task.cancel()
+    await asyncio.gather(*self._tasks, return_exceptions=True)
+
+  ####################
+  #  HELPER METHODS  #
+  ####################
+
+  async def _read_pages(self, channel: discord.abc.Messageable, after: discord.abc.Snowflake | datetime,
+                        pages: asyncio.Queue[list[discord.Message] | None]) -> None:
+    # `None` tells the writer there are no more pages
+    try:
+      page: list[discord.Message] = []
+      async for message in channel.history(limit=None, after=after, oldest_first=True):
+        page.append(message)
+        if len(page) == self.PAGE_SIZE:
+          await pages.put(page)
+          page = []
+      if len(page) > 0:
+        await pages.put(page)
+    except Exception:
+      await pages.put(None)
+      raise
+    await pages.put(None)
+
+  async def _write_page(self, channel_id: int, page: list[discord.Message], progress: BackfillProgress) -> None:
+    entries: dict[PuzzleName, list[tuple[discord.User | discord.Member, ParsedSubmission, str]]] = {}
+    added: list[tuple[discord.Message, int, ParsedSubmission]] = []
+    candidates: list[discord.Message] = []
+    for message in page:
+      progress.scanned += 1
+      if not self._is_own_message(message) and self.bot.utils.parser.is_candidate(message.content):
+        candidates.append(message)
+
+    logged = await self.bot.submissions.get_logged([message.id for message in candidates])
+    for message in candidates:
+      if self._is_ingested(message, logged):
+        progress.skipped += 1
+        continue
+
+      submission = self.bot.utils.parser.parse(message.content)
+      if submission is None:
+        continue
+
+      progress.submissions += 1
+      entry_date = self.bot.utils.convert_date_to_str(self.bot.utils.get_local_date(message.created_at))
+      entries.setdefault(submission.game, []).append((message.author, submission, entry_date))
+      added.append((message, message.author.id, submission))
+
+    async with self.bot.utils.write_lock:
+      for game, game_entries in entries.items():
+        db = self.bot.games[game].db
+        progress.added += await db.add_entries(game_entries, rebuild=False)
+        await self.checkpoints.mark_rebuild(db.puzzle_name, min(submission.puzzle_id for _, submission, _ in game_entries))
+      await self.bot.submissions.log_many(added)
+      # commits the entries, their log rows and the rebuild markers along with the checkpoint
+      await self.checkpoints.set_checkpoint(channel_id, page[-1].id)
+    progress.pages += 1
+
+    for message, _, _ in added:
+      self.bot.dispatcher.react(message, DiscordReactions['checkmark'])
+
+  def _is_own_message(self, message: discord.Message) -> bool:
+    return self.bot.user is not None and message.author.id == self.bot.user.id
+
+  def _is_ingested(self, message: discord.Message, logged: dict[int, str]) -> bool:
+    if message.id in logged:
+      # an edited message is added again
+      return logged[message.id] == self.bot.submissions.hash_content(message.content)
+    # messages added before the submissions log existed only have the bot's reaction to go by
+    return any(reaction.me and str(reaction.emoji) == DiscordReactions['checkmark'] for reaction in message.reactions)
@@ -0,0 +1,88 @@
+import logging, logging.handlers, os, queue
+
+class LoggingFormatter(logging.Formatter):
+  # Colors
+  black = "\x1b[30m"
+  red = "\x1b[31m"
+  green = "\x1b[32m"
+  yellow = "\x1b[33m"
+  blue = "\x1b[34m"
+  gray = "\x1b[38m"
+  # Styles
+  reset = "\x1b[0m"
+  bold = "\x1b[1m"
+
+  COLORS = {
+    logging.DEBUG: gray + bold,
+    logging.INFO: blue + bold,
+    logging.WARNING: yellow + bold,
+    logging.ERROR: red,
+    logging.CRITICAL: red + bold,
+  }
+
+  FORMAT = "(black){asctime}(reset) (levelcolor){levelname:<8}(reset) (green){name}(reset) {message}"
+  DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+  _formatters: dict[int, logging.Formatter]
+
+  def __init__(self) -> None:
+    super().__init__(self.FORMAT, self.DATE_FORMAT, style="{")
+    # one formatter per level, built once instead of for every record
+    self._formatters = {level: self._build_formatter(color) for level, color in self.COLORS.items()}
+
+  def format(self, record: logging.LogRecord) -> str:
+    formatter = self._formatters.get(record.levelno)
+    if formatter is None:
+      formatter = self._formatters[record.levelno] = self._build_formatter(self.reset)
+    return formatter.format(record)
+
+  def _build_formatter(self, log_color: str) -> logging.Formatter:
+    format = self.FORMAT
+    format = format.replace("(black)", self.black + self.bold)
+    format = format.replace("(reset)", self.reset)
+    format = format.replace("(levelcolor)", log_color)
+    format = format.replace("(green)", self.green + self.bold)
+    return logging.Formatter(format, self.DATE_FORMAT, style="{")
+
+def get_log_level(name: str, default: str) -> int:
+  """
+  Reads a level name (`DEBUG`, `INFO`, ...) or number from the environment variable `name`.
+  """
+  value: str = os.getenv(name, default).strip().upper()
+  if value.isdigit():
+    return int(value)
+
+  level = logging.getLevelName(value)
+  return level if isinstance(level, int) else logging.getLevelName(default)
+
+def setup_logging(name: str, filename: str, default_level: str = 'INFO') -> tuple[logging.Logger, logging.handlers.QueueListener]:
+  """
+  Builds the bot's logger. Records are put on a queue by the logger and written to the console
+  and `filename` by a `QueueListener` thread, so formatting and file I/O happen off the event
+  loop. Levels are read from `LOG_LEVEL` (logger and console) and `LOG_FILE_LEVEL` (file).
+
+  The listener is already started; call `stop()` on it once the last record has been logged.
+  """
+  level: int = get_log_level('LOG_LEVEL', default_level)
+
+  # Console handler
+  console_handler = logging.StreamHandler()
+  console_handler.setFormatter(LoggingFormatter())
+  console_handler.setLevel(level)
+  # File handler
+  file_handler = logging.FileHandler(filename=filename, encoding="utf-8", mode="w")
+  file_handler_formatter = logging.Formatter(
+    "[{asctime}] [{levelname:<8}] {name}: {message}", "%Y-%m-%d %H:%M:%S", style="{"
+  )
+  file_handler.setFormatter(file_handler_formatter)
+  file_handler.setLevel(get_log_level('LOG_FILE_LEVEL', logging.getLevelName(level)))
+
+  log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+  listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+
+  logger = logging.getLogger(name)
+  logger.setLevel(min(level, file_handler.level))
+  logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+  listener.start()
+  return logger, listener
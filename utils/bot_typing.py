@@ -3,19 +3,46 @@ from discord.ext import commands
 
 if typing.TYPE_CHECKING:
   from logging import Logger
+  from handlers.commands import BaseCommandHandler
+  from handlers.commands.combined import CombinedCommandHandler
   from handlers.commands.connections import ConnectionsCommandHandler
   from handlers.commands.strands import StrandsCommandHandler
   from handlers.commands.wordle import WordleCommandHandler
+  from handlers.database.submissions import SubmissionsDatabaseHandler
+  from models import PuzzleName
+  from utils.backfill import HistoryBackfill
   from utils.bot_utilities import BotUtilities
+  from utils.dispatcher import OutboundDispatcher
   from utils.help_handler import HelpMenuHandler
+  from utils.hot_reload import HotReloader
+  from utils.ingestion import IngestionPipeline
+  from utils.metrics import Metrics
+  from utils.profiler import Profiler
+  from utils.responder import DeferredResponder
+  from utils.watchdog import LoopWatchdog
 
 class BotUtilitiesProtocol(typing.Protocol):
   utils: "BotUtilities"
   help_menu: "HelpMenuHandler"
+  combined: "CombinedCommandHandler"
+  games: dict["PuzzleName", "BaseCommandHandler"]
+  ingestion: "IngestionPipeline"
+  dispatcher: "OutboundDispatcher"
+  responder: "DeferredResponder"
+  metrics: "Metrics"
+  profiler: "Profiler"
+  watchdog: "LoopWatchdog"
+  reloader: "HotReloader"
+  startup: dict[str, float]
+  backfill: "HistoryBackfill"
+  submissions: "SubmissionsDatabaseHandler"
   connections: "ConnectionsCommandHandler"
   strands: "StrandsCommandHandler"
   wordle: "WordleCommandHandler"
   logger: "Logger"
+  guild_id: int
+
+  def init_handlers(self) -> None: ...
 
 class MyBotType(commands.Bot, BotUtilitiesProtocol):
   pass
@@ -1,14 +1,16 @@
-import aiosqlite, discord, io, re
-from bokeh.io.export import get_screenshot_as_png
-from bokeh.models import ColumnDataSource, DataTable, TableColumn
+import aiosqlite, asyncio, discord, io, re, typing
 from enum import Enum, auto
 from datetime import date, datetime, timedelta, timezone
-from PIL import Image
-from matplotlib.figure import Figure
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+from PIL import Image, ImageChops
 
 from utils.bot_typing import MyBotType
+from utils.member_names import MemberNameResolver
+from utils.single_flight import SingleFlight
+from utils.submission_parser import SubmissionParser
+
+if typing.TYPE_CHECKING:
+  from matplotlib.figure import Figure
+  from models.table import Table
 
 DiscordReactions: dict[str, str] = {
   "thumbsup": "👍",
@@ -24,6 +26,7 @@ DiscordReactions: dict[str, str] = {
 }
 
 class NYTGame(Enum):
+  ALL = auto()
   CONNECTIONS = auto()
   STRANDS = auto()
   WORDLE = auto()
@@ -36,10 +39,20 @@ class BotUtilities():
     self.bot: MyBotType = bot
     self.client: discord.Client = client
     self.connection: aiosqlite.Connection = connection
+    self.parser: SubmissionParser = SubmissionParser()
+    # entries are written over one shared connection, so only one is written at a time
+    self.write_lock: asyncio.Lock = asyncio.Lock()
+    self.names: MemberNameResolver = MemberNameResolver(self)
+    # identical commands running at the same time share one result
+    self.single_flight: SingleFlight = SingleFlight()
+    # bumped whenever users are added, like each game's `data_version`
+    self.users_version: int = 0
 
   # GAME TYPE
   def get_game_type(self, puzzle_type: str) -> NYTGame:
-    if 'connections' in puzzle_type:
+    if puzzle_type == 'all':
+      return NYTGame.ALL
+    elif 'connections' in puzzle_type:
       return NYTGame.CONNECTIONS
     elif 'strands' in puzzle_type:
       return NYTGame.STRANDS
@@ -51,18 +64,8 @@ class BotUtilities():
   # QUERIES
 
   def get_nickname(self, user_id: int) -> str | None:
-    guild_id = self.bot.guilds[0].id
-    guild: discord.Guild | None = self.bot.get_guild(guild_id)
-    if guild is None:
-      self.bot.logger.error(f"Guild not found with ID: {guild_id}")
-      return None
-
-    self.bot.logger.debug(f"get_nickname():: {user_id}|{guild.members}")
-    for member in guild.members:
-      if member.id == user_id:
-        return member.display_name
-
-    return None
+    # use `names.resolve_many` when building a table of players
+    return self.names.resolve(user_id)
 
   # VALIDATION
 
@@ -75,20 +78,14 @@ class BotUtilities():
   def is_sunday(self, query_date: date) -> bool:
     return query_date.strftime('%A') == 'Sunday'
 
-  def is_wordle_submission(self, lines: str) -> re.Match | None:
-    return re.match(r'^Wordle (\d+|\d{1,3}(,\d{3})*)( 🎉)? (\d|X)\/\d', lines)
-
-  def is_connections_submission(self, lines: str) -> re.Match | None:
-    return re.match(r'^Connections *(\n)Puzzle #\d+', lines)
-
-  def is_strands_submission(self, lines: str) -> re.Match | None:
-    return re.match(r'Strands #\d+', lines)
-
   # DATES/TIMES
 
   def get_todays_date(self) -> date:
     return datetime.now(timezone(timedelta(hours=-7), 'MST')).date()
 
+  def get_local_date(self, moment: datetime) -> date:
+    return moment.astimezone(timezone(timedelta(hours=-7), 'MST')).date()
+
   def get_week_start(self, query_date: date) -> date:
     return query_date - timedelta(days = (query_date.weekday() + 1) % 7)
 
@@ -114,14 +111,24 @@ class BotUtilities():
     except Exception as e:
       raise e
 
-  # DATA FRAME TO IMAGE
-  def get_image_from_df(self, df) -> Image.Image:
-    source = ColumnDataSource(df)
+  # TABLE TO IMAGE
+  def get_image_from_table(self, table: "Table") -> Image.Image:
+    # bokeh and selenium take a while to import and only tables need them
+    from bokeh.io.export import get_screenshot_as_png
+    from bokeh.layouts import column
+    from bokeh.models import ColumnDataSource, DataTable, StringFormatter, TableColumn
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    source = ColumnDataSource(table.data)
 
-    df_columns = df.columns.values
     columns_for_table=[]
-    for column in df_columns:
-        columns_for_table.append(TableColumn(field=column, title=column))
+    for table_column in table.columns:
+        sizing = {'width': table_column.width} if table_column.width is not None else {}
+        columns_for_table.append(TableColumn(
+          field=table_column.name, title=table_column.name,
+          formatter=StringFormatter(text_align=table_column.align), **sizing
+        ))
 
     data_table = DataTable(source=source, columns=columns_for_table, index_position=None, reorderable=False, autosize_mode="fit_columns")
     layout = column(data_table)
@@ -142,26 +149,43 @@ class BotUtilities():
         return None
     rgb_image = image.convert('RGB')
     width, height = image.size
-    for y in reversed(range(height)):
-        for x in range(0, max(15, width)):
-            rgb = rgb_image.getpixel((x, y))
-            if rgb != (255, 255, 255):
-                # account for differences in browsers
-                if x < 10 and rgb in [(254, 254, 254), (240, 240, 240)]:
-                    return rgb_image.crop([5, 5, width, y])
-                else:
-                    return rgb_image.crop([5, 5, width, y + 8])
+    # the lowest row with anything that isn't white, found in C rather than pixel by pixel
+    bbox = ImageChops.difference(rgb_image, Image.new('RGB', image.size, (255, 255, 255))).getbbox()
+    if bbox is None:
+        return rgb_image
+    y = bbox[3] - 1
+    for x in range(0, width):
+        rgb = rgb_image.getpixel((x, y))
+        if rgb != (255, 255, 255):
+            # account for differences in browsers
+            if x < 10 and rgb in [(254, 254, 254), (240, 240, 240)]:
+                return rgb_image.crop([5, 5, width, y])
+            else:
+                return rgb_image.crop([5, 5, width, y + 8])
 
     return rgb_image
-  def fig_to_image(self, fig: Figure) -> Image.Image:
-    buf = io.BytesIO()
-    fig.savefig(buf)
-    buf.seek(0)
-    img = Image.open(buf)
-    return img
-    return img
 
-  def image_to_binary(self, img: Image.Image) -> io.BytesIO:
+  def fig_to_image(self, fig: "Figure") -> Image.Image:
+    """
+    Renders `fig` straight into an RGBA image, without going through a PNG.
+    """
+    if not hasattr(fig.canvas, 'buffer_rgba'):
+      from matplotlib.backends.backend_agg import FigureCanvasAgg
+      FigureCanvasAgg(fig)
+    fig.canvas.draw()
+    buffer = fig.canvas.buffer_rgba()
+    height, width = buffer.shape[:2]
+    # copied, the buffer belongs to the canvas and is gone once the figure is closed
+    return Image.frombuffer('RGBA', (width, height), buffer, 'raw', 'RGBA', 0, 1).copy()
+
+  def image_to_binary(self, img: Image.Image, palette: bool = True) -> io.BytesIO:
+    """
+    Encodes `img` as the PNG sent to Discord, the only time it's encoded. With `palette`, it's
+    reduced to 256 colours first, which charts and tables don't need more than: the file is about
+    a third of the size and quicker to compress.
+    """
+    if palette and img.mode in ('RGB', 'RGBA'):
+      img = img.quantize(256, method=Image.Quantize.FASTOCTREE)
     buf = io.BytesIO()
     img.save(buf, 'PNG')
     buf.seek(0)
@@ -0,0 +1,222 @@
+import csv, discord, json, re, typing
+from datetime import date, datetime, timezone
+
+from handlers.database.checkpoints import CheckpointsDatabaseHandler
+from handlers.database.submissions import SubmissionsDatabaseHandler
+from models import PuzzleName
+from models.submission import ParsedSubmission
+from utils.backfill import BackfillProgress
+from utils.bot_utilities import BotUtilities
+
+if typing.TYPE_CHECKING:
+  from handlers.database import BaseDatabaseHandler
+
+class ExportedMessage():
+  """
+  A message read from a chat export, with the attributes of `discord.Message` the import uses.
+  CSV exports don't include message ids, so `id` is `None` for them.
+  """
+  id: int | None
+  channel: discord.Object
+  author_id: int
+  author_name: str
+  author_is_bot: bool
+  created_at: datetime
+  content: str
+
+  def __init__(self, id: int | None, channel_id: int, author_id: int, author_name: str, author_is_bot: bool,
+               created_at: datetime, content: str) -> None:
+    self.id = id
+    self.channel = discord.Object(id=channel_id)
+    self.author_id = author_id
+    self.author_name = author_name
+    self.author_is_bot = author_is_bot
+    # exports without an offset are in UTC
+    self.created_at = created_at if created_at.tzinfo is not None else created_at.replace(tzinfo=timezone.utc)
+    self.content = content
+
+####################
+#  EXPORT READERS  #
+####################
+
+_JSON_CHANNEL_ID = re.compile(r'"channel"\s*:\s*\{\s*"id"\s*:\s*"(\d+)"')
+_JSON_MESSAGES = re.compile(r'(?<!\\)"messages"\s*:\s*\[')
+_JSON_SEPARATORS = re.compile(r'[\s,]*')
+
+def read_json_export(file: typing.TextIO, channel_id: int | None = None,
+                     chunk_size: int = 1 << 20) -> typing.Iterator[ExportedMessage]:
+  """
+  Yields the messages of a DiscordChatExporter JSON export one at a time. The file is read in
+  `chunk_size` pieces and each message is decoded on its own, so exports of any size can be read
+  without loading them whole. `channel_id` defaults to the channel named in the export.
+  """
+  decoder = json.JSONDecoder()
+  buffer = ''
+  # everything before the messages array is a small header describing the guild and channel
+  while (match := _JSON_MESSAGES.search(buffer)) is None:
+    chunk = file.read(chunk_size)
+    if len(chunk) == 0:
+      raise ValueError("No messages array found in the export.")
+    buffer += chunk
+
+  if channel_id is None:
+    header = _JSON_CHANNEL_ID.search(buffer, 0, match.start())
+    if header is None:
+      raise ValueError("No channel id found in the export, pass one explicitly.")
+    channel_id = int(header.group(1))
+
+  position = match.end()
+  while True:
+    position = _JSON_SEPARATORS.match(buffer, position).end() # type: ignore
+    if position == len(buffer):
+      chunk = file.read(chunk_size)
+      if len(chunk) == 0:
+        raise ValueError("The export ended in the middle of the messages array.")
+      buffer, position = buffer[position:] + chunk, 0
+      continue
+    if buffer[position] == ']':
+      return
+
+    try:
+      item, end = decoder.raw_decode(buffer, position)
+    except json.JSONDecodeError:
+      # the message runs past the end of the buffer
+      chunk = file.read(chunk_size)
+      if len(chunk) == 0:
+        raise
+      buffer, position = buffer[position:] + chunk, 0
+      continue
+
+    author = item['author']
+    yield ExportedMessage(
+      int(item['id']), channel_id, int(author['id']), author['name'], author.get('isBot', False),
+      datetime.fromisoformat(item['timestamp']), item.get('content', ''),
+    )
+    position = end
+    # drop what has been decoded so the buffer doesn't grow with the file
+    if position >= chunk_size:
+      buffer, position = buffer[position:], 0
+
+def read_csv_export(file: typing.TextIO, channel_id: int) -> typing.Iterator[ExportedMessage]:
+  """
+  Yields the messages of a DiscordChatExporter CSV export (`AuthorID`, `Author`, `Date`,
+  `Content`, ...) one row at a time.
+  """
+  for row in csv.DictReader(file):
+    yield ExportedMessage(
+      None, channel_id, int(row['AuthorID']), row['Author'], False,
+      datetime.fromisoformat(row['Date']), row['Content'],
+    )
+
+####################
+#  CHAT IMPORTER   #
+####################
+
+class ChatImporter():
+  """
+  Writes the puzzle results in exported chat history straight to the database.
+
+  Messages are parsed with the bot's submission parser and written `batch_size` at a time, one
+  transaction and one `executemany` per game each. Ratings, streaks and distributions are only
+  rebuilt once by `finish()`, after every batch is in. Messages with an id go in the submissions
+  log like live ones, so importing overlapping exports (or history the bot already read) only
+  writes each message once.
+  """
+  utils: BotUtilities
+  games: dict[PuzzleName, "BaseDatabaseHandler"]
+  submissions: SubmissionsDatabaseHandler
+  checkpoints: CheckpointsDatabaseHandler
+  batch_size: int
+
+  _first_puzzles: dict[PuzzleName, int]
+  _last_messages: dict[int, int]
+
+  def __init__(self, utils: BotUtilities, games: dict[PuzzleName, "BaseDatabaseHandler"], batch_size: int = 5000) -> None:
+    utils.bot.logger.debug(f"Initializing {self.__class__.__name__} class.")
+    self.utils = utils
+    self.games = games
+    self.submissions = SubmissionsDatabaseHandler(utils)
+    self.checkpoints = CheckpointsDatabaseHandler(utils)
+    self.batch_size = batch_size
+    self._first_puzzles = {}
+    self._last_messages = {}
+
+  ####################
+  #  IMPORT METHODS  #
+  ####################
+
+  async def import_messages(self, messages: typing.Iterable[ExportedMessage],
+                            on_progress: typing.Callable[[BackfillProgress], None] | None = None) -> BackfillProgress:
+    progress = BackfillProgress(0)
+    batch: list[ExportedMessage] = []
+    for message in messages:
+      progress.channel_id = message.channel.id
+      progress.scanned += 1
+      if message.author_is_bot or not self.utils.parser.is_candidate(message.content):
+        continue
+
+      batch.append(message)
+      if len(batch) == self.batch_size:
+        await self._write_batch(batch, progress)
+        batch = []
+        if on_progress is not None:
+          on_progress(progress)
+
+    if len(batch) > 0:
+      await self._write_batch(batch, progress)
+    return progress
+
+  async def finish(self) -> None:
+    """
+    Rebuilds the derived tables of every game that was imported into and moves each channel's
+    backfill checkpoint up to the last imported message.
+    """
+    async with self.utils.write_lock:
+      for game, puzzle_id in self._first_puzzles.items():
+        self.utils.bot.logger.info("Rebuilding %s ratings and streaks...", game.value)
+        await self.games[game].rebuild_derived(puzzle_id)
+
+      for channel_id, message_id in self._last_messages.items():
+        await self.checkpoints.set_checkpoint(channel_id, message_id)
+
+    self._first_puzzles = {}
+    self._last_messages = {}
+
+  ####################
+  #  HELPER METHODS  #
+  ####################
+
+  async def _write_batch(self, batch: list[ExportedMessage], progress: BackfillProgress) -> None:
+    entries: dict[PuzzleName, list[tuple[int, ParsedSubmission, str]]] = {}
+    users: dict[int, tuple[int, str, date]] = {}
+    logged_rows: list[tuple[discord.Message, int, ParsedSubmission]] = []
+    logged = await self.submissions.get_logged([message.id for message in batch if message.id is not None])
+    today = self.utils.get_todays_date()
+
+    for message in batch:
+      if message.id in logged and logged[message.id] == self.submissions.hash_content(message.content):
+        progress.skipped += 1
+        continue
+
+      submission = self.utils.parser.parse(message.content)
+      if submission is None or submission.game not in self.games:
+        continue
+
+      progress.submissions += 1
+      entry_date = self.utils.convert_date_to_str(self.utils.get_local_date(message.created_at))
+      entries.setdefault(submission.game, []).append((message.author_id, submission, entry_date))
+      users.setdefault(message.author_id, (message.author_id, message.author_name, today))
+      self._first_puzzles[submission.game] = min(self._first_puzzles.get(submission.game, submission.puzzle_id), submission.puzzle_id)
+      if message.id is not None:
+        logged_rows.append((message, message.author_id, submission)) # type: ignore
+        self._last_messages[message.channel.id] = max(self._last_messages.get(message.channel.id, 0), message.id)
+
+    async with self.utils.write_lock:
+      await self.utils.connection.executemany("insert into users values (?, ?, ?) on conflict do nothing", users.values())
+      self.utils.users_version += 1
+      for game, game_entries in entries.items():
+        await self.games[game].write_entries(game_entries)
+        progress.added += len(game_entries)
+      await self.submissions.log_many(logged_rows)
+      await self.utils.connection.commit()
+    progress.pages += 1
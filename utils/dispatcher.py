@@ -0,0 +1,192 @@
+import asyncio, discord, time, typing
+from collections import deque
+
+if typing.TYPE_CHECKING:
+  from utils.bot_typing import MyBotType
+
+class RateLimit():
+  """
+  Allows at most `limit` requests in any `per` seconds. Unlike a token bucket this never lets
+  more than `limit` through in one of Discord's fixed windows, however they line up with ours.
+  """
+  limit: int
+  per: float
+
+  _sent: deque[float]
+
+  def __init__(self, limit: int, per: float) -> None:
+    self.limit = limit
+    self.per = per
+    self._sent = deque()
+
+  def delay(self, reserve: int = 0) -> float:
+    """
+    Seconds until a request can be made while leaving `reserve` requests for others.
+    """
+    now = time.monotonic()
+    while len(self._sent) > 0 and self._sent[0] <= now - self.per:
+      self._sent.popleft()
+
+    wait = 0.0
+    allowed = max(self.limit - reserve, 1)
+    if len(self._sent) >= allowed:
+      wait = self._sent[len(self._sent) - allowed] + self.per - now
+    return max(wait, 0.0)
+
+  def record(self) -> None:
+    self._sent.append(time.monotonic())
+
+class OutboundDispatcher():
+  """
+  Sends reactions without making the caller wait for Discord.
+
+  Reactions are queued per channel and sent in order by one task per busy channel. Identical
+  reactions that are still queued are coalesced. Each route has a rate limit per channel (plus a
+  global one) matching Discord's buckets, so requests are spaced out before Discord would answer
+  with a 429 instead of being held up by discord.py after one. Part of the global limit is left
+  unused, so that a burst of ✅ reactions never holds up the command replies discord.py sends
+  directly.
+  """
+  # route -> (requests, per seconds), per channel
+  ROUTE_LIMITS: dict[str, tuple[int, float]] = {
+    'reaction': (1, 0.25),
+    'message': (5, 5.0),
+  }
+  GLOBAL_LIMIT: tuple[int, float] = (50, 1.0)
+  # global requests per window left for command replies, which don't go through the queue
+  REPLY_RESERVE: int = 5
+
+  bot: "MyBotType"
+  max_pending: int
+  route_limits: dict[str, tuple[int, float]]
+
+  _channels: dict[int, deque[tuple[str, typing.Hashable, typing.Callable[[], typing.Awaitable]]]]
+  _workers: dict[int, asyncio.Task]
+  _buckets: dict[tuple[str, int], RateLimit]
+  _global: RateLimit
+  _keys: set[typing.Hashable]
+  _closing: bool
+
+  # metrics
+  sent: int
+  coalesced: int
+  dropped: int
+  failed: int
+
+  def __init__(self, bot: "MyBotType", max_pending: int = 1000,
+               route_limits: dict[str, tuple[int, float]] | None = None,
+               global_limit: tuple[int, float] | None = None) -> None:
+    self.bot = bot
+    self.max_pending = max_pending
+    self.route_limits = route_limits or self.ROUTE_LIMITS
+    self._channels = {}
+    self._workers = {}
+    self._buckets = {}
+    self._global = RateLimit(*(global_limit or self.GLOBAL_LIMIT))
+    self._keys = set()
+    self._closing = False
+
+    self.sent = 0
+    self.coalesced = 0
+    self.dropped = 0
+    self.failed = 0
+
+  ####################
+  #  QUEUE METHODS   #
+  ####################
+
+  def react(self, message: discord.Message, emoji: str) -> bool:
+    return self._enqueue(
+      message.channel.id, 'reaction', ('reaction', message.id, emoji),
+      lambda: message.add_reaction(emoji)
+    )
+
+  async def join(self) -> None:
+    """
+    Waits until every queued request has been sent.
+    """
+    while len(self._workers) > 0:
+      await asyncio.gather(*self._workers.values(), return_exceptions=True)
+
+  async def close(self, timeout: float = 10.0) -> None:
+    self._closing = True
+    try:
+      await asyncio.wait_for(self.join(), timeout)
+    except asyncio.TimeoutError:
+      self.bot.logger.warning(
+        "Outbound queue not drained after %ss, dropping %d requests.",
+        timeout, sum(len(queue) for queue in self._channels.values())
+      )
+      for task in self._workers.values():
+        task.cancel()
+      await asyncio.gather(*self._workers.values(), return_exceptions=True)
+    self.bot.logger.info("Outbound stats: %s", self.stats())
+
+  def stats(self) -> dict[str, int]:
+    return {
+      'pending': sum(len(queue) for queue in self._channels.values()),
+      'channels': len(self._workers),
+      'sent': self.sent,
+      'coalesced': self.coalesced,
+      'dropped': self.dropped,
+      'failed': self.failed,
+    }
+
+  ####################
+  #  HELPER METHODS  #
+  ####################
+
+  def _enqueue(self, channel_id: int, route: str, key: typing.Hashable,
+               send: typing.Callable[[], typing.Awaitable]) -> bool:
+    if self._closing:
+      self.dropped += 1
+      return False
+    if key is not None and key in self._keys:
+      self.coalesced += 1
+      return True
+
+    queue = self._channels.setdefault(channel_id, deque())
+    if len(queue) >= self.max_pending:
+      # reactions are cosmetic, so the newest one gives way when a channel is backed up
+      self.dropped += 1
+      return False
+
+    if key is not None:
+      self._keys.add(key)
+    queue.append((route, key, send))
+    if channel_id not in self._workers:
+      self._workers[channel_id] = asyncio.create_task(self._worker(channel_id), name=f"outbound-{channel_id}")
+    return True
+
+  def _get_bucket(self, route: str, channel_id: int) -> RateLimit:
+    bucket = self._buckets.get((route, channel_id))
+    if bucket is None:
+      bucket = self._buckets[(route, channel_id)] = RateLimit(*self.route_limits[route])
+    return bucket
+
+  async def _worker(self, channel_id: int) -> None:
+    queue = self._channels[channel_id]
+    try:
+      while len(queue) > 0:
+        route, key, send = queue[0]
+        bucket = self._get_bucket(route, channel_id)
+        delay = max(bucket.delay(), self._global.delay(self.REPLY_RESERVE))
+        if delay > 0:
+          await asyncio.sleep(delay)
+          continue
+
+        queue.popleft()
+        bucket.record()
+        self._global.record()
+        self._keys.discard(key)
+        try:
+          # a 429 that gets through anyway is retried by discord.py
+          await send()
+          self.sent += 1
+        except discord.HTTPException as e:
+          self.failed += 1
+          self.bot.logger.warning(f"Failed to send {route} in channel {channel_id}: {e}")
+    finally:
+      self._workers.pop(channel_id, None)
+      if len(queue) == 0:
+        self._channels.pop(channel_id, None)
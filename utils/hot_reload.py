@@ -0,0 +1,195 @@
+import asyncio, discord, importlib, os, sys, time, traceback, typing
+from discord.ext import commands
+
+if typing.TYPE_CHECKING:
+  from utils.bot_typing import MyBotType
+
+# exit status that asks `_reload.py` to start the bot again
+RESTART_EXIT_CODE: int = 3
+
+class HotReloader():
+  """
+  Applies source changes to the running bot during development, without reconnecting to the
+  gateway, reopening the database or syncing slash commands.
+
+  - `cogs/*` are reloaded with `reload_extension`.
+  - `handlers/*` and the per-game `models/*` are imported again and the handlers rebuilt around the
+    running `BotUtilities`, so the database connection, write lock and member names carry over.
+    The cogs are reloaded afterwards so that they pick up the new handlers.
+  - Anything else (`bot.py`, `utils/*` and the models shared with them) holds state that can't
+    be swapped safely: the bot closes and exits with `RESTART_EXIT_CODE` for `_reload.py` to start
+    it again.
+
+  Changes are found by polling modification times every `interval` seconds.
+  """
+  WATCHED: tuple[str, ...] = ('bot.py', 'cogs', 'handlers', 'models', 'utils')
+  # models the parser and `bot.py` hold instances or enum members of
+  SHARED_MODELS: tuple[str, ...] = ('models', 'models.submission')
+  # how long to wait for an editor to finish writing before reloading
+  SETTLE_SECONDS: float = 0.3
+
+  bot: "MyBotType"
+  root: str
+  interval: float
+  restart_requested: bool
+
+  _mtimes: dict[str, float]
+  _task: asyncio.Task | None
+  _restart_task: asyncio.Task | None
+
+  # metrics
+  reloads: int
+  failures: int
+
+  def __init__(self, bot: "MyBotType", root: str, interval: float = 1.0) -> None:
+    self.bot = bot
+    self.root = root
+    self.interval = interval
+    self.restart_requested = False
+    self._mtimes = {}
+    self._task = None
+    self._restart_task = None
+
+    self.reloads = 0
+    self.failures = 0
+
+  ####################
+  #  CONTROL METHODS #
+  ####################
+
+  def start(self) -> None:
+    self._mtimes = self._scan()
+    self._task = asyncio.create_task(self._watch(), name='hot-reload')
+    self.bot.logger.info("Hot reload is watching %d files.", len(self._mtimes))
+
+  async def close(self) -> None:
+    if self._task is not None and self._task is not asyncio.current_task():
+      self._task.cancel()
+      await asyncio.gather(self._task, return_exceptions=True)
+    self._task = None
+
+  def stats(self) -> dict[str, int]:
+    return {
+      'reloads': self.reloads,
+      'failures': self.failures,
+    }
+
+  ####################
+  #  RELOAD METHODS  #
+  ####################
+
+  async def apply(self, paths: list[str]) -> None:
+    """
+    Reloads what changed in `paths`, or restarts the bot if that can't be done in place.
+    """
+    started = time.perf_counter()
+    modules = sorted({self._module_name(path) for path in paths})
+    restart = [module for module in modules if self._needs_restart(module)]
+    if len(restart) > 0:
+      self.bot.logger.info("%s changed, restarting.", ', '.join(restart))
+      self.request_restart()
+      return
+
+    extensions = [module for module in modules if module in self.bot.extensions]
+    if any(module == 'handlers' or module.startswith(('handlers.', 'models.')) for module in modules):
+      if not self.reload_handlers():
+        return
+      # the cogs keep references to the old handlers
+      extensions = list(self.bot.extensions)
+
+    reloaded: list[str] = []
+    for extension in extensions:
+      try:
+        await self.bot.reload_extension(extension)
+        reloaded.append(extension)
+      except commands.ExtensionError as e:
+        # discord.py keeps the previous version loaded
+        self.failures += 1
+        self.bot.logger.error(f"Failed to reload {extension}, keeping the old one:\n{''.join(traceback.format_exception(e))}")
+    if len(reloaded) > 0:
+      # the guild copies of the slash commands still point at the old cogs (nothing is synced)
+      self.bot.tree.copy_global_to(guild=discord.Object(id=self.bot.guild_id))
+
+    self.reloads += 1
+    self.bot.logger.info("Reloaded %s in %.0fms.", ', '.join(modules), (time.perf_counter() - started) * 1000)
+
+  def reload_handlers(self) -> bool:
+    """
+    Imports the handler and per-game model modules again and rebuilds the handlers from them. If
+    that fails, the old modules and handlers stay in place.
+    """
+    names = [name for name in sys.modules if self._is_handler_module(name)]
+    old = {name: sys.modules.pop(name) for name in names}
+    try:
+      for name in sorted(names):
+        importlib.import_module(name)
+      self.bot.init_handlers()
+      return True
+    except Exception as e:
+      for name in list(sys.modules):
+        if self._is_handler_module(name):
+          del sys.modules[name]
+      sys.modules.update(old)
+      self.failures += 1
+      self.bot.logger.error(f"Failed to reload the handlers, keeping the old ones:\n{''.join(traceback.format_exception(e))}")
+      return False
+
+  def request_restart(self) -> None:
+    """
+    Closes the bot so that it exits with `RESTART_EXIT_CODE`.
+    """
+    if self._restart_task is not None:
+      return
+    self.restart_requested = True
+    # not from the watcher task, which the bot cancels while closing
+    self._restart_task = asyncio.create_task(self.bot.close(), name='hot-reload-restart')
+
+  ####################
+  #  HELPER METHODS  #
+  ####################
+
+  async def _watch(self) -> None:
+    while True:
+      await asyncio.sleep(self.interval)
+      mtimes = self._scan()
+      if mtimes == self._mtimes:
+        continue
+
+      # editors often write a file more than once, wait for them to finish
+      await asyncio.sleep(self.SETTLE_SECONDS)
+      mtimes = self._scan()
+      changed = [path for path, mtime in mtimes.items() if self._mtimes.get(path) != mtime]
+      self._mtimes = mtimes
+      if len(changed) == 0:
+        # only deletions, which nothing needs reloading for
+        continue
+      try:
+        await self.apply(changed)
+      except Exception as e:
+        self.failures += 1
+        self.bot.logger.error(f"Hot reload failed:\n{''.join(traceback.format_exception(e))}")
+
+  def _scan(self) -> dict[str, float]:
+    mtimes: dict[str, float] = {}
+    for watched in self.WATCHED:
+      path = os.path.join(self.root, watched)
+      if os.path.isfile(path):
+        mtimes[path] = os.stat(path).st_mtime
+        continue
+      for directory, _, files in os.walk(path):
+        for file in files:
+          if file.endswith('.py'):
+            file_path = os.path.join(directory, file)
+            mtimes[file_path] = os.stat(file_path).st_mtime
+    return mtimes
+
+  def _module_name(self, path: str) -> str:
+    name = os.path.relpath(path, self.root).removesuffix('.py').replace(os.sep, '.')
+    return name.removesuffix('.__init__')
+
+  def _needs_restart(self, module: str) -> bool:
+    return module == 'bot' or module == 'utils' or module.startswith('utils.') or module in self.SHARED_MODELS
+
+  def _is_handler_module(self, name: str) -> bool:
+    return (name == 'handlers' or name.startswith('handlers.')
+            or (name.startswith('models.') and name not in self.SHARED_MODELS))
@@ -0,0 +1,144 @@
+import asyncio, discord, time, typing
+
+from utils.bot_utilities import DiscordReactions
+
+if typing.TYPE_CHECKING:
+  from utils.bot_typing import MyBotType
+
+class IngestionPipeline():
+  """
+  Takes puzzle messages off the gateway event handler.
+
+  `submit` only enqueues a message. Worker tasks parse it and write the entry, and reactions are
+  handed to the bot's `OutboundDispatcher`, so a burst of submissions (or `/update` replaying
+  history) never waits on Discord's HTTP API to write the next entry. The queue is bounded:
+  once it is full `submit` waits for room, which is counted in `stats()`.
+  """
+  bot: "MyBotType"
+  workers: int
+
+  _queue: asyncio.Queue[tuple[discord.Message, float]]
+  _tasks: list[asyncio.Task]
+  _closing: bool
+
+  # metrics
+  enqueued: int
+  processed: int
+  failed: int
+  blocked: int
+  blocked_seconds: float
+  max_depth: int
+  total_latency: float
+
+  def __init__(self, bot: "MyBotType", workers: int = 2, max_size: int = 500) -> None:
+    self.bot = bot
+    self.workers = workers
+    self._queue = asyncio.Queue(maxsize=max_size)
+    self._tasks = []
+    self._closing = False
+
+    self.enqueued = 0
+    self.processed = 0
+    self.failed = 0
+    self.blocked = 0
+    self.blocked_seconds = 0.0
+    self.max_depth = 0
+    self.total_latency = 0.0
+
+  ####################
+  #  QUEUE METHODS   #
+  ####################
+
+  def start(self) -> None:
+    if len(self._tasks) > 0:
+      return
+
+    self._closing = False
+    for i in range(self.workers):
+      self._tasks.append(asyncio.create_task(self._worker(), name=f"ingestion-worker-{i}"))
+
+  async def submit(self, message: discord.Message) -> bool:
+    """
+    Queues `message` if it could be a puzzle result. Returns `False` if it was ignored.
+    """
+    if self._closing or not self.bot.utils.parser.is_candidate(message.content):
+      return False
+
+    item = (message, time.perf_counter())
+    if self._queue.full():
+      self.blocked += 1
+      await self._queue.put(item)
+      self.blocked_seconds += time.perf_counter() - item[1]
+    else:
+      self._queue.put_nowait(item)
+
+    self.enqueued += 1
+    self.max_depth = max(self.max_depth, self._queue.qsize())
+    return True
+
+  async def join(self) -> None:
+    """
+    Waits until every queued message has been written.
+    """
+    await self._queue.join()
+
+  async def close(self, timeout: float = 10.0) -> None:
+    """
+    Stops accepting messages, drains the queue (up to `timeout` seconds) and stops the workers.
+    """
+    self._closing = True
+    try:
+      await asyncio.wait_for(self.join(), timeout)
+    except asyncio.TimeoutError:
+      self.bot.logger.warning(
+        "Ingestion queue not drained after %ss, dropping %d messages.", timeout, self._queue.qsize()
+      )
+
+    for task in self._tasks:
+      task.cancel()
+    await asyncio.gather(*self._tasks, return_exceptions=True)
+    self._tasks = []
+    self.bot.logger.info("Ingestion stats: %s", self.stats())
+
+  def stats(self) -> dict[str, int | float]:
+    return {
+      'depth': self._queue.qsize(),
+      'max_depth': self.max_depth,
+      'enqueued': self.enqueued,
+      'processed': self.processed,
+      'failed': self.failed,
+      'blocked': self.blocked,
+      'blocked_seconds': round(self.blocked_seconds, 3),
+      'avg_latency_ms': round(1000 * self.total_latency / self.processed, 3) if self.processed > 0 else 0.0,
+    }
+
+  ####################
+  #  WORKER METHODS  #
+  ####################
+
+  async def _worker(self) -> None:
+    while True:
+      message, queued_at = await self._queue.get()
+      failed = False
+      try:
+        await self._ingest(message)
+      except Exception as e:
+        failed = True
+        self.failed += 1
+        self.bot.logger.error(f"Failed to ingest message {message.id}: {e}")
+      finally:
+        latency = time.perf_counter() - queued_at
+        self.processed += 1
+        self.total_latency += latency
+        self.bot.metrics.observe('ingest_seconds', latency, failed)
+        self._queue.task_done()
+
+  async def _ingest(self, message: discord.Message) -> None:
+    submission = self.bot.utils.parser.parse(message.content)
+    if submission is None:
+      self.bot.logger.info("Non-puzzle message received.")
+      return
+
+    self.bot.logger.debug("%s puzzle submitted.", submission.game.value)
+    if await self.bot.games[submission.game].add_entry(message.author, submission, message=message):
+      self.bot.dispatcher.react(message, DiscordReactions['checkmark'])
@@ -0,0 +1,49 @@
+import importlib, sys, time, typing
+
+class LazyModule():
+  """
+  Stands in for a module that's slow to import (pandas, matplotlib, seaborn, numpy) and only
+  needed once a command renders something. The module is imported on first attribute access, so
+  importing the bot doesn't pay for it before connecting.
+  """
+  name: str
+
+  _module: typing.Any
+
+  def __init__(self, name: str) -> None:
+    self.name = name
+    self._module = None
+
+  def __getattr__(self, attr: str) -> typing.Any:
+    if self._module is None:
+      self._module = importlib.import_module(self.name)
+    return getattr(self._module, attr)
+
+  def __repr__(self) -> str:
+    state = 'loaded' if self.name in sys.modules else 'not loaded'
+    return f"<lazy module '{self.name}' ({state})>"
+
+_modules: dict[str, LazyModule] = {}
+
+def lazy_import(name: str) -> typing.Any:
+  """
+  A `LazyModule` for `name`, used in place of `import name`. Import the real module under
+  `typing.TYPE_CHECKING` for type checkers.
+  """
+  if name not in _modules:
+    _modules[name] = LazyModule(name)
+  return _modules[name]
+
+def preload() -> dict[str, float]:
+  """
+  Imports every module handed out by `lazy_import` that isn't loaded yet, so the first command
+  after startup doesn't pay for it. Returns how long each one took, in seconds.
+  """
+  timings: dict[str, float] = {}
+  for name in list(_modules):
+    if name in sys.modules:
+      continue
+    started = time.perf_counter()
+    importlib.import_module(name)
+    timings[name] = time.perf_counter() - started
+  return timings
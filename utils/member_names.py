@@ -0,0 +1,134 @@
+import discord, time, typing
+from collections import OrderedDict
+
+if typing.TYPE_CHECKING:
+  from utils.bot_utilities import BotUtilities
+
+class MemberNameResolver():
+  """
+  Resolves user ids to the names shown in leaderboards.
+
+  Names come from the guild's member cache (`guild.get_member`), falling back to the name stored
+  in `users` for anyone who has left. Members' names are kept in a per-guild LRU that member join
+  and update events keep current (which needs the members intent), so building a table doesn't
+  touch the member cache for players it has already seen. Stored names are kept apart, for
+  `STORED_NAME_TTL` seconds, so that they never hide the name of someone who is a member.
+  """
+  STORED_NAME_TTL: float = 300.0
+
+  utils: "BotUtilities"
+  max_size: int
+
+  _names: dict[int, OrderedDict[int, str]]
+  # user id -> (stored name, when it was looked up), oldest first
+  _stored: OrderedDict[int, tuple[str, float]]
+
+  def __init__(self, utils: "BotUtilities", max_size: int = 1024) -> None:
+    utils.bot.logger.debug(f"Initializing {self.__class__.__name__} class.")
+    self.utils = utils
+    self.max_size = max_size
+    self._names = {}
+    self._stored = OrderedDict()
+
+  ####################
+  #  LOOKUP METHODS  #
+  ####################
+
+  def resolve(self, user_id: int, guild: discord.Guild | None = None) -> str | None:
+    """
+    The display name of `user_id` in `guild` (the bot's first guild by default), or `None` if
+    they aren't a cached member.
+    """
+    guild = guild or self._default_guild()
+    if guild is None:
+      return None
+
+    names = self._get_names(guild.id)
+    name = names.get(user_id)
+    if name is not None:
+      names.move_to_end(user_id)
+      return name
+
+    member = guild.get_member(user_id)
+    if member is None:
+      return None
+    self._remember(names, user_id, member.display_name)
+    return member.display_name
+
+  async def resolve_many(self, user_ids: typing.Iterable[int], guild: discord.Guild | None = None) -> dict[int, str]:
+    """
+    Resolves every one of `user_ids` at once, looking up any that aren't members in `users` with
+    a single query. Ids with no name anywhere are left out.
+    """
+    guild = guild or self._default_guild()
+    resolved: dict[int, str] = {}
+    missing: list[int] = []
+    now = time.monotonic()
+    for user_id in dict.fromkeys(user_ids):
+      name = self.resolve(user_id, guild)
+      if name is None:
+        name = self._get_stored(user_id, now)
+      if name is not None:
+        resolved[user_id] = name
+      else:
+        missing.append(user_id)
+
+    if len(missing) > 0:
+      async with self.utils.connection.execute_fetchall(
+        f"select user_id, name from users where user_id in ({','.join(['?'] * len(missing))})",
+        missing
+      ) as rows:
+        for user_id, name in rows:
+          resolved[user_id] = name
+          self._stored[user_id] = (name, now)
+          self._stored.move_to_end(user_id)
+          if len(self._stored) > self.max_size:
+            self._stored.popitem(last=False)
+
+    return resolved
+
+  ####################
+  #  EVENT METHODS   #
+  ####################
+
+  def on_member_update(self, member: discord.Member) -> None:
+    # only refresh names that are cached, the rest are looked up when they're needed
+    names = self._get_names(member.guild.id)
+    if member.id in names:
+      names[member.id] = member.display_name
+
+  def on_member_join(self, member: discord.Member) -> None:
+    # a returning member's own name replaces their stored one
+    self._stored.pop(member.id, None)
+    self._remember(self._get_names(member.guild.id), member.id, member.display_name)
+
+  ####################
+  #  HELPER METHODS  #
+  ####################
+
+  def _default_guild(self) -> discord.Guild | None:
+    if len(self.utils.bot.guilds) == 0:
+      self.utils.bot.logger.error("Not in any guild, can't resolve member names.")
+      return None
+    return self.utils.bot.guilds[0]
+
+  def _get_names(self, guild_id: int) -> OrderedDict[int, str]:
+    names = self._names.get(guild_id)
+    if names is None:
+      names = self._names[guild_id] = OrderedDict()
+    return names
+
+  def _get_stored(self, user_id: int, now: float) -> str | None:
+    stored = self._stored.get(user_id)
+    if stored is None:
+      return None
+    if now - stored[1] > self.STORED_NAME_TTL:
+      del self._stored[user_id]
+      return None
+    return stored[0]
+
+  def _remember(self, names: OrderedDict[int, str], user_id: int, name: str) -> None:
+    names[user_id] = name
+    names.move_to_end(user_id)
+    if len(names) > self.max_size:
+      names.popitem(last=False)
@@ -0,0 +1,219 @@
+import bisect, contextlib, functools, inspect, time, typing
+
+if typing.TYPE_CHECKING:
+  from aiohttp import web
+
+class Histogram():
+  """
+  Counts observations (in seconds) into fixed buckets, Prometheus style. Quantiles are estimated
+  by interpolating within the bucket they fall in.
+  """
+  BUCKETS: tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+  counts: list[int]
+  count: int
+  sum: float
+  errors: int
+
+  def __init__(self) -> None:
+    # the last bucket is +Inf
+    self.counts = [0] * (len(self.BUCKETS) + 1)
+    self.count = 0
+    self.sum = 0.0
+    self.errors = 0
+
+  def observe(self, seconds: float, error: bool = False) -> None:
+    self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+    self.count += 1
+    self.sum += seconds
+    if error:
+      self.errors += 1
+
+  def quantile(self, q: float) -> float:
+    if self.count == 0:
+      return 0.0
+
+    rank = q * self.count
+    cumulative = 0
+    for i, count in enumerate(self.counts):
+      if cumulative + count >= rank and count > 0:
+        if i == len(self.BUCKETS):
+          return self.BUCKETS[-1]
+        lower = self.BUCKETS[i - 1] if i > 0 else 0.0
+        return lower + (self.BUCKETS[i] - lower) * (rank - cumulative) / count
+      cumulative += count
+    return self.BUCKETS[-1]
+
+class Metrics():
+  """
+  Latency histograms, counts and error rates for commands, ingestion, database queries and
+  rendering, exposed in the Prometheus text format (`render`, or over HTTP with `start_server`)
+  and as a summary for the `/metrics` command.
+
+  When disabled nothing is instrumented and `observe` returns straight away, so the only cost
+  left is a call and an attribute check.
+  """
+  PREFIX: str = 'nytbot'
+  QUANTILES: tuple[float, ...] = (0.5, 0.95, 0.99)
+
+  enabled: bool
+
+  _series: dict[tuple[str, tuple[tuple[str, str], ...]], Histogram]
+  _collectors: dict[str, typing.Callable[[], dict[str, int | float]]]
+  _runner: "web.AppRunner | None"
+
+  def __init__(self, enabled: bool = False) -> None:
+    self.enabled = enabled
+    self._series = {}
+    self._collectors = {}
+    self._runner = None
+
+  ####################
+  #  RECORD METHODS  #
+  ####################
+
+  def observe(self, name: str, seconds: float, error: bool = False, /, **labels: str) -> None:
+    if not self.enabled:
+      return
+
+    key = (name, tuple(sorted(labels.items())))
+    histogram = self._series.get(key)
+    if histogram is None:
+      histogram = self._series[key] = Histogram()
+    histogram.observe(seconds, error)
+
+  @contextlib.contextmanager
+  def timer(self, name: str, /, **labels: str) -> typing.Iterator[None]:
+    started = time.perf_counter()
+    error = False
+    try:
+      yield
+    except BaseException:
+      error = True
+      raise
+    finally:
+      self.observe(name, time.perf_counter() - started, error, **labels)
+
+  def instrument(self, obj: typing.Any, name: str, methods: typing.Iterable[str] | None = None,
+                 label: str = 'method', **labels: str) -> None:
+    """
+    Times every call to `methods` of `obj` (every public coroutine method by default) as `name`,
+    labelled with the method name. Does nothing when disabled.
+    """
+    if not self.enabled:
+      return
+
+    if methods is None:
+      methods = [
+        method for method, value in inspect.getmembers(type(obj), inspect.iscoroutinefunction)
+        if not method.startswith('_')
+      ]
+    for method in methods:
+      setattr(obj, method, self._wrap(getattr(obj, method), name, **{label: method}, **labels))
+
+  def command_started(self, ctx: typing.Any) -> None:
+    if self.enabled:
+      ctx.metrics_started = time.perf_counter()
+
+  def command_finished(self, ctx: typing.Any, error: bool = False) -> None:
+    started: float | None = getattr(ctx, 'metrics_started', None)
+    if started is None:
+      return
+
+    command = ctx.command.qualified_name if ctx.command is not None else 'unknown'
+    self.observe('command_seconds', time.perf_counter() - started, error, command=command)
+
+  def add_collector(self, name: str, collect: typing.Callable[[], dict[str, int | float]]) -> None:
+    """
+    Adds the numbers returned by `collect` (a component's `stats()`) to every export, as gauges.
+    """
+    self._collectors[name] = collect
+
+  ####################
+  #  EXPORT METHODS  #
+  ####################
+
+  def render(self) -> str:
+    """
+    Every series in the Prometheus text exposition format.
+    """
+    lines: list[str] = []
+    for name in sorted({name for name, _ in self._series}):
+      metric = f"{self.PREFIX}_{name}"
+      lines.append(f"# TYPE {metric} histogram")
+      series = [(labels, histogram) for (series_name, labels), histogram in self._series.items() if series_name == name]
+      for labels, histogram in series:
+        cumulative = 0
+        for bound, count in zip([*map(str, Histogram.BUCKETS), '+Inf'], histogram.counts):
+          cumulative += count
+          lines.append(f"{metric}_bucket{self._labels(labels, ('le', bound))} {cumulative}")
+        lines.append(f"{metric}_sum{self._labels(labels)} {histogram.sum}")
+        lines.append(f"{metric}_count{self._labels(labels)} {histogram.count}")
+      lines.append(f"# TYPE {metric}_errors_total counter")
+      for labels, histogram in series:
+        lines.append(f"{metric}_errors_total{self._labels(labels)} {histogram.errors}")
+
+    for name, collect in self._collectors.items():
+      for key, value in collect().items():
+        lines.append(f"# TYPE {self.PREFIX}_{name}_{key} gauge")
+        lines.append(f"{self.PREFIX}_{name}_{key} {value}")
+    return '\n'.join(lines) + '\n'
+
+  def summary(self) -> list[tuple[str, int, float, float, float, float]]:
+    """
+    `(series, count, p50, p95, p99, error rate)` for every series, slowest p95 first.
+    """
+    rows = []
+    for (name, labels), histogram in self._series.items():
+      series = ' '.join([name, *[value for _, value in labels]])
+      rows.append((
+        series, histogram.count, *[histogram.quantile(q) for q in self.QUANTILES],
+        histogram.errors / histogram.count if histogram.count > 0 else 0.0,
+      ))
+    rows.sort(key = lambda row: row[3], reverse=True)
+    return rows # type: ignore
+
+  async def start_server(self, host: str, port: int) -> None:
+    """
+    Serves `render()` at `http://host:port/metrics`.
+    """
+    # only needed when the endpoint is enabled
+    from aiohttp import web
+
+    async def handle(_: web.Request) -> web.Response:
+      return web.Response(text=self.render(), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle)
+    self._runner = web.AppRunner(app, access_log=None)
+    await self._runner.setup()
+    await web.TCPSite(self._runner, host, port).start()
+
+  async def close(self) -> None:
+    if self._runner is not None:
+      await self._runner.cleanup()
+      self._runner = None
+
+  ####################
+  #  HELPER METHODS  #
+  ####################
+
+  def _wrap(self, function: typing.Callable, name: str, /, **labels: str) -> typing.Callable:
+    if inspect.iscoroutinefunction(function):
+      @functools.wraps(function)
+      async def timed_async(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        with self.timer(name, **labels):
+          return await function(*args, **kwargs)
+      return timed_async
+
+    @functools.wraps(function)
+    def timed(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+      with self.timer(name, **labels):
+        return function(*args, **kwargs)
+    return timed
+
+  def _labels(self, labels: tuple[tuple[str, str], ...], *extra: tuple[str, str]) -> str:
+    pairs = [*labels, *extra]
+    if len(pairs) == 0:
+      return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in pairs) + '}'
@@ -0,0 +1,260 @@
+import asyncio, cProfile, datetime, io, os, pstats, signal, sys, threading, time, types, typing
+from collections import Counter
+
+if typing.TYPE_CHECKING:
+  from utils.bot_typing import MyBotType
+
+class ProfileReport():
+  """
+  The outcome of a profiling session: where it was saved and its hottest functions.
+  """
+  mode: str
+  path: str
+  seconds: float
+  commands: int
+  top: list[str]
+
+  def __init__(self, mode: str, path: str, seconds: float, commands: int, top: list[str]) -> None:
+    self.mode = mode
+    self.path = path
+    self.seconds = seconds
+    self.commands = commands
+    self.top = top
+
+  def __str__(self) -> str:
+    return f"Profiled {self.seconds:.1f}s ({self.commands} commands) with {self.mode}, saved to `{self.path}`."
+
+class Sampler():
+  """
+  Samples the calling thread's stack every `interval` seconds of CPU time, counting collapsed
+  stacks (`outer;inner;leaf`) for flamegraphs.
+
+  On the main thread (where the bot's event loop runs) samples are taken by a `SIGPROF` timer, so
+  they land wherever the thread actually is and idle time isn't sampled. Elsewhere, or without
+  `setitimer`, a background thread samples instead, which skews towards the points where the
+  thread releases the GIL (e.g. the event loop's `select`).
+  """
+  interval: float
+  stacks: Counter[tuple[str, ...]]
+
+  _thread_id: int
+  _stop: threading.Event
+  _thread: threading.Thread | None
+  _previous_handler: typing.Any
+
+  def __init__(self, interval: float = 0.005) -> None:
+    self.interval = interval
+    self.stacks = Counter()
+    self._thread_id = threading.get_ident()
+    self._stop = threading.Event()
+    self._thread = None
+    self._previous_handler = None
+
+  @property
+  def uses_signal(self) -> bool:
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+  def start(self) -> None:
+    if self.uses_signal:
+      self._previous_handler = signal.signal(signal.SIGPROF, self._on_signal)
+      signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+    else:
+      self._thread = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+      self._thread.start()
+
+  def stop(self) -> None:
+    if self._thread is not None:
+      self._stop.set()
+      self._thread.join()
+      self._thread = None
+    else:
+      signal.setitimer(signal.ITIMER_PROF, 0)
+      signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+
+  def _on_signal(self, _: int, frame: types.FrameType | None) -> None:
+    self._record(frame)
+
+  def _sample(self) -> None:
+    while not self._stop.wait(self.interval):
+      self._record(sys._current_frames().get(self._thread_id))
+
+  def _record(self, frame: types.FrameType | None) -> None:
+    stack: list[str] = []
+    while frame is not None:
+      code = frame.f_code
+      stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+      frame = frame.f_back
+    if len(stack) > 0:
+      self.stacks[tuple(reversed(stack))] += 1
+
+class Profiler():
+  """
+  Profiles the running bot on demand, for `seconds` seconds and/or `commands` command responses.
+
+  `cprofile` traces every call on the event loop's thread and saves a `.pstats` file (open it with
+  `python -m pstats` or snakeviz). `sample` periodically snapshots the loop's stack (see `Sampler`)
+  and saves collapsed stacks (`.folded`) for flamegraph.pl or speedscope; it costs far less but
+  misses short calls.
+  Nothing is hooked while no session is running.
+  """
+  MODES: tuple[str, ...] = ('cprofile', 'sample')
+
+  bot: "MyBotType"
+  directory: str
+  top_count: int
+
+  _mode: str | None
+  _profile: cProfile.Profile | None
+  _sampler: Sampler | None
+  _started: float
+  _commands: int
+  _max_commands: int | None
+  _timer: asyncio.TimerHandle | None
+  _on_finish: typing.Callable[[ProfileReport], typing.Awaitable[typing.Any]] | None
+  _finishing: asyncio.Task | None
+
+  def __init__(self, bot: "MyBotType", directory: str = 'profiles', top_count: int = 15) -> None:
+    self.bot = bot
+    self.directory = directory
+    self.top_count = top_count
+    self._mode = None
+    self._profile = None
+    self._sampler = None
+    self._started = 0.0
+    self._commands = 0
+    self._max_commands = None
+    self._timer = None
+    self._on_finish = None
+    self._finishing = None
+
+  @property
+  def active(self) -> bool:
+    return self._mode is not None
+
+  ####################
+  # SESSION METHODS  #
+  ####################
+
+  def start(self, mode: str = 'cprofile', seconds: float | None = None, commands: int | None = None,
+            on_finish: typing.Callable[[ProfileReport], typing.Awaitable[typing.Any]] | None = None) -> None:
+    """
+    Starts profiling. The session ends after `seconds` or after `commands` command responses,
+    whichever comes first, and its report is passed to `on_finish`; without either it runs until
+    `stop`. Raises `ValueError` if a session is already running or `mode` is unknown.
+    """
+    if self.active:
+      raise ValueError("A profiling session is already running.")
+    if mode not in self.MODES:
+      raise ValueError(f"Unknown profiling mode `{mode}`, use one of: {', '.join(self.MODES)}.")
+
+    if mode == 'cprofile':
+      self._profile = cProfile.Profile()
+      # raises ValueError if another profiler (or debugger) is already attached
+      self._profile.enable()
+    else:
+      self._sampler = Sampler()
+      self._sampler.start()
+
+    self._mode = mode
+    self._started = time.perf_counter()
+    self._commands = 0
+    self._max_commands = commands
+    self._on_finish = on_finish
+    if seconds is not None:
+      self._timer = asyncio.get_running_loop().call_later(seconds, self._finish)
+    self.bot.logger.info(f"Started {mode} profiling (seconds={seconds}, commands={commands}).")
+
+  async def stop(self) -> ProfileReport:
+    """
+    Ends the running session, saves it under `directory` and returns its report.
+    """
+    if not self.active:
+      raise ValueError("No profiling session is running.")
+
+    mode = typing.cast(str, self._mode)
+    seconds = time.perf_counter() - self._started
+    if self._profile is not None:
+      self._profile.disable()
+    if self._sampler is not None:
+      self._sampler.stop()
+    if self._timer is not None:
+      self._timer.cancel()
+
+    profile, sampler = self._profile, self._sampler
+    self._mode = None
+    self._profile = None
+    self._sampler = None
+    self._timer = None
+    self._max_commands = None
+    self._on_finish = None
+
+    path = os.path.join(
+      self.directory,
+      f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}-{mode}.{'pstats' if profile is not None else 'folded'}",
+    )
+    if profile is not None:
+      top = await asyncio.to_thread(self._save_profile, profile, path)
+    else:
+      top = await asyncio.to_thread(self._save_samples, typing.cast(Sampler, sampler), path)
+
+    report = ProfileReport(mode, path, seconds, self._commands, top)
+    self.bot.logger.info(str(report))
+    return report
+
+  def command_finished(self) -> None:
+    """
+    Counts a command response towards the session's `commands` limit.
+    """
+    if self._max_commands is None:
+      return
+
+    self._commands += 1
+    if self._commands >= self._max_commands:
+      self._finish()
+
+  ####################
+  #  HELPER METHODS  #
+  ####################
+
+  def _finish(self) -> None:
+    if not self.active or self._finishing is not None:
+      return
+    self._max_commands = None
+    self._finishing = asyncio.get_running_loop().create_task(self._report(), name='profile-finish')
+
+  async def _report(self) -> None:
+    on_finish = self._on_finish
+    self._on_finish = None
+    try:
+      report = await self.stop()
+      if on_finish is not None:
+        await on_finish(report)
+    except Exception as e:
+      self.bot.logger.error(f"Failed to finish profiling: {e}")
+    finally:
+      self._finishing = None
+
+  def _save_profile(self, profile: cProfile.Profile, path: str) -> list[str]:
+    os.makedirs(self.directory, exist_ok=True)
+    profile.dump_stats(path)
+
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    rows = sorted(stats.stats.items(), key = lambda item: item[1][2], reverse=True) # type: ignore
+    top = []
+    for (filename, line, function), (_, calls, own, total, _) in rows[:self.top_count]:
+      location = f"{os.path.basename(filename)}:{line}" if line > 0 else filename
+      top.append(f"{own * 1000:>8.1f}ms {total * 1000:>9.1f}ms {calls:>7}  {function} ({location})")
+    return [f"{'own':>10} {'total':>11} {'calls':>7}  function", *top]
+
+  def _save_samples(self, sampler: Sampler, path: str) -> list[str]:
+    os.makedirs(self.directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+      for stack, count in sampler.stacks.items():
+        file.write(f"{';'.join(stack)} {count}\n")
+
+    total = sum(sampler.stacks.values())
+    own: Counter[str] = Counter()
+    for stack, count in sampler.stacks.items():
+      own[stack[-1]] += count
+    top = [f"{count / total:>6.1%} {count:>7}  {function}" for function, count in own.most_common(self.top_count)]
+    return [f"{'own':>6} {'samples':>7}  function", *top]
@@ -0,0 +1,123 @@
+import asyncio, discord, time, traceback, typing
+from discord.ext import commands
+
+if typing.TYPE_CHECKING:
+  from utils.bot_typing import MyBotType
+
+class DeferredResponder():
+  """
+  Answers commands without making Discord wait for the database or the renderer.
+
+  The command is acknowledged first (a slash command shows "thinking...", which its first message
+  then replaces) and the work runs as a background task, so nothing counts against Discord's
+  3 second interaction window. Work that takes longer than `timeout` seconds, or fails, gets a
+  follow-up saying so instead of leaving the interaction to fail.
+  """
+  TIMEOUT_MESSAGE: str = "Sorry, that's taking too long. Please try again in a bit."
+  ERROR_MESSAGE: str = "Sorry, something went wrong. Please try again later."
+
+  bot: "MyBotType"
+  timeout: float
+
+  _tasks: set[asyncio.Task]
+
+  # metrics
+  completed: int
+  timed_out: int
+  failed: int
+  total_seconds: float
+
+  def __init__(self, bot: "MyBotType", timeout: float = 30.0) -> None:
+    self.bot = bot
+    self.timeout = timeout
+    self._tasks = set()
+
+    self.completed = 0
+    self.timed_out = 0
+    self.failed = 0
+    self.total_seconds = 0.0
+
+  ####################
+  # RESPONSE METHODS #
+  ####################
+
+  async def respond(self, ctx: commands.Context, work: typing.Callable[[], typing.Awaitable[None]]) -> asyncio.Task:
+    """
+    Acknowledges the command behind `ctx`, then runs `work` (which replies through `ctx`) in the
+    background.
+    """
+    await ctx.defer()
+    name = ctx.command.qualified_name if ctx.command is not None else 'command'
+    return self.spawn(name, work, ctx.send)
+
+  async def respond_to_interaction(self, interaction: discord.Interaction,
+                                   work: typing.Callable[[], typing.Awaitable[None]]) -> asyncio.Task:
+    """
+    Like `respond`, for interactions outside of commands (context menus). `work` replies through
+    `interaction.followup`, privately.
+    """
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    name = interaction.command.name if interaction.command is not None else 'interaction'
+    return self.spawn(name, work, lambda content: interaction.followup.send(content, ephemeral=True))
+
+  def spawn(self, name: str, work: typing.Callable[[], typing.Awaitable[None]],
+            notify: typing.Callable[[str], typing.Awaitable[typing.Any]]) -> asyncio.Task:
+    task = asyncio.create_task(self._run(name, work, notify), name=f"respond-{name}")
+    self._tasks.add(task)
+    task.add_done_callback(self._tasks.discard)
+    return task
+
+  async def close(self, timeout: float = 10.0) -> None:
+    """
+    Waits (up to `timeout` seconds) for responses that are still being worked on.
+    """
+    if len(self._tasks) > 0:
+      _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+      for task in pending:
+        task.cancel()
+      await asyncio.gather(*pending, return_exceptions=True)
+    self.bot.logger.info("Response stats: %s", self.stats())
+
+  def stats(self) -> dict[str, int | float]:
+    finished = self.completed + self.timed_out + self.failed
+    return {
+      'running': len(self._tasks),
+      'completed': self.completed,
+      'timed_out': self.timed_out,
+      'failed': self.failed,
+      'avg_seconds': round(self.total_seconds / finished, 3) if finished > 0 else 0.0,
+    }
+
+  ####################
+  #  HELPER METHODS  #
+  ####################
+
+  async def _run(self, name: str, work: typing.Callable[[], typing.Awaitable[None]],
+                 notify: typing.Callable[[str], typing.Awaitable[typing.Any]]) -> None:
+    started = time.perf_counter()
+    error = True
+    try:
+      async with asyncio.timeout(self.timeout):
+        await work()
+      self.completed += 1
+      error = False
+    except TimeoutError:
+      self.timed_out += 1
+      self.bot.logger.warning("`%s` timed out after %ss.", name, self.timeout)
+      await self._notify(notify, self.TIMEOUT_MESSAGE)
+    except Exception as e:
+      self.failed += 1
+      self.bot.logger.error(f"`{name}` failed: {e}")
+      traceback.print_exception(e)
+      await self._notify(notify, self.ERROR_MESSAGE)
+    finally:
+      elapsed = time.perf_counter() - started
+      self.total_seconds += elapsed
+      self.bot.metrics.observe('response_seconds', elapsed, error, command=name)
+      self.bot.profiler.command_finished()
+
+  async def _notify(self, notify: typing.Callable[[str], typing.Awaitable[typing.Any]], content: str) -> None:
+    try:
+      await notify(content)
+    except discord.HTTPException as e:
+      self.bot.logger.warning(f"Failed to send follow-up: {e}")
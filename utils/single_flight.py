@@ -0,0 +1,111 @@
+import asyncio, discord, functools, io, typing
+from discord.ext import commands
+
+class SingleFlight():
+  """
+  Runs one computation per key at a time. Callers asking for a key that is already being computed
+  wait for that computation and share its result instead of starting their own.
+  """
+  _inflight: dict[typing.Hashable, asyncio.Task]
+
+  # metrics
+  started: int
+  coalesced: int
+
+  def __init__(self) -> None:
+    self._inflight = {}
+    self.started = 0
+    self.coalesced = 0
+
+  async def run[T](self, key: typing.Hashable, compute: typing.Callable[[], typing.Awaitable[T]]) -> T:
+    task = self._inflight.get(key)
+    if task is not None:
+      self.coalesced += 1
+    else:
+      self.started += 1
+      task = asyncio.ensure_future(compute())
+      self._inflight[key] = task
+      task.add_done_callback(lambda _: self._inflight.pop(key, None))
+    # a caller giving up doesn't cancel the computation the others are waiting on
+    return await asyncio.shield(task)
+
+  def stats(self) -> dict[str, int]:
+    return {
+      'in_flight': len(self._inflight),
+      'started': self.started,
+      'coalesced': self.coalesced,
+    }
+
+class RecordedResponse():
+  """
+  A `ctx.send` or `ctx.reply` call, with any files read into memory so it can be replayed on any
+  number of contexts.
+  """
+  method: str
+  args: tuple
+  kwargs: dict[str, typing.Any]
+  files: list[tuple[bytes, str]]
+
+  def __init__(self, method: str, args: tuple, kwargs: dict[str, typing.Any]) -> None:
+    files: list[discord.File] = kwargs.pop('files', None) or []
+    if 'file' in kwargs:
+      files.insert(0, kwargs.pop('file'))
+
+    self.method = method
+    self.args = args
+    self.kwargs = kwargs
+    self.files = [(file.fp.read(), file.filename) for file in files]
+
+  async def replay(self, ctx: commands.Context) -> None:
+    kwargs = dict(self.kwargs)
+    if len(self.files) > 0:
+      kwargs['files'] = [discord.File(fp=io.BytesIO(data), filename=filename) for data, filename in self.files]
+    await getattr(ctx, self.method)(*self.args, **kwargs)
+
+class RecordingContext():
+  """
+  Stands in for a command's context, recording what is sent instead of sending it. Everything
+  else is read from the real context.
+  """
+  ctx: commands.Context
+  responses: list[RecordedResponse]
+
+  def __init__(self, ctx: commands.Context) -> None:
+    self.ctx = ctx
+    self.responses = []
+
+  def __getattr__(self, name: str) -> typing.Any:
+    return getattr(self.ctx, name)
+
+  async def send(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+    self.responses.append(RecordedResponse('send', args, kwargs))
+
+  async def reply(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+    self.responses.append(RecordedResponse('reply', args, kwargs))
+
+def coalesce_command(per_author: bool = False):
+  """
+  Decorates a command handler method so that identical commands running at the same time share
+  one query and render. Commands are identical if they are the same method of the same handler
+  with the same arguments, on the same day and the same version of the handler's data, and (with
+  `per_author`) from the same user, for commands whose output depends on who asked.
+  """
+  def decorator(method):
+    @functools.wraps(method)
+    async def wrapper(self, ctx: commands.Context, *args: str) -> None:
+      key = (
+        self.__class__.__name__, method.__name__,
+        tuple(arg.replace('<@!', '<@') for arg in args),
+        self.utils.get_todays_date(), self.db.data_version,
+        ctx.author.id if per_author else None,
+      )
+
+      async def compute() -> list[RecordedResponse]:
+        recording = RecordingContext(ctx)
+        await method(self, recording, *args)
+        return recording.responses
+
+      for response in await self.utils.single_flight.run(key, compute):
+        await response.replay(ctx)
+    return wrapper
+  return decorator
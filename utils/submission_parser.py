@@ -0,0 +1,99 @@
+import re
+
+from models import PuzzleName
+from models.submission import ParsedSubmission
+
+class SubmissionParser():
+  """
+  Turns a chat message into a `ParsedSubmission`, or `None` if it isn't a puzzle result.
+
+  Every message in the channel goes through here, so the common case (plain chat) is rejected
+  on its first non-blank character before the message is split, and each message is split only
+  once.
+  """
+  WORDLE_TITLE = re.compile(r'^Wordle (\d{1,3}(?:,\d{3})+|\d+)(?: 🎉)? ([1-6]|X)/6\*?')
+  CONNECTIONS_PUZZLE = re.compile(r'^Puzzle #([\d,]+)')
+  STRANDS_TITLE = re.compile(r'^Strands #([\d,]+)')
+
+  # a puzzle result always starts with one of these
+  _FIRST_CHARS: frozenset[str] = frozenset('WCS')
+
+  def is_candidate(self, content: str) -> bool:
+    """
+    Cheap check for whether `content` could be a puzzle result, without splitting or matching it.
+    """
+    content = content.lstrip()
+    return len(content) > 0 and content[0] in self._FIRST_CHARS and content.count('\n') >= 2
+
+  def parse(self, content: str) -> ParsedSubmission | None:
+    # results pasted after a blank line or some spaces still count
+    content = content.lstrip()
+    if not self.is_candidate(content):
+      return None
+
+    lines: list[str] = content.splitlines()
+    first_line: str = lines[0].strip()
+    if first_line.startswith(PuzzleName.WORDLE.value):
+      return self._parse_wordle(first_line, lines)
+    elif first_line.startswith(PuzzleName.CONNECTIONS.value):
+      return self._parse_connections(first_line, lines)
+    elif first_line.startswith(PuzzleName.STRANDS.value):
+      return self._parse_strands(first_line, lines)
+
+    return None
+
+  ####################
+  #  HELPER METHODS  #
+  ####################
+
+  def _parse_wordle(self, first_line: str, lines: list[str]) -> ParsedSubmission | None:
+    title_match = self.WORDLE_TITLE.match(first_line)
+    if title_match is None:
+      return None
+
+    puzzle = '\n'.join(lines[1:])
+    return ParsedSubmission(
+      PuzzleName.WORDLE,
+      self._to_int(title_match.group(1)),
+      7 if title_match.group(2) == 'X' else int(title_match.group(2)),
+      first_line,
+      puzzle,
+      green=puzzle.count('🟩'),
+      yellow=puzzle.count('🟨'),
+      other=puzzle.count('⬜') + puzzle.count('⬛'),
+    )
+
+  def _parse_connections(self, first_line: str, lines: list[str]) -> ParsedSubmission | None:
+    puzzle_match = self.CONNECTIONS_PUZZLE.match(lines[1])
+    puzzle_lines = lines[2:]
+    if first_line != PuzzleName.CONNECTIONS.value or puzzle_match is None or len(puzzle_lines) == 0:
+      return None
+
+    # a solved puzzle ends with a single-colour row, otherwise it was failed
+    score = len(puzzle_lines) if len(set(puzzle_lines[-1])) == 1 else 8
+    return ParsedSubmission(
+      PuzzleName.CONNECTIONS,
+      self._to_int(puzzle_match.group(1)),
+      score,
+      '\n'.join(lines[:2]),
+      '\n'.join(puzzle_lines),
+    )
+
+  def _parse_strands(self, first_line: str, lines: list[str]) -> ParsedSubmission | None:
+    title_match = self.STRANDS_TITLE.match(first_line)
+    if title_match is None:
+      return None
+
+    puzzle = '\n'.join(lines[2:])
+    hints = puzzle.count('💡')
+    return ParsedSubmission(
+      PuzzleName.STRANDS,
+      self._to_int(title_match.group(1)),
+      hints,
+      first_line,
+      puzzle,
+      hints=hints,
+    )
+
+  def _to_int(self, number: str) -> int:
+    return int(number.replace(',', ''))
@@ -0,0 +1,129 @@
+import asyncio, logging, sys, threading, time, traceback, typing
+
+if typing.TYPE_CHECKING:
+  from utils.bot_typing import MyBotType
+
+class LoopWatchdog():
+  """
+  Notices when something blocks the event loop (and with it the gateway heartbeat).
+
+  A task on the loop wakes up every `interval` seconds and measures how late it was, feeding the
+  lag into metrics. A watcher thread checks that the task keeps waking up: once the loop has been
+  stuck for `threshold` seconds it logs the loop thread's stack and the task that was running,
+  while the blocking call is still on the stack.
+  """
+  bot: "MyBotType"
+  interval: float
+  threshold: float
+
+  _loop: asyncio.AbstractEventLoop | None
+  _thread_id: int
+  _heartbeat: float
+  _reported: bool
+  _task: asyncio.Task | None
+  _thread: threading.Thread | None
+  _stop: threading.Event
+
+  # metrics
+  stalls: int
+  last_lag: float
+  max_lag: float
+
+  def __init__(self, bot: "MyBotType", interval: float = 0.25, threshold: float = 0.5) -> None:
+    self.bot = bot
+    self.interval = interval
+    self.threshold = threshold
+    self._loop = None
+    self._thread_id = 0
+    self._heartbeat = 0.0
+    self._reported = False
+    self._task = None
+    self._thread = None
+    self._stop = threading.Event()
+
+    self.stalls = 0
+    self.last_lag = 0.0
+    self.max_lag = 0.0
+
+  ####################
+  #  CONTROL METHODS #
+  ####################
+
+  def start(self, debug: bool = False) -> None:
+    """
+    Starts watching the running loop. With `debug`, asyncio's debug mode is turned on as well,
+    which logs every callback that runs longer than `threshold` (too slow for production).
+    """
+    self._loop = asyncio.get_running_loop()
+    self._thread_id = threading.get_ident()
+    self._heartbeat = time.monotonic()
+    self._task = self._loop.create_task(self._measure(), name='loop-watchdog')
+    self._thread = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+    self._thread.start()
+
+    if debug:
+      self._loop.set_debug(True)
+      self._loop.slow_callback_duration = self.threshold
+      asyncio_logger = logging.getLogger('asyncio')
+      for handler in self.bot.logger.handlers:
+        asyncio_logger.addHandler(handler)
+
+  async def close(self) -> None:
+    self._stop.set()
+    if self._task is not None:
+      self._task.cancel()
+      await asyncio.gather(self._task, return_exceptions=True)
+      self._task = None
+    if self._thread is not None:
+      await asyncio.to_thread(self._thread.join)
+      self._thread = None
+
+  def stats(self) -> dict[str, int | float]:
+    return {
+      'stalls': self.stalls,
+      'last_lag_seconds': round(self.last_lag, 4),
+      'max_lag_seconds': round(self.max_lag, 4),
+    }
+
+  ####################
+  #  HELPER METHODS  #
+  ####################
+
+  async def _measure(self) -> None:
+    while True:
+      started = time.monotonic()
+      await asyncio.sleep(self.interval)
+      now = time.monotonic()
+      lag = max(now - started - self.interval, 0.0)
+      self._heartbeat = now
+
+      self.last_lag = lag
+      self.max_lag = max(self.max_lag, lag)
+      self.bot.metrics.observe('loop_lag_seconds', lag)
+      if lag >= self.threshold:
+        self.stalls += 1
+        self.bot.logger.warning("Event loop was blocked for %.2fs.", lag)
+
+  def _watch(self) -> None:
+    while not self._stop.wait(self.interval):
+      stalled = time.monotonic() - self._heartbeat - self.interval
+      if stalled < self.threshold:
+        self._reported = False
+        continue
+      if self._reported:
+        continue
+
+      # one report per stall, taken while the blocking call is still running
+      self._reported = True
+      frame = sys._current_frames().get(self._thread_id)
+      stack = ''.join(traceback.format_stack(frame)) if frame is not None else '(no stack)\n'
+      self.bot.logger.warning(
+        "Event loop blocked for %.2fs so far, running %s:\n%s", stalled, self._describe_task(), stack.rstrip()
+      )
+
+  def _describe_task(self) -> str:
+    task = asyncio.current_task(self._loop) if self._loop is not None else None
+    if task is None:
+      return "a callback outside of any task"
+    coroutine = task.get_coro()
+    return f"task `{task.get_name()}` ({getattr(coroutine, '__qualname__', coroutine)})"